@@ -0,0 +1,11 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""Offline benchmarks for PyPOM.
+
+Run with ``python -m benchmarks``. Each scenario is run against an in-process
+fake WebDriver that adds a fixed latency to every command, and the number of
+commands and wall time are reported. With ``--check`` the run fails if any
+scenario sends more commands than its budget.
+"""
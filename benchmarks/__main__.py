@@ -0,0 +1,66 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import argparse
+import sys
+import time
+
+from .driver import FakeWebDriver
+from .scenarios import BASE_URL, PAGES, SCENARIOS
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+
+def run(scenario, latency, repeat):
+    """Run a scenario, returning the number of commands and best time.
+
+    The time excludes the time spent by the fake driver emulating the browser,
+    so it's made up of the modelled latency, implicit waits, and PyPOM itself.
+    """
+    best = None
+    for i in range(repeat):
+        driver = FakeWebDriver(PAGES, latency=latency)
+        driver.get(BASE_URL + '/en-US/')
+        driver.reset_commands()
+        start = _clock()
+        scenario(driver)
+        elapsed = _clock() - start - driver.emulation_time
+        best = elapsed if best is None else min(best, elapsed)
+    return driver.round_trips, best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('--latency', type=float, default=0.001,
+                        help='seconds added to every command (default: 0.001)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs of each scenario, best time is reported '
+                             '(default: 3)')
+    parser.add_argument('--check', action='store_true',
+                        help='fail if a scenario exceeds its command budget')
+    parser.add_argument('scenarios', nargs='*', metavar='scenario',
+                        help='names of scenarios to run (default: all)')
+    args = parser.parse_args(argv)
+
+    failures = []
+    print('%-32s %8s %8s %10s' % ('scenario', 'commands', 'budget', 'time'))
+    for scenario, budget in SCENARIOS:
+        name = scenario.__name__
+        if args.scenarios and name not in args.scenarios:
+            continue
+        commands, elapsed = run(scenario, args.latency, args.repeat)
+        flag = ''
+        if commands > budget:
+            failures.append(name)
+            flag = '  over budget'
+        print('%-32s %8d %8d %9.1fms%s' % (
+            name, commands, budget, elapsed * 1000, flag))
+    if args.check and failures:
+        print('Over budget: %s' % ', '.join(failures))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,320 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""A minimal DOM with a subset of CSS selectors and XPath."""
+
+import re
+import sys
+from xml.sax.saxutils import escape, quoteattr
+
+from selenium.common.exceptions import InvalidSelectorException
+
+if sys.version_info >= (3,):
+    from html.parser import HTMLParser
+else:
+    from HTMLParser import HTMLParser
+
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr'])
+
+
+class Node(object):
+
+    def __init__(self, tag, attrs=None, parent=None):
+        self.tag = tag
+        self.attrs = dict(attrs or {})
+        self.parent = parent
+        self.children = []
+        self.value = self.attrs.get('value', '')
+
+    def __repr__(self):
+        return '<Node %s %r>' % (self.tag, self.attrs)
+
+    @property
+    def classes(self):
+        return self.attrs.get('class', '').split()
+
+    def iter(self):
+        """Yield descendants in document order, excluding this node."""
+        for child in self.children:
+            if isinstance(child, Node):
+                yield child
+                for node in child.iter():
+                    yield node
+
+    def ancestors(self):
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+    @property
+    def text(self):
+        parts = []
+        for child in self.children:
+            if isinstance(child, Node):
+                if child.displayed:
+                    parts.append(child.text)
+            else:
+                parts.append(child)
+        return ' '.join(' '.join(parts).split())
+
+    @property
+    def html(self):
+        """Markup of the node, with the current value of each input as its
+        ``value`` attribute, as serialised by ``DOCUMENT_HTML``."""
+        attrs = dict(self.attrs)
+        if self.tag == 'input':
+            attrs['value'] = self.value
+        markup = '<%s%s>' % (self.tag, ''.join(
+            ' %s=%s' % (name, quoteattr(value))
+            for name, value in sorted(attrs.items())))
+        if self.tag in VOID_ELEMENTS:
+            return markup
+        inner = ''.join(child.html if isinstance(child, Node) else escape(child)
+                        for child in self.children)
+        return '%s%s</%s>' % (markup, inner, self.tag)
+
+    @property
+    def displayed(self):
+        for node in [self] + list(self.ancestors()):
+            if 'hidden' in node.attrs:
+                return False
+            if 'display:none' in node.attrs.get('style', '').replace(' ', ''):
+                return False
+        return True
+
+
+class _TreeBuilder(HTMLParser):
+
+    def __init__(self):
+        HTMLParser.__init__(self)
+        self.document = Node('#document')
+        self.current = self.document
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, [(k, v if v is not None else '') for k, v in attrs],
+                    self.current)
+        self.current.children.append(node)
+        if tag not in VOID_ELEMENTS:
+            self.current = node
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.current = self.current.parent
+
+    def handle_endtag(self, tag):
+        for node in [self.current] + list(self.current.ancestors()):
+            if node.tag == tag:
+                self.current = node.parent
+                return
+
+    def handle_data(self, data):
+        if data.strip():
+            self.current.children.append(data)
+
+
+def parse_html(html):
+    """Parse HTML into a tree of :py:class:`Node` objects."""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.document
+
+
+_COMPOUND = re.compile(
+    r'(?P<tag>[A-Za-z*][\w-]*)?'
+    r'(?P<rest>(?:#[\w-]+|\.[\w-]+|\[[^\]]+\])*)$')
+_SIMPLE = re.compile(r'#[\w-]+|\.[\w-]+|\[[^\]]+\]')
+_ATTRIBUTE = re.compile(
+    r'^\s*([\w-]+)\s*(?:([~|^$*]?=)\s*(?:"((?:[^"\\]|\\.)*)"|\'([^\']*)\'|([\w-]+)))?\s*$')
+
+
+def _split_selector(selector, separator):
+    parts, depth, quote, current = [], 0, None, ''
+    for char in selector:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(current)
+            current = ''
+            continue
+        current += char
+    parts.append(current)
+    return parts
+
+
+def _parse_compound(text, selector):
+    match = _COMPOUND.match(text)
+    if not match:
+        raise InvalidSelectorException('Unsupported selector: %s' % selector)
+    tests = []
+    tag = match.group('tag')
+    if tag and tag != '*':
+        tests.append(lambda n, tag=tag.lower(): n.tag == tag)
+    for simple in _SIMPLE.findall(match.group('rest')):
+        if simple[0] == '#':
+            tests.append(lambda n, v=simple[1:]: n.attrs.get('id') == v)
+        elif simple[0] == '.':
+            tests.append(lambda n, v=simple[1:]: v in n.classes)
+        else:
+            attribute = _ATTRIBUTE.match(simple[1:-1])
+            if not attribute:
+                raise InvalidSelectorException(
+                    'Unsupported selector: %s' % selector)
+            name, operator = attribute.group(1), attribute.group(2)
+            value = attribute.group(3)
+            if value is not None:
+                value = re.sub(r'\\(.)', r'\1', value)
+            else:
+                value = attribute.group(4) or attribute.group(5)
+            tests.append(_attribute_test(name, operator, value))
+    return lambda n: all(test(n) for test in tests)
+
+
+def _attribute_test(name, operator, value):
+    def test(node):
+        actual = node.attrs.get(name)
+        if actual is None:
+            return False
+        if operator is None:
+            return True
+        if operator == '=':
+            return actual == value
+        if operator == '~=':
+            return value in actual.split()
+        if operator == '^=':
+            return actual.startswith(value)
+        if operator == '$=':
+            return actual.endswith(value)
+        if operator == '*=':
+            return value in actual
+        return actual == value or actual.startswith(value + '-')
+    return test
+
+
+def _parse_complex(selector):
+    tokens = selector.replace('>', ' > ').split()
+    steps, combinator = [], ' '
+    for token in tokens:
+        if token == '>':
+            combinator = '>'
+            continue
+        steps.append((combinator, _parse_compound(token, selector)))
+        combinator = ' '
+    if not steps:
+        raise InvalidSelectorException('Invalid selector: %r' % selector)
+    return steps
+
+
+def _matches(node, steps):
+    combinator, test = steps[-1]
+    if not test(node):
+        return False
+    if len(steps) == 1:
+        return True
+    if combinator == '>':
+        return node.parent is not None and _matches(node.parent, steps[:-1])
+    return any(_matches(ancestor, steps[:-1]) for ancestor in node.ancestors())
+
+
+def select_css(root, selector):
+    """Return the descendants of ``root`` that match a CSS selector."""
+    alternatives = [_parse_complex(part)
+                    for part in _split_selector(selector, ',')]
+    return [node for node in root.iter()
+            if any(_matches(node, steps) for steps in alternatives)]
+
+
+_STEP = re.compile(r'(//|/)?([^/\[]+|\.\.|\.)((?:\[[^\]]*\])*)')
+_PREDICATE = re.compile(r'\[([^\]]*)\]')
+
+
+def _predicate(text, xpath):
+    text = text.strip()
+    if text.isdigit():
+        return int(text)
+    match = re.match(r'^@([\w-]+)$', text)
+    if match:
+        return lambda n: match.group(1) in n.attrs
+    match = re.match(r'''^@([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')$''', text)
+    if match:
+        name, value = match.group(1), match.group(2) or match.group(3) or ''
+        return lambda n: n.attrs.get(name) == value
+    match = re.match(r'''^contains\(\s*@([\w-]+)\s*,\s*(?:"([^"]*)"|'([^']*)')\s*\)$''', text)
+    if match:
+        name, value = match.group(1), match.group(2) or match.group(3) or ''
+        return lambda n: value in n.attrs.get(name, '')
+    match = re.match(r'''^(?:text\(\)|normalize-space\(\)|\.)\s*=\s*(?:"([^"]*)"|'([^']*)')$''', text)
+    if match:
+        value = match.group(1) or match.group(2) or ''
+        return lambda n: n.text == value
+    match = re.match(r'''^contains\(\s*(?:text\(\)|\.)\s*,\s*(?:"([^"]*)"|'([^']*)')\s*\)$''', text)
+    if match:
+        value = match.group(1) or match.group(2) or ''
+        return lambda n: value in n.text
+    raise InvalidSelectorException('Unsupported XPath: %s' % xpath)
+
+
+def select_xpath(root, xpath):
+    """Return the nodes matching an XPath expression evaluated from ``root``."""
+    expression = xpath.strip()
+    if expression.startswith('/'):
+        context = [root]
+        while context[0].parent is not None:
+            context = [context[0].parent]
+    else:
+        context = [root]
+        if expression.startswith('.//') or expression.startswith('./'):
+            expression = expression[1:]
+        elif expression.startswith('.'):
+            expression = expression[1:]
+    position = 0
+    while position < len(expression):
+        match = _STEP.match(expression, position)
+        if not match or match.end() == position:
+            raise InvalidSelectorException('Unsupported XPath: %s' % xpath)
+        position = match.end()
+        axis, name, predicates = match.groups()
+        candidates, seen = [], set()
+        for node in context:
+            if name == '.':
+                found = [node]
+            elif name == '..':
+                found = [node.parent] if node.parent is not None else []
+            elif axis == '//':
+                found = list(node.iter())
+            else:
+                found = [c for c in node.children if isinstance(c, Node)]
+            if name not in ('.', '..', '*'):
+                found = [n for n in found if n.tag == name.lower()]
+            for text in _PREDICATE.findall(predicates):
+                test = _predicate(text, xpath)
+                if isinstance(test, int):
+                    found = found[test - 1:test]
+                else:
+                    found = [n for n in found if test(n)]
+            for n in found:
+                if id(n) not in seen:
+                    seen.add(id(n))
+                    candidates.append(n)
+        context = candidates
+    order = dict((id(n), i) for i, n in enumerate(_document(root).iter()))
+    return sorted((n for n in context if n.tag != '#document'),
+                  key=lambda n: order.get(id(n), -1))
+
+
+def _document(node):
+    while node.parent is not None:
+        node = node.parent
+    return node
@@ -0,0 +1,337 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""An in-process fake WebDriver with configurable per-command latency."""
+
+from collections import Counter
+import itertools
+import time
+
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    WebDriverException)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.switch_to import SwitchTo
+from selenium.webdriver.remote.webelement import WebElement
+
+from pypom import scripts
+
+from .dom import Node, parse_html, select_css, select_xpath
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+
+class _LocatorConverter(object):
+    """Pass locators through unchanged, the fake supports every strategy."""
+
+    def convert(self, by, value):
+        return by, value
+
+
+class _Timeouts(object):
+
+    def __init__(self, implicit_wait):
+        self.implicit_wait = implicit_wait
+
+
+class FakeWebDriver(object):
+    """A fake WebDriver that serves pages from a dictionary of HTML documents.
+
+    Every command goes through :py:meth:`execute`, which counts it in
+    :py:attr:`commands` and sleeps for ``latency`` seconds to model the round
+    trip to a remote browser. Elements are real
+    :py:class:`~selenium.webdriver.remote.webelement.WebElement` objects that
+    send their commands back to this driver, and become stale when another
+    page is loaded. The document of an ``iframe`` is the page at its ``src``
+    URL. Scripts are emulated for the JavaScript snippets that PyPOM itself
+    sends.
+
+    The time spent emulating the browser in Python, excluding the modelled
+    latency and implicit waits, is kept in :py:attr:`emulation_time` so that
+    it can be subtracted from measurements.
+
+    :param pages: Mapping of URLs to HTML documents.
+    :param latency: (optional) Seconds each command takes. Defaults to ``0``.
+    """
+
+    _is_remote = False
+
+    def __init__(self, pages, latency=0):
+        self.pages = pages
+        self.latency = latency
+        self.commands = Counter()
+        self.emulation_time = 0.0
+        self._waited = 0.0
+        self.locator_converter = _LocatorConverter()
+        self.implicit_wait = 0
+        self.current_url_value = None
+        self.document = Node('#document')
+        self._parents = []
+        self._frames = {}
+        self._ids = itertools.count()
+        self._nodes = {}
+        self._elements = {}
+        self._handlers = {
+            Command.GET: self._get,
+            Command.GET_CURRENT_URL: lambda p: self.current_url_value,
+            Command.SET_TIMEOUTS: self._set_timeouts,
+            Command.GET_TIMEOUTS: lambda p: {
+                'implicit': int(self.implicit_wait * 1000)},
+            Command.FIND_ELEMENT: lambda p: self._find(self.document, p, True),
+            Command.FIND_ELEMENTS: lambda p: self._find(self.document, p),
+            Command.FIND_CHILD_ELEMENT: lambda p: self._find(
+                self._node(p['id']), p, True),
+            Command.FIND_CHILD_ELEMENTS: lambda p: self._find(
+                self._node(p['id']), p),
+            Command.SWITCH_TO_FRAME: self._switch_to_frame,
+            Command.SWITCH_TO_PARENT_FRAME: self._switch_to_parent_frame,
+            Command.W3C_EXECUTE_SCRIPT: self._execute_script,
+            Command.GET_ELEMENT_TEXT: lambda p: self._node(p['id']).text,
+            Command.GET_ELEMENT_TAG_NAME: lambda p: self._node(p['id']).tag,
+            Command.GET_ELEMENT_PROPERTY: lambda p: self._property(
+                self._node(p['id']), p['name']),
+            Command.CLICK_ELEMENT: lambda p: self._node(p['id']) and None,
+            Command.CLEAR_ELEMENT: self._clear,
+            Command.SEND_KEYS_TO_ELEMENT: self._send_keys,
+        }
+        self._scripts = {
+            scripts.FIND_MANY: self._find_many,
+            scripts.FIND_RANGE: self._find_range,
+            scripts.FIND_CHAIN: self._find_chain,
+            scripts.EXTRACT: self._extract,
+            scripts.FILL: self._fill,
+            scripts.CHECK_CONDITIONS: self._check_conditions,
+            scripts.DOCUMENT_READY: lambda: True,
+            scripts.NETWORK_IDLE: lambda idle_time: True,
+            scripts.DOCUMENT_HTML: lambda: ''.join(
+                node.html for node in self.document.children
+                if isinstance(node, Node)),
+        }
+
+    @property
+    def round_trips(self):
+        """Total number of commands executed."""
+        return sum(self.commands.values())
+
+    def reset_commands(self):
+        self.commands.clear()
+        self.emulation_time = 0.0
+
+    def execute(self, command, params=None):
+        self.commands[command] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        handler = self._handlers.get(command)
+        if handler is None:
+            raise WebDriverException('Unsupported command: %s' % command)
+        self._waited = 0.0
+        start = _clock()
+        try:
+            return {'value': handler(params or {})}
+        finally:
+            self.emulation_time += _clock() - start - self._waited
+
+    # WebDriver API
+
+    def get(self, url):
+        self.execute(Command.GET, {'url': url})
+
+    @property
+    def current_url(self):
+        return self.execute(Command.GET_CURRENT_URL)['value']
+
+    def find_element(self, by=By.ID, value=None):
+        return self.execute(
+            Command.FIND_ELEMENT, {'using': by, 'value': value})['value']
+
+    def find_elements(self, by=By.ID, value=None):
+        return self.execute(
+            Command.FIND_ELEMENTS, {'using': by, 'value': value})['value']
+
+    def execute_script(self, script, *args):
+        return self.execute(Command.W3C_EXECUTE_SCRIPT, {
+            'script': script, 'args': list(args)})['value']
+
+    def implicitly_wait(self, time_to_wait):
+        self.execute(Command.SET_TIMEOUTS,
+                     {'implicit': int(float(time_to_wait) * 1000)})
+
+    @property
+    def switch_to(self):
+        return SwitchTo(self)
+
+    @property
+    def timeouts(self):
+        value = self.execute(Command.GET_TIMEOUTS)['value']
+        return _Timeouts(value['implicit'] / 1000.0)
+
+    # command handlers
+
+    def _get(self, params):
+        url = params['url']
+        self.current_url_value = url
+        self.document = parse_html(self.pages.get(url, ''))
+        self._parents = []
+        self._frames = {}
+        # elements from the previous document are now stale
+        self._nodes = {}
+        self._elements = {}
+
+    def _switch_to_frame(self, params):
+        element = params['id']
+        if element is None:
+            if self._parents:
+                self.document = self._parents[0]
+                self._parents = []
+            return
+        node = self._node(element.id)
+        if node.tag != 'iframe':
+            raise WebDriverException('Not a frame: %s' % node.tag)
+        if id(node) not in self._frames:
+            self._frames[id(node)] = parse_html(
+                self.pages.get(node.attrs.get('src'), ''))
+        self._parents.append(self.document)
+        self.document = self._frames[id(node)]
+
+    def _switch_to_parent_frame(self, params):
+        if self._parents:
+            self.document = self._parents.pop()
+
+    def _set_timeouts(self, params):
+        if 'implicit' in params:
+            self.implicit_wait = params['implicit'] / 1000.0
+
+    def _element(self, node):
+        if node is None:
+            return None
+        key = id(node)
+        if key not in self._elements:
+            element_id = 'element-%d' % next(self._ids)
+            self._nodes[element_id] = node
+            self._elements[key] = WebElement(self, element_id)
+        return self._elements[key]
+
+    def _node(self, element_id):
+        try:
+            return self._nodes[element_id]
+        except KeyError:
+            raise StaleElementReferenceException(
+                'Element %s is not attached to the page' % element_id)
+
+    def _select(self, root, using, value):
+        if using == By.CSS_SELECTOR:
+            return select_css(root, value)
+        if using == By.XPATH:
+            return select_xpath(root, value)
+        nodes = root.iter()
+        if using == By.ID:
+            return [n for n in nodes if n.attrs.get('id') == value]
+        if using == By.NAME:
+            return [n for n in nodes if n.attrs.get('name') == value]
+        if using == By.CLASS_NAME:
+            return [n for n in nodes if value in n.classes]
+        if using == By.TAG_NAME:
+            return [n for n in nodes if n.tag == value.lower()]
+        if using == By.LINK_TEXT:
+            return [n for n in nodes if n.tag == 'a' and n.text == value]
+        if using == By.PARTIAL_LINK_TEXT:
+            return [n for n in nodes if n.tag == 'a' and value in n.text]
+        raise WebDriverException('Unsupported strategy: %s' % using)
+
+    def _find(self, root, params, single=False):
+        nodes = self._select(root, params['using'], params['value'])
+        if not nodes and self.implicit_wait:
+            # the document never changes, so waiting can't help
+            time.sleep(self.implicit_wait)
+            self._waited += self.implicit_wait
+        if single:
+            if not nodes:
+                raise NoSuchElementException(
+                    'Unable to locate element: %(using)s=%(value)s' % params)
+            return self._element(nodes[0])
+        return [self._element(n) for n in nodes]
+
+    def _property(self, node, name):
+        if name == 'value':
+            return node.value
+        return node.attrs.get(name)
+
+    def _clear(self, params):
+        self._node(params['id']).value = ''
+
+    def _send_keys(self, params):
+        self._node(params['id']).value += params['text']
+
+    # script emulation
+
+    def _argument(self, value):
+        if isinstance(value, WebElement):
+            return self._node(value.id)
+        return value
+
+    def _execute_script(self, params):
+        script = params['script']
+        args = [self._argument(a) for a in params['args']]
+        if script.startswith('/* isDisplayed */'):
+            return args[0].displayed
+        if script.startswith('/* getAttribute */'):
+            return self._property(args[0], args[1])
+        handler = self._scripts.get(script)
+        if handler is None:
+            raise WebDriverException('Unsupported script: %s' % script[:40])
+        return handler(*args)
+
+    def _find_many(self, root, locators):
+        root = root or self.document
+        results = []
+        for strategy, value in locators:
+            nodes = self._select(root, strategy, value)
+            results.append(self._element(nodes[0]) if nodes else None)
+        return results
+
+    def _find_range(self, root, locator, start, end):
+        nodes = self._select(root or self.document, *locator)
+        return [len(nodes), [self._element(n) for n in nodes[start:end]]]
+
+    def _find_chain(self, root, locators, many):
+        root = root or self.document
+        for strategy, value in locators[:-1]:
+            nodes = self._select(root, strategy, value)
+            if not nodes:
+                return None
+            root = nodes[0]
+        nodes = self._select(root, *locators[-1])
+        if many:
+            return [self._element(n) for n in nodes]
+        return self._element(nodes[0]) if nodes else None
+
+    def _extract(self, root, fields):
+        values = []
+        for strategy, value, attribute, displayed, many in fields:
+            nodes = self._select(root or self.document, strategy, value)
+            if displayed:
+                read = [n.displayed for n in nodes]
+            elif attribute is not None:
+                read = [self._property(n, attribute) for n in nodes]
+            else:
+                read = [n.text if n.displayed else '' for n in nodes]
+            if many:
+                values.append(read)
+            else:
+                values.append(read[0] if read else None)
+        return values
+
+    def _fill(self, root, fields):
+        results = []
+        for strategy, value, fill in fields:
+            nodes = self._select(root or self.document, strategy, value)
+            if nodes:
+                nodes[0].value = fill
+            results.append([1 if nodes else 0, 0])
+        return results
+
+    def _check_conditions(self, root, locators, args):
+        return self._find_many(root, locators)
@@ -0,0 +1,268 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""Representative PyPOM usage, measured against the fake WebDriver."""
+
+from selenium.webdriver.common.by import By
+
+from pypom import Field, Page, Region, RegionList
+from pypom.conditions import DocumentReady
+
+BASE_URL = 'https://pypom.test'
+ROWS = 500
+FIELDS = 30
+IMPLICIT_WAIT = 0.05
+
+
+def _html():
+    fields = ''.join(
+        '<label>Field %d<input id="field-%d" name="field-%d" value="%d"></label>'
+        % (i, i, i, i) for i in range(FIELDS))
+    rows = ''.join(
+        '<tr class="row"><td class="name">Row %d</td><td>%d</td></tr>' % (i, i)
+        for i in range(ROWS))
+    items = ''.join(
+        '<li class="item"><a href="/%d">Item %d</a></li>' % (i, i)
+        for i in range(10))
+    return (
+        '<html><body>'
+        '<header id="header"><h1 class="title">PyPOM</h1>'
+        '<a class="login" href="/login">Log in</a>'
+        '<span class="user" hidden>nobody</span></header>'
+        '<nav id="sidebar"><ul class="menu">%s</ul></nav>'
+        '<form id="form">%s<button type="submit">Save</button></form>'
+        '<table id="results"><tbody>%s</tbody></table>'
+        '<iframe id="widget" src="%s"></iframe>'
+        '</body></html>' % (items, fields, rows, WIDGET_URL))
+
+
+WIDGET_URL = BASE_URL + '/widget'
+WIDGET_HTML = (
+    '<html><body><div id="app"><h2 class="title">Widget</h2>'
+    '<button class="save">Save</button><button class="cancel">Cancel</button>'
+    '</div></body></html>')
+
+PAGES = {BASE_URL + '/en-US/': _html(), WIDGET_URL: WIDGET_HTML}
+
+
+class Home(Page):
+    URL_TEMPLATE = '/{locale}/'
+    LOAD_CONDITION = DocumentReady()
+
+    _row_locator = (By.CSS_SELECTOR, '#results tr.row')
+    _banner_locator = (By.ID, 'banner')
+
+    class Header(Region):
+        _root_locator = (By.ID, 'header')
+        _title_locator = (By.CLASS_NAME, 'title')
+        _login_locator = (By.CLASS_NAME, 'login')
+        _user_locator = (By.CLASS_NAME, 'user')
+
+    class CachedHeader(Header):
+        CACHE_ROOT = True
+
+    class CompoundHeader(Header):
+        COMPOUND_LOOKUPS = True
+
+    class Sidebar(Region):
+        _root_locator = (By.ID, 'sidebar')
+
+        class Menu(Region):
+            _root_locator = (By.CLASS_NAME, 'menu')
+            _item_locator = (By.CSS_SELECTOR, 'li.item a')
+
+        class CompoundMenu(Menu):
+            COMPOUND_LOOKUPS = True
+
+    class Row(Region):
+        _name_locator = (By.CLASS_NAME, 'name')
+
+        def wait_for_region_to_load(self):
+            self.wait.until(lambda s: self.root.is_displayed())
+
+    class LazyRow(Row):
+        LAZY_LOAD = True
+
+    class Widget(Region):
+        _frame_locator = (By.ID, 'widget')
+        _root_locator = (By.ID, 'app')
+        _title_locator = (By.CLASS_NAME, 'title')
+        _save_locator = (By.CLASS_NAME, 'save')
+        _cancel_locator = (By.CLASS_NAME, 'cancel')
+        CACHE_ROOT = True
+
+
+Home.Form = type('Form', (Region,), dict(
+    ('field_%d' % i, Field(By.ID, 'field-%d' % i, attribute='value'))
+    for i in range(FIELDS)))
+
+
+def _home(driver, **kwargs):
+    page = Home(driver, BASE_URL, locale='en-US')
+    for key, value in kwargs.items():
+        setattr(page, key, value)
+    return page
+
+
+def page_open(driver):
+    _home(driver).open()
+
+
+def region_lookups(driver):
+    header = Home.Header(_home(driver))
+    for locator in (header._title_locator, header._login_locator,
+                    header._user_locator):
+        header.find_element(*locator).text
+
+
+def region_lookups_cached_root(driver):
+    header = Home.CachedHeader(_home(driver))
+    for locator in (header._title_locator, header._login_locator,
+                    header._user_locator):
+        header.find_element(*locator).text
+
+
+def nested_region_lookup(driver):
+    sidebar = Home.Sidebar(_home(driver))
+    menu = Home.Sidebar.Menu(sidebar)
+    menu.find_element(*menu._item_locator).text
+
+
+def region_lookups_compound(driver):
+    header = Home.CompoundHeader(_home(driver))
+    for locator in (header._title_locator, header._login_locator,
+                    header._user_locator):
+        header.find_element(*locator).text
+
+
+def nested_region_lookup_compound(driver):
+    sidebar = Home.Sidebar(_home(driver))
+    menu = Home.Sidebar.CompoundMenu(sidebar)
+    menu.find_element(*menu._item_locator).text
+
+
+def presence_check_absent(driver):
+    driver.implicit_wait = IMPLICIT_WAIT
+    _home(driver).is_element_present(*Home._banner_locator)
+
+
+def presence_check_absent_fast(driver):
+    driver.implicit_wait = IMPLICIT_WAIT
+    page = _home(driver, FAST_PRESENCE_CHECKS=True)
+    page.is_element_present(*Home._banner_locator)
+
+
+def form_fields(driver):
+    page = _home(driver)
+    for i in range(FIELDS):
+        page.find_element(By.ID, 'field-%d' % i)
+
+
+def form_fields_find_many(driver):
+    page = _home(driver)
+    page.find_many(dict(
+        ('field-%d' % i, (By.ID, 'field-%d' % i)) for i in range(FIELDS)))
+
+
+def form_values(driver):
+    page = _home(driver)
+    for i in range(FIELDS):
+        page.find_element(By.ID, 'field-%d' % i).get_attribute('value')
+
+
+def form_values_snapshot(driver):
+    page = _home(driver)
+    with page.snapshot():
+        for i in range(FIELDS):
+            page.find_element(By.ID, 'field-%d' % i).get_attribute('value')
+
+
+def frame_region_lookups(driver):
+    page = _home(driver)
+    widget = Home.Widget(page)
+    for locator in (widget._title_locator, widget._save_locator,
+                    widget._cancel_locator):
+        widget.find_element(*locator).text
+    header = Home.Header(page)
+    header.find_element(*header._title_locator).text
+    widget.find_element(*widget._title_locator).text
+
+
+def form_values_extract(driver):
+    Home.Form(_home(driver)).extract()
+
+
+def _form_values():
+    return dict(('field_%d' % i, 'value %d' % i) for i in range(FIELDS))
+
+
+def form_fill(driver):
+    values = _form_values()
+    Home.Form(_home(driver)).fill(values, native=values)
+
+
+def form_fill_script(driver):
+    Home.Form(_home(driver)).fill(_form_values())
+
+
+OUTCOMES = [
+    ('banner', Home._banner_locator),
+    ('error', (By.CLASS_NAME, 'error')),
+    ('form', (By.ID, 'form'))]
+
+
+def wait_for_outcome(driver):
+    page = _home(driver, FAST_PRESENCE_CHECKS=True)
+    page.wait.until(lambda s: [name for name, locator in OUTCOMES
+                               if page.is_element_present(*locator)])
+
+
+def wait_for_outcome_multiplexed(driver):
+    _home(driver).wait_for_any(dict(OUTCOMES))
+
+
+def first_row_from_list(driver):
+    page = _home(driver)
+    rows = [Home.Row(page, root=el)
+            for el in page.find_elements(*Home._row_locator)]
+    rows[0].find_element(*Home.Row._name_locator).text
+
+
+def first_row_from_lazy_list(driver):
+    page = _home(driver)
+    rows = [Home.LazyRow(page, root=el)
+            for el in page.find_elements(*Home._row_locator)]
+    rows[0].find_element(*Home.Row._name_locator).text
+
+
+def first_row_from_region_list(driver):
+    page = _home(driver)
+    rows = RegionList(page, Home.Row, *Home._row_locator)
+    rows[0].find_element(*Home.Row._name_locator).text
+
+
+SCENARIOS = [
+    # (scenario, maximum number of commands)
+    (page_open, 2),
+    (region_lookups, 9),
+    (region_lookups_cached_root, 7),
+    (nested_region_lookup, 4),
+    (region_lookups_compound, 6),
+    (nested_region_lookup_compound, 2),
+    (presence_check_absent, 1),
+    (presence_check_absent_fast, 1),
+    (form_fields, FIELDS),
+    (form_fields_find_many, 1),
+    (form_values, FIELDS * 2),
+    (form_values_snapshot, 1),
+    (form_values_extract, 1),
+    (form_fill, FIELDS * 3),
+    (form_fill_script, 1),
+    (wait_for_outcome, len(OUTCOMES)),
+    (wait_for_outcome_multiplexed, 1),
+    (frame_region_lookups, 16),
+    (first_row_from_list, ROWS + 3),
+    (first_row_from_lazy_list, 4),
+    (first_row_from_region_list, 4),
+]
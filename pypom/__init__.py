@@ -1,2 +1,3 @@
+from .element import Element, Elements, Field  # noqa
 from .page import Page  # noqa
-from .region import Region  # noqa
+from .region import Region, RegionList  # noqa
@@ -0,0 +1,701 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""Page objects for :py:mod:`asyncio`, requiring Python 3.5 or later.
+
+Commands are sent using the W3C WebDriver protocol over a pool of persistent
+HTTP connections, so a single thread can drive many browser sessions at
+once.
+"""
+
+import asyncio
+import inspect
+import json
+import ssl
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    InvalidArgumentException,
+    InvalidSelectorException,
+    JavascriptException,
+    NoSuchElementException,
+    NoSuchFrameException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException)
+
+from .exception import UsageError
+from .locators import to_script_locator
+from .page import Page, _UNSET, _check_url_template
+from .view import WebView, _ViewClass
+from .wait import Wait, _Poll
+
+ELEMENT_KEY = 'element-6066-11e4-a52e-4f735466cecf'
+
+# requests that can be sent again if the connection fails while waiting for
+# the response, as the server may already have acted on them
+_IDEMPOTENT = frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'])
+
+_ERRORS = {
+    'element click intercepted': ElementClickInterceptedException,
+    'element not interactable': ElementNotInteractableException,
+    'invalid argument': InvalidArgumentException,
+    'invalid selector': InvalidSelectorException,
+    'javascript error': JavascriptException,
+    'no such element': NoSuchElementException,
+    'no such frame': NoSuchFrameException,
+    'no such window': NoSuchWindowException,
+    'script timeout': TimeoutException,
+    'stale element reference': StaleElementReferenceException,
+    'timeout': TimeoutException,
+}
+
+
+async def _resolve(value):
+    if inspect.isawaitable(value):
+        value = await value
+    return value
+
+
+class ConnectionPool(object):
+    """Persistent HTTP connections to a WebDriver server.
+
+    Up to ``size`` requests are made at the same time, and connections are
+    kept open to be reused by later requests. A pool can be shared by several
+    :py:class:`AsyncSession` objects using the same server. Connections
+    belong to the event loop they were opened in, and are discarded if the
+    pool is used from another event loop.
+
+    Connecting to the server, and each request and its response, time out
+    after ``timeout`` seconds, raising :py:class:`asyncio.TimeoutError`.
+
+    :param url: URL of the WebDriver server.
+    :param size: (optional) Maximum number of connections. Defaults to ``10``.
+    :param timeout: (optional) Timeout in seconds, or ``None`` to wait forever. Defaults to ``120``, as for Selenium's remote connections.
+    :type url: str
+    :type size: int
+    :type timeout: float
+
+    """
+
+    def __init__(self, url, size=10, timeout=120):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise UsageError('Unsupported WebDriver URL: %s' % url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == 'https' else None
+        self.path = parts.path.rstrip('/')
+        self.size = size
+        self.timeout = timeout
+        self.requests = 0
+        """Number of requests made."""
+        self.connections = 0
+        """Number of connections opened."""
+        self._idle = []
+        self._loop = None
+        self._semaphore = None
+
+    async def close(self):
+        """Close the idle connections."""
+        self._close_idle()
+
+    def _close_idle(self):
+        while self._idle:
+            reader, writer = self._idle.pop()
+            try:
+                writer.close()
+            except RuntimeError:
+                # its event loop is closed
+                pass
+
+    def _use_loop(self):
+        # connections, and the semaphore limiting them, can only be used in
+        # the event loop they were created in
+        loop = asyncio.get_event_loop()
+        if loop is not self._loop:
+            self._close_idle()
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.size)
+
+    async def execute(self, method, path, body=None):
+        """Make a WebDriver request.
+
+        :param method: HTTP method.
+        :param path: Path of the command, relative to the server URL.
+        :param body: (optional) Parameters sent as JSON.
+        :type method: str
+        :type path: str
+        :type body: dict
+        :return: The ``value`` of the response.
+        :raises: :py:class:`~selenium.common.exceptions.WebDriverException`
+
+        """
+        status, payload = await self.request(
+            method, self.path + path,
+            json.dumps(body).encode('utf-8') if body is not None else None)
+        try:
+            value = json.loads(payload.decode('utf-8')).get('value')
+        except ValueError:
+            raise WebDriverException(
+                'Invalid response (%d): %r' % (status, payload[:200]))
+        if status >= 400 or isinstance(value, dict) and 'error' in value:
+            value = value if isinstance(value, dict) else {}
+            exception = _ERRORS.get(value.get('error'), WebDriverException)
+            raise exception(value.get('message'),
+                            stacktrace=value.get('stacktrace'))
+        return value
+
+    async def request(self, method, path, body=None):
+        """Make an HTTP request, returning the status and response body.
+
+        A request that fails on a connection that was reused is only sent
+        again if its method is idempotent.
+        """
+        self._use_loop()
+        async with self._semaphore:
+            self.requests += 1
+            while True:
+                reader, writer = self._reusable()
+                reused = writer is not None
+                if not reused:
+                    reader, writer = await asyncio.wait_for(
+                        asyncio.open_connection(
+                            self.host, self.port, ssl=self.ssl),
+                        self.timeout)
+                    self.connections += 1
+                try:
+                    status, keep_alive, payload = await asyncio.wait_for(
+                        self._exchange(reader, writer, method, path, body),
+                        self.timeout)
+                except asyncio.TimeoutError:
+                    writer.close()
+                    raise
+                except (OSError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused and method in _IDEMPOTENT:
+                        # the server closed the idle connection, try another
+                        continue
+                    raise
+                if keep_alive:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                return status, payload
+
+    def _reusable(self):
+        # an idle connection the server hasn't closed yet
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not reader.at_eof():
+                return reader, writer
+            writer.close()
+        return None, None
+
+    async def _exchange(self, reader, writer, method, path, body):
+        headers = [
+            '%s %s HTTP/1.1' % (method, path),
+            'Host: %s:%d' % (self.host, self.port),
+            'Accept: application/json',
+            'Connection: keep-alive',
+        ]
+        if body is not None:
+            headers.append('Content-Type: application/json;charset=UTF-8')
+            headers.append('Content-Length: %d' % len(body))
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1'))
+        if body is not None:
+            writer.write(body)
+        await writer.drain()
+
+        line = await reader.readline()
+        if not line:
+            raise asyncio.IncompleteReadError(line, None)
+        version, status = line.decode('latin-1').split(None, 2)[:2]
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, value = line.decode('latin-1').split(':', 1)
+            response_headers[name.strip().lower()] = value.strip()
+
+        keep_alive = response_headers.get('connection', '').lower() != 'close'
+        if version == 'HTTP/1.0':
+            keep_alive = response_headers.get(
+                'connection', '').lower() == 'keep-alive'
+        if 'chunked' in response_headers.get('transfer-encoding', ''):
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if not size:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            payload = b''.join(chunks)
+        elif 'content-length' in response_headers:
+            payload = await reader.readexactly(
+                int(response_headers['content-length']))
+        else:
+            payload = await reader.read()
+            keep_alive = False
+        return int(status), keep_alive, payload
+
+
+def _to_w3c_locator(strategy, locator):
+    # W3C only supports CSS selectors, XPath, link text and tag name
+    return to_script_locator(strategy, locator) or (strategy, locator)
+
+
+class _AsyncSearchContext(object):
+
+    async def find_element(self, strategy, locator):
+        """Find an element.
+
+        :param strategy: Location strategy. See :py:class:`~selenium.webdriver.common.by.By` for valid values.
+        :param locator: Location of target element.
+        :type strategy: str
+        :type locator: str
+        :return: An element.
+        :rtype: :py:class:`AsyncElement`
+
+        """
+        strategy, locator = _to_w3c_locator(strategy, locator)
+        return await self._execute(
+            'POST', '/element', {'using': strategy, 'value': locator})
+
+    async def find_elements(self, strategy, locator):
+        """Find elements.
+
+        :param strategy: Location strategy. See :py:class:`~selenium.webdriver.common.by.By` for valid values.
+        :param locator: Location of target elements.
+        :type strategy: str
+        :type locator: str
+        :return: List of :py:class:`AsyncElement`
+        :rtype: list
+
+        """
+        strategy, locator = _to_w3c_locator(strategy, locator)
+        return await self._execute(
+            'POST', '/elements', {'using': strategy, 'value': locator})
+
+
+class AsyncSession(_AsyncSearchContext):
+    """A WebDriver session driven using :py:mod:`asyncio`.
+
+    Usage::
+
+      session = await AsyncSession.create(
+          'http://localhost:4444', {'browserName': 'firefox'})
+      await session.get('https://www.mozilla.org/')
+      await session.quit()
+
+    :param pool: Connection pool for the WebDriver server.
+    :param session_id: Identifier of an existing session.
+    :type pool: :py:class:`ConnectionPool`
+    :type session_id: str
+
+    """
+
+    def __init__(self, pool, session_id):
+        self.pool = pool
+        self.session_id = session_id
+
+    @classmethod
+    async def create(cls, command_executor, capabilities=None, pool=None):
+        """Start a new session.
+
+        :param command_executor: URL of the WebDriver server.
+        :param capabilities: (optional) Capabilities to always match.
+        :param pool: (optional) Connection pool to share with other sessions.
+        :type command_executor: str
+        :type capabilities: dict
+        :type pool: :py:class:`ConnectionPool`
+        :rtype: :py:class:`AsyncSession`
+
+        """
+        pool = pool or ConnectionPool(command_executor)
+        value = await pool.execute('POST', '/session', {
+            'capabilities': {'alwaysMatch': capabilities or {}}})
+        return cls(pool, value['sessionId'])
+
+    def _unwrap(self, value):
+        if isinstance(value, list):
+            return [self._unwrap(v) for v in value]
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return AsyncElement(self, value[ELEMENT_KEY])
+            return dict((k, self._unwrap(v)) for k, v in value.items())
+        return value
+
+    def _wrap(self, value):
+        if isinstance(value, AsyncElement):
+            return {ELEMENT_KEY: value.id}
+        if isinstance(value, (list, tuple)):
+            return [self._wrap(v) for v in value]
+        if isinstance(value, dict):
+            return dict((k, self._wrap(v)) for k, v in value.items())
+        return value
+
+    async def _execute(self, method, path, body=None):
+        return self._unwrap(await self.pool.execute(
+            method, '/session/%s%s' % (self.session_id, path), body))
+
+    async def get(self, url):
+        """Navigate to a URL."""
+        await self._execute('POST', '/url', {'url': url})
+
+    async def current_url(self):
+        """Return the URL of the current page."""
+        return await self._execute('GET', '/url')
+
+    async def title(self):
+        """Return the title of the current page."""
+        return await self._execute('GET', '/title')
+
+    async def execute_script(self, script, *args):
+        """Execute JavaScript synchronously, returning its result."""
+        return await self._execute('POST', '/execute/sync', {
+            'script': script, 'args': self._wrap(list(args))})
+
+    async def execute_async_script(self, script, *args):
+        """Execute JavaScript that calls the callback passed as its last
+        argument, returning the value passed to the callback."""
+        return await self._execute('POST', '/execute/async', {
+            'script': script, 'args': self._wrap(list(args))})
+
+    async def quit(self):
+        """End the session."""
+        await self.pool.execute('DELETE', '/session/%s' % self.session_id)
+
+
+class AsyncElement(_AsyncSearchContext):
+    """An element within an :py:class:`AsyncSession`."""
+
+    def __init__(self, session, id_):
+        self.session = session
+        self.id = id_
+
+    def __repr__(self):
+        return '<%s id=%r>' % (type(self).__name__, self.id)
+
+    def __eq__(self, other):
+        return isinstance(other, AsyncElement) and self.id == other.id
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.id)
+
+    async def _execute(self, method, path, body=None):
+        return await self.session._execute(
+            method, '/element/%s%s' % (self.id, path), body)
+
+    async def get_text(self):
+        """Return the visible text of the element."""
+        return await self._execute('GET', '/text')
+
+    async def get_attribute(self, name):
+        """Return an attribute of the element."""
+        return await self._execute('GET', '/attribute/%s' % name)
+
+    async def get_property(self, name):
+        """Return a property of the element."""
+        return await self._execute('GET', '/property/%s' % name)
+
+    async def is_displayed(self):
+        """Whether the element is visible to a user."""
+        return await self._execute('GET', '/displayed')
+
+    async def is_enabled(self):
+        """Whether the element is enabled."""
+        return await self._execute('GET', '/enabled')
+
+    async def click(self):
+        """Click the element."""
+        await self._execute('POST', '/click', {})
+
+    async def clear(self):
+        """Clear the value of a text entry element."""
+        await self._execute('POST', '/clear', {})
+
+    async def send_keys(self, *value):
+        """Type into the element."""
+        await self._execute('POST', '/value', {'text': ''.join(value)})
+
+
+class AsyncWait(Wait):
+    """An adaptive explicit wait that can be awaited.
+
+    Conditions are callables that take the session, and may return an
+    awaitable, so the conditions in :py:mod:`pypom.conditions` can be used.
+    See :py:class:`~pypom.wait.Wait` for the parameters.
+    """
+
+    async def until(self, method, message=''):
+        """Wait until the method returns a value that is not ``False``.
+
+        :param method: Callable that takes the session as an argument.
+        :param message: (optional) Message for the timeout exception.
+        :return: The result of the last call to ``method``.
+        :raises: :py:class:`~selenium.common.exceptions.TimeoutException`
+
+        """
+        return await self._poll_until(method, message, True)
+
+    async def until_not(self, method, message=''):
+        """Wait until the method returns a value that is ``False``.
+
+        :param method: Callable that takes the session as an argument.
+        :param message: (optional) Message for the timeout exception.
+        :return: The result of the last call to ``method``, or ``True`` if an
+          ignored exception was raised.
+        :raises: :py:class:`~selenium.common.exceptions.TimeoutException`
+
+        """
+        return await self._poll_until(method, message, False)
+
+    async def _poll_until(self, method, message, until):
+        poll = _Poll(self, method, until)
+        while True:
+            try:
+                poll.checked(await _resolve(method(self.driver)))
+            except self.ignored_exceptions as e:
+                poll.ignored(e)
+            if poll.done:
+                return poll.result(message)
+            await asyncio.sleep(poll.delay)
+
+
+class AsyncWebView(_ViewClass):
+
+    WAIT_MIN_INTERVAL = WebView.WAIT_MIN_INTERVAL
+    WAIT_MAX_INTERVAL = WebView.WAIT_MAX_INTERVAL
+    WAIT_BACKOFF = WebView.WAIT_BACKOFF
+    WAIT_IGNORED_EXCEPTIONS = WebView.WAIT_IGNORED_EXCEPTIONS
+
+    def __init__(self, session, timeout):
+        self.session = session
+        self.timeout = timeout
+        self.wait = AsyncWait(
+            self.session, self.timeout,
+            min_interval=self.WAIT_MIN_INTERVAL,
+            max_interval=self.WAIT_MAX_INTERVAL,
+            backoff=self.WAIT_BACKOFF,
+            ignored_exceptions=self.WAIT_IGNORED_EXCEPTIONS)
+
+    async def _search_context(self):
+        return self.session
+
+    async def find_element(self, strategy, locator):
+        """Finds an element on the page.
+
+        :param strategy: Location strategy to use. See :py:class:`~selenium.webdriver.common.by.By` for valid values.
+        :param locator: Location of target element.
+        :type strategy: str
+        :type locator: str
+        :return: An element.
+        :rtype: :py:class:`AsyncElement`
+
+        """
+        context = await self._search_context()
+        return await context.find_element(strategy, locator)
+
+    async def find_elements(self, strategy, locator):
+        """Finds elements on the page.
+
+        :param strategy: Location strategy to use. See :py:class:`~selenium.webdriver.common.by.By` for valid values.
+        :param locator: Location of target elements.
+        :type strategy: str
+        :type locator: str
+        :return: List of :py:class:`AsyncElement`
+        :rtype: list
+
+        """
+        context = await self._search_context()
+        return await context.find_elements(strategy, locator)
+
+    async def is_element_present(self, strategy, locator):
+        """Checks whether an element is present.
+
+        :param strategy: Location strategy to use. See :py:class:`~selenium.webdriver.common.by.By` for valid values.
+        :param locator: Location of target element.
+        :type strategy: str
+        :type locator: str
+        :return: ``True`` if element is present, else ``False``.
+        :rtype: bool
+
+        """
+        try:
+            await self.find_element(strategy, locator)
+            return True
+        except NoSuchElementException:
+            return False
+
+    async def is_element_displayed(self, strategy, locator):
+        """Checks whether an element is displayed.
+
+        :param strategy: Location strategy to use. See :py:class:`~selenium.webdriver.common.by.By` for valid values.
+        :param locator: Location of target element.
+        :type strategy: str
+        :type locator: str
+        :return: ``True`` if element is displayed, else ``False``.
+        :rtype: bool
+
+        """
+        try:
+            element = await self.find_element(strategy, locator)
+            return await element.is_displayed()
+        except NoSuchElementException:
+            return False
+
+
+class AsyncPage(AsyncWebView):
+    """A page object for :py:mod:`asyncio`.
+
+    Has the same :py:attr:`~pypom.page.Page.URL_TEMPLATE` and
+    :py:attr:`~pypom.page.Page.LOAD_CONDITION` behaviour as
+    :py:class:`~pypom.page.Page`.
+
+    :param session: Session to drive.
+    :param base_url: (optional) Base URL.
+    :param timeout: (optional) Timeout used for explicit waits. Defaults to ``10``.
+    :param url_kwargs: (optional) Keyword arguments used when formatting the :py:attr:`seed_url`.
+    :type session: :py:class:`AsyncSession`
+    :type base_url: str
+    :type timeout: int
+
+    Usage::
+
+      from pypom.aio import AsyncPage, AsyncSession
+
+      class Mozilla(AsyncPage):
+          URL_TEMPLATE = 'https://www.mozilla.org/{locale}'
+
+      session = await AsyncSession.create('http://localhost:4444')
+      page = await Mozilla(session, locale='en-US').open()
+
+    """
+
+    URL_TEMPLATE = None
+    LOAD_CONDITION = None
+
+    base_url = Page.base_url
+    url_kwargs = Page.url_kwargs
+    seed_url = Page.seed_url
+    _url_template_fields = Page._url_template_fields
+
+    _class_checks = (_check_url_template,)
+
+    def __init__(self, session, base_url=None, timeout=10, **url_kwargs):
+        super(AsyncPage, self).__init__(session, timeout)
+        self._seed_url = (None, _UNSET)
+        self.base_url = base_url
+        self.url_kwargs = url_kwargs
+
+    async def open(self):
+        """Open the page.
+
+        Navigates to :py:attr:`seed_url` and awaits :py:func:`wait_for_page_to_load`.
+
+        :return: The current page object.
+        :rtype: :py:class:`AsyncPage`
+        :raises: UsageError
+
+        """
+        seed_url = self.seed_url
+        if not seed_url:
+            raise UsageError(
+                'Set a base URL or URL_TEMPLATE to open this page.')
+        await self.session.get(seed_url)
+        await self.wait_for_page_to_load()
+        return self
+
+    async def wait_for_page_to_load(self):
+        """Wait for the page to load.
+
+        If :py:attr:`LOAD_CONDITION` is set, this waits until it is met.
+        Override to wait for a different condition.
+
+        :return: The current page object.
+        :rtype: :py:class:`AsyncPage`
+
+        """
+        if self.LOAD_CONDITION is not None:
+            await self.wait.until(
+                self.LOAD_CONDITION, 'Timed out waiting for page to load.')
+        return self
+
+
+class AsyncRegion(AsyncWebView):
+    """A page region object for :py:mod:`asyncio`.
+
+    Awaiting a region waits for it to load and returns the region, and
+    :py:attr:`root` must also be awaited.
+
+    :param page: Page object this region appears in.
+    :param root: (optional) element that serves as the root for the region.
+    :type page: :py:class:`AsyncPage`
+    :type root: :py:class:`AsyncElement`
+
+    Usage::
+
+      from pypom.aio import AsyncRegion
+      from selenium.webdriver.common.by import By
+
+      class Header(AsyncRegion):
+          _root_locator = (By.ID, 'header')
+          _title_locator = (By.CLASS_NAME, 'title')
+
+          async def title(self):
+              element = await self.find_element(*self._title_locator)
+              return await element.get_text()
+
+      header = await Header(page)
+
+    """
+
+    _root_locator = None
+
+    def __init__(self, page, root=None):
+        super(AsyncRegion, self).__init__(page.session, page.timeout)
+        self._root = root
+        self.page = page
+
+    def __await__(self):
+        return self.wait_for_region_to_load().__await__()
+
+    @property
+    def root(self):
+        """Awaitable root element for the region.
+
+        :return: An element, or ``None`` for a region without a root.
+        :rtype: :py:class:`AsyncElement`
+
+        """
+        return self._find_root()
+
+    async def _find_root(self):
+        if self._root is None and self._root_locator is not None:
+            return await self.page.find_element(*self._root_locator)
+        return self._root
+
+    async def _search_context(self):
+        root = await self.root
+        return root if root is not None else self.session
+
+    async def wait_for_region_to_load(self):
+        """Wait for the page region to load.
+
+        Awaited when the region is awaited. Override to wait for a condition.
+
+        :return: The current page region object.
+        :rtype: :py:class:`AsyncRegion`
+
+        """
+        return self
@@ -0,0 +1,68 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""Conditions that can be used with :py:attr:`~pypom.page.Page.LOAD_CONDITION`.
+
+Each condition is a callable that takes a WebDriver object, so they can also
+be passed to :py:attr:`~pypom.page.Page.wait`.
+"""
+
+from . import scripts
+
+
+class ScriptCondition(object):
+    """A custom JavaScript predicate.
+
+    Evaluates to the value returned by the script.
+
+    :param script: JavaScript to execute. It must ``return`` a value.
+    :param args: (optional) Arguments passed to the script.
+    :type script: str
+
+    Usage::
+
+      ScriptCondition('return window.app && window.app.ready;')
+
+    """
+
+    def __init__(self, script, *args):
+        self.script = script
+        self.args = args
+
+    def __call__(self, driver):
+        return driver.execute_script(self.script, *self.args)
+
+
+class DocumentReady(ScriptCondition):
+    """The document and all of its resources have finished loading.
+
+    Evaluates to ``True`` when ``document.readyState`` is ``'complete'``.
+    """
+
+    def __init__(self):
+        super(DocumentReady, self).__init__(scripts.DOCUMENT_READY)
+
+
+class NetworkIdle(ScriptCondition):
+    """The document has loaded and there has been no network activity.
+
+    Evaluates to ``True`` when ``document.readyState`` is ``'complete'``, no
+    requests made using ``XMLHttpRequest`` or ``fetch`` are pending, and no
+    resource has finished loading within ``idle_time`` seconds.
+
+    Requests are counted by patching ``XMLHttpRequest`` and ``fetch`` the
+    first time the condition is evaluated in a document. A request started
+    before then isn't seen as pending, so the condition can be ``True``
+    while it's in flight; it's only taken into account once it finishes.
+    With the ``eager`` or ``none`` page load strategy it's first evaluated
+    while the document is still loading, so fewer requests are missed.
+
+    :param idle_time: (optional) Seconds without network activity. Defaults to ``0.5``.
+    :type idle_time: float
+    """
+
+    def __init__(self, idle_time=0.5):
+        super(NetworkIdle, self).__init__(
+            scripts.NETWORK_IDLE, int(idle_time * 1000))
+        self.idle_time = idle_time
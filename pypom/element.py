@@ -0,0 +1,246 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import copy
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.remote.webelement import WebElement
+
+
+class _ResolvingElement(WebElement):
+    """A web element that finds itself again when it becomes stale.
+
+    ``_resolve`` finds the element again from the page, through the root
+    elements of any regions it's in, and is called up to ``_retries`` times.
+    Elements are wrapped by :py:func:`_resolving`, which keeps their class.
+    """
+
+    def _retry(self, method, *args):
+        attempts = 0
+        while True:
+            try:
+                return method(*args)
+            except StaleElementReferenceException:
+                if attempts >= self._retries:
+                    raise
+                attempts += 1
+                try:
+                    self._id = self._resolve().id
+                except StaleElementReferenceException:
+                    # the document is still changing, try again
+                    pass
+
+    def _execute(self, command, params=None):
+        return self._retry(
+            super(_ResolvingElement, self)._execute, command, params)
+
+    def get_attribute(self, name):
+        return self._retry(super(_ResolvingElement, self).get_attribute, name)
+
+    def is_displayed(self):
+        return self._retry(super(_ResolvingElement, self).is_displayed)
+
+
+_resolving_classes = {WebElement: _ResolvingElement}
+
+
+def _resolving_class(cls):
+    """Return a subclass of element class ``cls`` that retries when stale."""
+    if issubclass(cls, _ResolvingElement):
+        return cls
+    try:
+        return _resolving_classes[cls]
+    except KeyError:
+        resolving = _resolving_classes[cls] = type(
+            str('Resolving%s' % cls.__name__), (_ResolvingElement, cls), {})
+        return resolving
+
+
+def _resolving(view, element, find, locator, retries):
+    """Wrap an element so that it's found again using ``find`` when stale.
+
+    The wrapper is a copy of the element, so it keeps the class the driver
+    created it with and any other state, such as Selenium 3's ``w3c`` flag.
+    Retries are reported to the listeners of ``view``.
+    """
+    if not isinstance(element, WebElement):
+        return element
+
+    def resolve():
+        return view._dispatcher.retry(type(view), locator, find)
+    element = copy.copy(element)
+    element.__class__ = _resolving_class(type(element))
+    element._resolve = resolve
+    element._retries = retries
+    return element
+
+
+def _nth(find_all, index, locator):
+    """Return a callable that finds the element at ``index`` again."""
+    def find():
+        elements = find_all()
+        if index >= len(elements):
+            raise StaleElementReferenceException(
+                'Element %d of %r is no longer present' % (index, locator))
+        return elements[index]
+    return find
+
+
+def _resolving_all(view, elements, find_all, locator, retries):
+    """Wrap each element of a list so that it's found again by its index."""
+    return [_resolving(view, element, _nth(find_all, index, locator),
+                       locator, retries)
+            for index, element in enumerate(elements)]
+
+
+class _Locator(object):
+
+    def __init__(self, strategy, locator):
+        self.strategy = strategy
+        self.locator = locator
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        generation = instance.generation
+        try:
+            memo_generation, value = instance._memo[self]
+            if memo_generation == generation:
+                return value
+        except KeyError:
+            pass
+        value = self._find(instance)
+        instance._memo[self] = (generation, value)
+        return value
+
+
+class Element(_Locator):
+    """Descriptor for an element found using a locator.
+
+    The element is found within the page, or within the root element of a
+    region, the first time the attribute is read. It's then remembered until
+    the page is opened again, or :py:func:`~pypom.page.Page.refresh_elements`
+    is called. If the element becomes stale it's found again automatically.
+
+    :param strategy: Location strategy to use. See :py:class:`~selenium.webdriver.common.by.By` for valid values.
+    :param locator: Location of target element.
+    :type strategy: str
+    :type locator: str
+
+    Usage::
+
+      from pypom import Element, Page
+      from selenium.webdriver.common.by import By
+
+      class Mozilla(Page):
+          logo = Element(By.ID, 'logo')
+
+          @property
+          def is_logo_displayed(self):
+              return self.logo.is_displayed()
+
+    """
+
+    def _find(self, view):
+        def find():
+            return view.find_element(self.strategy, self.locator)
+        return _resolving(view, find(), find, (self.strategy, self.locator),
+                          max(1, view.STALE_RETRIES))
+
+
+class Elements(_Locator):
+    """Descriptor for a list of elements found using a locator.
+
+    Behaves like :py:class:`Element`, but the value is a list of all matching
+    elements.
+
+    :param strategy: Location strategy to use. See :py:class:`~selenium.webdriver.common.by.By` for valid values.
+    :param locator: Location of target elements.
+    :type strategy: str
+    :type locator: str
+
+    Usage::
+
+      from pypom import Elements, Page
+      from selenium.webdriver.common.by import By
+
+      class Results(Page):
+          results = Elements(By.CLASS_NAME, 'result')
+
+          @property
+          def result_count(self):
+              return len(self.results)
+
+    """
+
+    def _find(self, view):
+        def find_all():
+            return view.find_elements(self.strategy, self.locator)
+        return _resolving_all(view, find_all(), find_all,
+                              (self.strategy, self.locator),
+                              max(1, view.STALE_RETRIES))
+
+
+class Field(_Locator):
+    """Descriptor for a value read from an element found using a locator.
+
+    Reading the attribute finds the element within the page, or within the
+    root element of a region, and returns its visible text, the value of one
+    of its attributes, or whether it's displayed. Use
+    :py:func:`~pypom.page.Page.extract` to read several fields with a single
+    command.
+
+    :param strategy: Location strategy to use. See :py:class:`~selenium.webdriver.common.by.By` for valid values.
+    :param locator: Location of target element.
+    :param attribute: (optional) Name of the attribute or property to read instead of the text.
+    :param displayed: (optional) Read whether the element is displayed instead of the text.
+    :param many: (optional) Read a list of values, one for each matching element.
+    :type strategy: str
+    :type locator: str
+    :type attribute: str
+    :type displayed: bool
+    :type many: bool
+
+    The value is ``None`` if no element is found, or an empty list when
+    ``many`` is set.
+
+    Usage::
+
+      from pypom import Field, Region
+      from selenium.webdriver.common.by import By
+
+      class Profile(Region):
+          _root_locator = (By.ID, 'profile')
+          name = Field(By.CLASS_NAME, 'name')
+          email = Field(By.NAME, 'email', attribute='value')
+          verified = Field(By.CLASS_NAME, 'verified', displayed=True)
+          roles = Field(By.CSS_SELECTOR, '.roles li', many=True)
+
+      assert profile.extract() == {
+          'name': 'Ada', 'email': 'ada@example.com', 'verified': True,
+          'roles': ['admin', 'editor']}
+
+    """
+
+    def __init__(self, strategy, locator, attribute=None, displayed=False,
+                 many=False):
+        super(Field, self).__init__(strategy, locator)
+        self.attribute = attribute
+        self.displayed = displayed
+        self.many = many
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance._dispatcher.call(
+            owner, 'extract', (self.strategy, self.locator),
+            instance._extract, {0: self})[0]
+
+    def _read(self, element):
+        # read the value of an element found by the page or region
+        if self.displayed:
+            return element.is_displayed()
+        if self.attribute is not None:
+            return element.get_attribute(self.attribute)
+        return element.text
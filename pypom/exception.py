@@ -6,3 +6,8 @@
 class UsageError(Exception):
     """PyPOM usage error."""
     pass
+
+
+class LocatorWarning(UserWarning):
+    """A locator of a page or region class couldn't be checked."""
+    pass
@@ -0,0 +1,223 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""Instrumentation of the commands PyPOM sends to the browser.
+
+Listeners are callables that are passed a :py:class:`CommandEvent` after each
+command made through a page or region, such as finding an element, opening
+the page, or waiting for a condition. They're registered using
+:py:attr:`~pypom.page.Page.LISTENERS` or :py:attr:`~pypom.page.Page.listeners`.
+"""
+
+from collections import namedtuple
+from functools import wraps
+import logging
+import threading
+
+from .wait import _clock
+
+logger = logging.getLogger(__name__)
+
+
+class CommandEvent(namedtuple('CommandEvent', [
+        'view', 'method', 'locator', 'duration', 'error', 'retries'])):
+    """A command made through a page or region.
+
+    Contains the page or region class as ``view``, the name of the ``method``
+    called, the ``locator`` used (or the URL for
+    :py:func:`~pypom.page.Page.open`, and the condition for waits), the
+    ``duration`` in seconds, the exception raised as ``error``, or ``None``
+    if the command succeeded, and the number of times a stale element was
+    found again as ``retries``.
+
+    Commands made while handling another command, such as finding the root
+    element of a region while finding an element within it, are included in
+    the duration of the outer command and are not reported separately.
+    Elements that are found again outside of a command, for example when
+    clicking an element that became stale, are reported with the ``method``
+    ``'retry'``.
+    """
+    __slots__ = ()
+
+
+class LocatorStatistics(namedtuple('LocatorStatistics', [
+        'locator', 'calls', 'total', 'slowest', 'retries'])):
+    """Aggregated commands for a locator."""
+    __slots__ = ()
+
+
+class ViewStatistics(namedtuple('ViewStatistics', ['view', 'calls', 'total'])):
+    """Aggregated commands for a page or region class."""
+    __slots__ = ()
+
+
+class _Dispatcher(object):
+    """Sends command events to listeners, shared by a page and its regions."""
+
+    def __init__(self, listeners):
+        self.listeners = list(listeners)
+        self.active = False
+        self.retries = 0
+
+    def call(self, view, method, locator, func, *args):
+        # view is the page or region class making the command
+        if self.active or not self.listeners:
+            return func(*args)
+        self.active = True
+        self.retries = 0
+        start = _clock()
+        error = None
+        try:
+            return func(*args)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.active = False
+            event = CommandEvent(
+                view, method, locator, _clock() - start, error, self.retries)
+            for listener in self.listeners:
+                if error is None:
+                    listener(event)
+                    continue
+                try:
+                    listener(event)
+                except Exception:
+                    # don't replace the error of the command
+                    logger.exception('Listener %r failed', listener)
+
+    def retry(self, view, locator, func, *args):
+        # find a stale element again, counting it against the current command
+        def counted(*args):
+            self.retries += 1
+            return func(*args)
+        return self.call(view, 'retry', locator, counted, *args)
+
+
+def _locator(args):
+    if len(args) == 2:
+        return tuple(args)
+    if len(args) == 1 and isinstance(args[0], dict):
+        return tuple(sorted(tuple(v) for v in args[0].values()))
+    return args[0] if args else None
+
+
+def instrumented(func):
+    """Decorate a page or region method so that it's reported to listeners."""
+    method = func.__name__
+
+    if func.__code__.co_argcount == 3:
+        # lookups by strategy and locator are the hottest path, and passing
+        # their arguments on by name avoids packing them in a tuple
+        @wraps(func)
+        def lookup(self, strategy, locator):
+            dispatcher = self._dispatcher
+            if not dispatcher.listeners or dispatcher.active:
+                return func(self, strategy, locator)
+            return dispatcher.call(
+                type(self), method, (strategy, locator), func, self,
+                strategy, locator)
+        return lookup
+
+    @wraps(func)
+    def wrapper(self, *args):
+        dispatcher = self._dispatcher
+        if not dispatcher.listeners or dispatcher.active:
+            return func(self, *args)
+        return dispatcher.call(
+            type(self), method, _locator(args), func, self, *args)
+    return wrapper
+
+
+class CommandStatistics(object):
+    """Listener that aggregates command events.
+
+    Usage::
+
+      import pytest
+      from pypom import Page
+      from pypom.instrumentation import CommandStatistics
+
+      @pytest.fixture
+      def statistics():
+          statistics = CommandStatistics()
+          Page.LISTENERS = (statistics,)
+          yield statistics
+          Page.LISTENERS = ()
+          print(statistics.report())
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Discard all aggregated events."""
+        with self._lock:
+            self._locators = {}
+            self._views = {}
+
+    def __call__(self, event):
+        with self._lock:
+            calls, total, slowest, retries = self._locators.get(
+                event.locator, (0, 0.0, 0.0, 0))
+            self._locators[event.locator] = (
+                calls + 1, total + event.duration,
+                max(slowest, event.duration), retries + event.retries)
+            calls, total = self._views.get(event.view, (0, 0.0))
+            self._views[event.view] = (calls + 1, total + event.duration)
+
+    def slowest_locators(self, count=10):
+        """Locators that commands spent the most time on.
+
+        :param count: (optional) Maximum number of locators. Defaults to ``10``.
+        :type count: int
+        :return: :py:class:`LocatorStatistics` with the number of ``calls``,
+          ``total`` time, ``slowest`` call, and number of stale element
+          ``retries``, ordered by total time.
+        :rtype: list
+
+        """
+        with self._lock:
+            stats = [LocatorStatistics(locator, *values)
+                     for locator, values in self._locators.items()]
+        stats.sort(key=lambda s: s.total, reverse=True)
+        return stats[:count]
+
+    def most_called_views(self, count=10):
+        """Page and region classes that made the most commands.
+
+        :param count: (optional) Maximum number of classes. Defaults to ``10``.
+        :type count: int
+        :return: :py:class:`ViewStatistics` with the number of ``calls`` and
+          ``total`` time, ordered by number of calls.
+        :rtype: list
+
+        """
+        with self._lock:
+            stats = [ViewStatistics(view, *values)
+                     for view, values in self._views.items()]
+        stats.sort(key=lambda s: s.calls, reverse=True)
+        return stats[:count]
+
+    def report(self, count=10):
+        """Summarise the aggregated events as text.
+
+        :param count: (optional) Number of entries in each section. Defaults to ``10``.
+        :type count: int
+        :rtype: str
+
+        """
+        lines = ['Slowest locators:']
+        for stat in self.slowest_locators(count):
+            lines.append('  %8.3fs %5d calls %8.3fs slowest %3d retries  %r' % (
+                stat.total, stat.calls, stat.slowest, stat.retries,
+                stat.locator))
+        lines.append('Most called pages and regions:')
+        for stat in self.most_called_views(count):
+            lines.append('  %5d calls %8.3fs  %s.%s' % (
+                stat.calls, stat.total, stat.view.__module__,
+                stat.view.__name__))
+        return '\n'.join(lines)
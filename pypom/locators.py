@@ -0,0 +1,154 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import re
+
+from selenium.webdriver.common.by import By
+
+from .exception import UsageError
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+_TAG_NAME = re.compile(r'^[A-Za-z][A-Za-z0-9-]*$')
+_STRATEGIES = frozenset(
+    value for name, value in vars(By).items() if name.isupper())
+_STRING_TYPES = (str, type(u''))
+_CLOSING = {'(': ')', '[': ']'}
+_COMBINATORS = '>+~'
+
+
+def _css_string(value):
+    return '"%s"' % value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def to_script_locator(strategy, locator):
+    """Translate a locator into one that can be resolved from JavaScript.
+
+    CSS selector and XPath locators are returned unchanged. Locators using the
+    id, name, class name and tag name strategies are translated into
+    equivalent CSS selectors.
+
+    :param strategy: Location strategy. See :py:class:`~selenium.webdriver.common.by.By` for valid values.
+    :param locator: Location of target element.
+    :type strategy: str
+    :type locator: str
+    :return: ``(strategy, locator)`` tuple using either the CSS selector or
+      XPath strategy, or ``None`` if the locator can't be expressed in either.
+    :rtype: tuple
+
+    """
+    if strategy in (By.CSS_SELECTOR, By.XPATH):
+        return strategy, locator
+    if strategy == By.ID:
+        return By.CSS_SELECTOR, '[id=%s]' % _css_string(locator)
+    if strategy == By.NAME:
+        return By.CSS_SELECTOR, '[name=%s]' % _css_string(locator)
+    if strategy == By.CLASS_NAME and locator and ' ' not in locator:
+        return By.CSS_SELECTOR, '[class~=%s]' % _css_string(locator)
+    if strategy == By.TAG_NAME and _TAG_NAME.match(locator):
+        return By.CSS_SELECTOR, locator
+    return None
+
+
+def _css_syntax_error(selector):
+    # a conservative check that never rejects a selector a browser accepts
+    stack = []
+    quote = None
+    escaped = False
+    part = ''
+    parts = []
+    for char in selector:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif quote is not None:
+            if char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in _CLOSING:
+            stack.append(_CLOSING[char])
+        elif char in ')]':
+            if not stack or stack.pop() != char:
+                return 'unbalanced %r' % char
+        elif char == ',' and not stack:
+            parts.append(part)
+            part = ''
+            continue
+        part += char
+    if quote is not None:
+        return 'unterminated string'
+    if stack:
+        return 'missing %r' % stack[-1]
+    parts.append(part)
+    for part in parts:
+        part = part.strip()
+        if not part:
+            return 'empty selector'
+        if part[0] in _COMBINATORS or part[-1] in _COMBINATORS:
+            return 'dangling combinator'
+    return None
+
+
+def _xpath_syntax_error(xpath):
+    if not xpath.strip():
+        return 'empty expression'
+    if etree is None or '{' in xpath or '%' in xpath:
+        # lxml is optional, and can't compile templates that are formatted
+        # before use
+        return None
+    try:
+        etree.XPath(xpath)
+    except etree.XPathSyntaxError as e:
+        return str(e)
+    return None
+
+
+def _known_strategy(strategy, strategies=()):
+    custom = getattr(By, '_custom_finders', {}).values()
+    return any([
+        strategy in _STRATEGIES, strategy in custom, strategy in strategies])
+
+
+def check_locator(strategy, locator, strategies=()):
+    """Check that a locator is well formed, without using a browser.
+
+    The strategy must be one of those in
+    :py:class:`~selenium.webdriver.common.by.By`, including any registered
+    custom finders, or in ``strategies``. CSS selectors are checked for
+    balanced brackets and quotes, and empty selectors or dangling
+    combinators. XPath is compiled using `lxml <http://lxml.de/>`_ when it's
+    installed. Locators containing format fields are accepted, as long as
+    the brackets in them are balanced.
+
+    :param strategy: Location strategy. See :py:class:`~selenium.webdriver.common.by.By` for valid values.
+    :param locator: Location of target element.
+    :param strategies: (optional) Additional strategies to accept.
+    :type strategy: str
+    :type locator: str
+    :type strategies: iterable
+    :raises: UsageError
+
+    """
+    if not _known_strategy(strategy, strategies):
+        raise UsageError('Unknown location strategy %r.' % (strategy,))
+    if not isinstance(locator, _STRING_TYPES):
+        raise UsageError('Locator %r must be a string.' % (locator,))
+    if strategy == By.CSS_SELECTOR:
+        error = _css_syntax_error(locator)
+    elif strategy == By.XPATH:
+        error = _xpath_syntax_error(locator)
+    elif strategy == By.CLASS_NAME and (not locator or ' ' in locator.strip()):
+        error = 'a single class name is required'
+    elif strategy in _STRATEGIES and not locator:
+        error = 'empty locator'
+    else:
+        error = None
+    if error is not None:
+        raise UsageError('Invalid locator %s=%r: %s.' % (
+            strategy, locator, error))
@@ -2,10 +2,16 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+from contextlib import contextmanager
+from string import Formatter
 import sys
 
 from .exception import UsageError
-from .view import WebView
+from .instrumentation import _Dispatcher
+from . import scripts
+from .snapshot import Snapshot
+from .view import WebView, _frame_context
+from .wait import _clock
 
 if sys.version_info >= (3,):
     from urllib.parse import urljoin
@@ -13,6 +19,34 @@ else:
     from urlparse import urljoin
 
 
+def _url_template_fields(template):
+    """Return the names of the keyword arguments used by a URL template."""
+    fields = set()
+    if template is None:
+        return frozenset(fields)
+    try:
+        for literal, field, spec, conversion in Formatter().parse(template):
+            if field is None:
+                continue
+            name = field.split('.')[0].split('[')[0]
+            if not name or name.isdigit():
+                raise UsageError(
+                    'URL_TEMPLATE %r must only use named fields.' % template)
+            fields.add(name)
+    except ValueError as e:
+        raise UsageError('URL_TEMPLATE %r is invalid: %s' % (template, e))
+    return frozenset(fields)
+
+
+def _check_url_template(cls):
+    # check the template of a page class, and remember its fields
+    cls._url_template = (
+        cls.URL_TEMPLATE, _url_template_fields(cls.URL_TEMPLATE))
+
+
+_UNSET = object()
+
+
 class Page(WebView):
     """A page object.
 
@@ -56,10 +90,104 @@ class Page(WebView):
 
     """
 
+    LOAD_CONDITION = None
+    """Condition that is waited for by :py:func:`wait_for_page_to_load`.
+
+    When set, :py:func:`wait_for_page_to_load` waits until the condition is
+    met, checking it frequently at first and then less often. Conditions are
+    available in :py:mod:`pypom.conditions`.
+
+    Examples::
+
+        LOAD_CONDITION = DocumentReady()  # document.readyState is complete
+        LOAD_CONDITION = NetworkIdle(0.5)  # no network activity for 500ms
+        LOAD_CONDITION = ScriptCondition('return window.app.ready;')
+
+    """
+
+    LISTENERS = ()
+    """Listeners registered with every instance of the page.
+
+    Each listener is a callable that's passed a
+    :py:class:`~pypom.instrumentation.CommandEvent` for each command made
+    through the page or its regions. Listeners can also be added to
+    :py:attr:`listeners` for a single instance.
+
+    Example::
+
+        statistics = CommandStatistics()
+        Page.LISTENERS = (statistics,)
+
+    """
+
+    URL_CHECK_INTERVAL = None
+    """Seconds between checks for changes to the URL of the document.
+
+    By default the :py:attr:`generation` of the document only changes when
+    the page is opened or :py:func:`invalidate` is called. When set, the
+    current URL is compared with the last one seen whenever the generation is
+    read, which happens each time a remembered element is used, but at most
+    once per interval. If the URL has changed, for example because a link
+    was clicked, the generation is incremented so that remembered elements
+    are found again. Checking the URL costs a command, so ``0`` checks on
+    every use.
+
+    Example::
+
+        URL_CHECK_INTERVAL = 1  # check at most once a second
+
+    """
+
+    _class_checks = (_check_url_template,)
+
     def __init__(self, selenium, base_url=None, timeout=10, **url_kwargs):
         super(Page, self).__init__(selenium, timeout)
+        self._dispatcher = _Dispatcher(self.LISTENERS)
+        self._seed_url = (None, _UNSET)
         self.base_url = base_url
         self.url_kwargs = url_kwargs
+        self._generation = 0
+        self._snapshot = None
+        self._frames = _frame_context(selenium)
+        self._url = None
+        self._url_checked = None
+
+    @property
+    def base_url(self):
+        """Base URL used when formatting the :py:attr:`seed_url`."""
+        return self._base_url
+
+    @base_url.setter
+    def base_url(self, value):
+        self._base_url = value
+        self._seed_url = (None, _UNSET)
+
+    @property
+    def url_kwargs(self):
+        """Keyword arguments used when formatting the :py:attr:`seed_url`.
+
+        Assigning new keyword arguments is checked against
+        :py:attr:`URL_TEMPLATE`, and raises :py:class:`~pypom.exception.UsageError`
+        if any are missing. Changes made to the dictionary in place are not
+        noticed, so assign a new dictionary instead.
+        """
+        return self._url_kwargs
+
+    @url_kwargs.setter
+    def url_kwargs(self, value):
+        missing = self._url_template_fields().difference(value)
+        if missing:
+            raise UsageError('Missing keyword arguments for URL_TEMPLATE: %s' %
+                             ', '.join(sorted(missing)))
+        self._url_kwargs = value
+        self._seed_url = (None, _UNSET)
+
+    def _url_template_fields(self):
+        template, fields = self._url_template
+        if template is not self.URL_TEMPLATE:
+            # the template was changed after the class was created
+            fields = _url_template_fields(self.URL_TEMPLATE)
+        return fields
 
     @property
     def seed_url(self):
@@ -67,16 +195,23 @@ class Page(WebView):
 
         The URL is formatted from :py:attr:`URL_TEMPLATE`, which is then
         appended to :py:attr:`base_url` unless the template results in an
-        absolute URL.
+        absolute URL. The result is remembered until :py:attr:`base_url` or
+        :py:attr:`url_kwargs` are assigned new values.
 
         :return: URL that can be used to open the page.
         :rtype: str
 
         """
-        if self.URL_TEMPLATE is not None:
-            return urljoin(self.base_url,
-                           self.URL_TEMPLATE.format(**self.url_kwargs))
-        return self.base_url
+        template, seed_url = self._seed_url
+        if seed_url is _UNSET or template is not self.URL_TEMPLATE:
+            template = self.URL_TEMPLATE
+            if template is not None:
+                seed_url = urljoin(self.base_url,
+                                   template.format(**self.url_kwargs))
+            else:
+                seed_url = self.base_url
+            self._seed_url = (template, seed_url)
+        return seed_url
 
     def open(self):
         """Open the page.
@@ -88,12 +223,130 @@ class Page(WebView):
         :raises: UsageError
 
         """
-        if self.seed_url:
-            self.selenium.get(self.seed_url)
-            self.wait_for_page_to_load()
-            return self
+        seed_url = self.seed_url
+        if seed_url:
+            return self._dispatcher.call(
+                type(self), 'open', seed_url, self._open, seed_url)
         raise UsageError('Set a base URL or URL_TEMPLATE to open this page.')
 
+    def _open(self, seed_url):
+        self.selenium.get(seed_url)
+        self._frames.reset()
+        self._generation += 1
+        self.wait_for_page_to_load()
+        self._url = None
+        if self.URL_CHECK_INTERVAL is not None:
+            self._check_url(_clock())
+        return self
+
+    @property
+    def generation(self):
+        """Generation of the document the page is showing.
+
+        Starts at ``0``, and is incremented each time the page is opened, the
+        URL is seen to change (see :py:attr:`URL_CHECK_INTERVAL`), or
+        :py:func:`invalidate` is called. Elements remembered by the page and
+        its regions, such as cached root elements and
+        :py:class:`~pypom.element.Element` attributes, are found again when
+        the generation changes.
+
+        :rtype: int
+
+        """
+        self._check_generation()
+        return self._generation
+
+    def _check_generation(self):
+        # see whether the page has a new document, if it's time to check
+        interval = self.URL_CHECK_INTERVAL
+        if interval is not None and self._snapshot is None:
+            now = _clock()
+            if self._url_checked is None or now - self._url_checked >= interval:
+                self._check_url(now)
+
+    def _check_url(self, now):
+        url = self.selenium.current_url
+        self._url_checked = now
+        if self._url is not None and url != self._url:
+            self._generation += 1
+            self._frames.forget()
+        self._url = url
+
+    def invalidate(self):
+        """Discard everything remembered about the document.
+
+        Increments the :py:attr:`generation`, so that elements remembered by
+        the page and its regions are found again when next used. Call this
+        after an action that replaces the document without changing its URL.
+
+        If regions in frames have been used, the driver is switched back to
+        the top level document before the next command, as the frame it was
+        in may have been removed.
+
+        :return: The current page object.
+        :rtype: :py:class:`Page`
+
+        """
+        self._generation += 1
+        self._frames.forget()
+        return self
+
+    @property
+    def frame_switches(self):
+        """Number of commands made to switch between frames.
+
+        Counts switches made for regions in frames, which set
+        ``_frame_locator``, including those to return to the top level
+        document. The frame the driver is in is shared by every page using
+        the driver, so the count includes switches made by other pages.
+        """
+        return self._frames.switches
+
+    @property
+    def frame_switches_skipped(self):
+        """Number of times a region in a frame was used without switching,
+        because the driver was already in its frame."""
+        return self._frames.skipped
+
+    @contextmanager
+    def snapshot(self):
+        """Read the page from a copy of the document instead of the browser.
+
+        The HTML of the document, including the current values of form
+        fields and whether they're checked or selected, is fetched with a
+        single command when the context is entered. Within the context,
+        elements found through the page and its regions are read-only
+        :py:class:`~pypom.snapshot.SnapshotElement` objects, found using CSS
+        selectors or XPath on the copy. Reading their text and attributes
+        doesn't involve the browser. Elements found before the context are
+        found again within it, and again after it.
+
+        Requires `lxml <http://lxml.de/>`_ and `cssselect
+        <https://cssselect.readthedocs.io/>`_.
+
+        :return: Context manager for the :py:class:`~pypom.snapshot.Snapshot`.
+
+        Usage::
+
+          with page.snapshot():
+              assert page.header.title == 'Mozilla'
+              assert len(page.results) == 10
+
+        """
+        if self._snapshot is not None:
+            yield self._snapshot
+            return
+        html = self._dispatcher.call(
+            type(self), 'snapshot', None, self.selenium.execute_script,
+            scripts.DOCUMENT_HTML)
+        self._snapshot = Snapshot(html)
+        self._generation += 1
+        try:
+            yield self._snapshot
+        finally:
+            self._snapshot = None
+            self._generation += 1
+
     def wait_for_page_to_load(self):
         """Wait for the page to load.
 
@@ -122,5 +375,10 @@ class Page(WebView):
             # wait for the seed_url value to be in the current URL
             self.wait.until(lambda s: self.seed_url in s.current_url)
 
+        If :py:attr:`LOAD_CONDITION` is set, this waits until it is met.
+
         """
+        if self.LOAD_CONDITION is not None:
+            self.wait.until(
+                self.LOAD_CONDITION, 'Timed out waiting for page to load.')
         return self
@@ -0,0 +1,216 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""Run a page workflow across several WebDriver sessions at once."""
+
+from collections import namedtuple
+import threading
+
+from selenium.common.exceptions import WebDriverException
+
+from .exception import UsageError
+from .wait import _clock
+
+try:
+    import queue
+except ImportError:  # Python 2
+    import Queue as queue
+
+try:
+    from selenium.common.exceptions import InvalidSessionIdException
+except ImportError:  # Selenium < 3.8
+    InvalidSessionIdException = WebDriverException
+
+
+def _session_lost(error):
+    # whether the session can't run any more workflows: more specific errors,
+    # such as an element not being found, are failures of the workflow
+    return any([
+        isinstance(error, InvalidSessionIdException),
+        type(error) is WebDriverException])
+
+
+class SessionResult(namedtuple('SessionResult', [
+        'url_kwargs', 'value', 'error', 'duration', 'session'])):
+    """Outcome of running the workflow for a single set of URL arguments.
+
+    Contains the ``url_kwargs`` the page was created with, the ``value``
+    returned by the callable (or ``None``), the exception raised as ``error``,
+    or ``None`` if the workflow succeeded, the ``duration`` in seconds, and the
+    index of the ``session`` it ran on, or ``None`` if every session was lost
+    before it could run.
+    """
+    __slots__ = ()
+
+
+class PoolStatistics(namedtuple('PoolStatistics', [
+        'completed', 'failed', 'elapsed', 'sessions'])):
+    """Throughput of a :py:class:`SessionPool` run.
+
+    Contains the number of workflows ``completed`` (including those that
+    ``failed``), the ``elapsed`` time in seconds from the start of the run
+    until it finished (or until now while it's running), and the number of
+    workflows completed by each session as ``sessions``.
+    """
+    __slots__ = ()
+
+    @property
+    def throughput(self):
+        """Workflows completed per second."""
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+
+class SessionPool(object):
+    """Drives copies of a page object concurrently, one thread per session.
+
+    Usage::
+
+      from pypom.pool import SessionPool
+
+      pool = SessionPool([webdriver.Firefox() for i in range(4)])
+      locales = [{'locale': l} for l in ('en-US', 'de', 'fr')]
+      for result in pool.run(Home, locales, lambda page: page.title,
+                             base_url='https://www.mozilla.org'):
+          print(result.url_kwargs, result.error or result.value)
+
+    The sessions are not started or quit by the pool.
+
+    :param sessions: WebDriver objects to run workflows on.
+    :type sessions: list
+
+    """
+
+    def __init__(self, sessions):
+        self.sessions = list(sessions)
+        if not self.sessions:
+            raise UsageError('A session pool needs at least one session.')
+        self._lock = threading.Lock()
+        self._start = self._end = None
+        self._total = self._active = 0
+        self._completed = self._failed = 0
+        self._counts = [0] * len(self.sessions)
+
+    @property
+    def statistics(self):
+        """:py:class:`PoolStatistics` for the current or most recent run."""
+        with self._lock:
+            if self._start is None:
+                elapsed = 0.0
+            else:
+                end = _clock() if self._end is None else self._end
+                elapsed = end - self._start
+            return PoolStatistics(
+                self._completed, self._failed, elapsed, tuple(self._counts))
+
+    def run(self, page_class, url_kwargs, func=None, base_url=None,
+            timeout=10):
+        """Open a page for each set of URL arguments and run a callable on it.
+
+        Each item of ``url_kwargs`` is passed as keyword arguments when
+        creating an instance of ``page_class`` on a free session. The page is
+        opened and then passed to ``func``. Exceptions are caught and returned
+        in the result, so a failing page doesn't stop the others.
+
+        Results are yielded as soon as they complete, which is not necessarily
+        the order of ``url_kwargs``. If the generator is closed early, the
+        workflows already running are allowed to finish and the remaining ones
+        are skipped.
+
+        A session is retired once it's lost, which is when a workflow fails
+        with
+        :py:class:`~selenium.common.exceptions.InvalidSessionIdException` or
+        a plain :py:class:`~selenium.common.exceptions.WebDriverException`,
+        and the other sessions run the remaining workflows. If every session
+        is retired, the remaining workflows fail with the error that retired
+        the last one, and the ``session`` of their results is ``None``.
+
+        :param page_class: Page class to create.
+        :param url_kwargs: Keyword arguments for each page.
+        :param func: (optional) Callable that's passed the opened page.
+        :param base_url: (optional) Base URL passed to each page.
+        :param timeout: (optional) Timeout passed to each page. Defaults to ``10``.
+        :type page_class: :py:class:`~pypom.page.Page`
+        :type url_kwargs: iterable of dict
+        :type base_url: str
+        :type timeout: int
+        :return: :py:class:`SessionResult` objects.
+        :rtype: generator
+
+        """
+        jobs = queue.Queue()
+        total = 0
+        for kwargs in url_kwargs:
+            jobs.put(kwargs)
+            total += 1
+        results = queue.Queue()
+        stop = threading.Event()
+        sessions = self.sessions[:total]
+        with self._lock:
+            self._start = _clock()
+            self._end = None
+            self._total = total
+            self._active = len(sessions)
+            self._completed = self._failed = 0
+            self._counts = [0] * len(self.sessions)
+        workers = [threading.Thread(
+            target=self._work,
+            args=(index, session, jobs, results, stop,
+                  page_class, func, base_url, timeout))
+            for index, session in enumerate(sessions)]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+        try:
+            for i in range(total):
+                yield results.get()
+        finally:
+            stop.set()
+            with self._lock:
+                if self._end is None:
+                    self._end = _clock()
+            for worker in workers:
+                worker.join()
+
+    def _work(self, index, session, jobs, results, stop, page_class, func,
+              base_url, timeout):
+        lost = None
+        while lost is None and not stop.is_set():
+            try:
+                kwargs = jobs.get_nowait()
+            except queue.Empty:
+                break
+            start = _clock()
+            value = error = None
+            try:
+                page = page_class(session, base_url, timeout, **kwargs)
+                page.open()
+                if func is not None:
+                    value = func(page)
+            except Exception as e:
+                error = e
+                if _session_lost(e):
+                    lost = e
+            self._finish(SessionResult(
+                kwargs, value, error, _clock() - start, index), results)
+        with self._lock:
+            self._active -= 1
+            remaining = lost is not None and not self._active
+        while remaining and not stop.is_set():
+            # every session has been lost
+            try:
+                kwargs = jobs.get_nowait()
+            except queue.Empty:
+                break
+            self._finish(SessionResult(kwargs, None, lost, 0.0, None), results)
+
+    def _finish(self, result, results):
+        with self._lock:
+            self._completed += 1
+            if result.session is not None:
+                self._counts[result.session] += 1
+            if result.error is not None:
+                self._failed += 1
+            if self._completed == self._total:
+                self._end = _clock()
+        results.put(result)
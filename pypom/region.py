@@ -2,8 +2,21 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+from selenium.common.exceptions import StaleElementReferenceException
+
+from .element import _nth, _resolving
+from .exception import UsageError
+from .locators import to_script_locator
+from . import scripts
 from .view import WebView
 
+try:
+    from selenium.common.exceptions import DetachedShadowRootException
+    _STALE_EXCEPTIONS = (
+        StaleElementReferenceException, DetachedShadowRootException)
+except ImportError:  # Selenium < 4.1
+    _STALE_EXCEPTIONS = (StaleElementReferenceException,)
+
 
 class Region(WebView):
     """A page region object.
@@ -43,11 +56,131 @@ class Region(WebView):
 
     _root_locator = None
 
+    _frame_locator = None
+    """Locator of the ``iframe`` or ``frame`` element the region appears in.
+
+    When set, the driver is switched to the frame before each command made
+    through the region, and the root element is found within the frame.
+    Switching is skipped while the driver is known to be in the frame
+    already, so consecutive commands in the same frame cost no more than
+    they would in the top level document. Regions created within a region
+    in a frame, such as by a :py:class:`RegionList`, share its frame, and may
+    set their own :py:attr:`_frame_locator` for a nested frame.
+
+    Example::
+
+        class Editor(Region):
+            _frame_locator = (By.ID, 'editor-frame')
+            _root_locator = (By.TAG_NAME, 'body')
+
+    """
+
+    SHADOW_ROOT = False
+    """Find elements within the shadow root of the root element.
+
+    When set to ``True`` lookups within the region are made in the shadow
+    root attached to :py:attr:`root`, which is remembered for as long as the
+    root element is the same. Only CSS selectors, and locators that can be
+    expressed as CSS selectors, can be used within a shadow root.
+
+    Example::
+
+        class DatePicker(Region):
+            _root_locator = (By.TAG_NAME, 'date-picker')
+            SHADOW_ROOT = True
+
+    """
+
+    CACHE_ROOT = False
+    """Cache the root element found using :py:attr:`_root_locator`.
+
+    By default the root element is looked up every time :py:attr:`root` is
+    accessed, so every lookup within the region costs an extra round trip to
+    the browser. When set to ``True`` the root element is kept between
+    lookups, and is only found again after the page has been opened or when
+    a :py:class:`~selenium.common.exceptions.StaleElementReferenceException`
+    is raised. The :py:attr:`root_cache_hits` and
+    :py:attr:`root_cache_misses` counters can be used to confirm the saving.
+
+    Example::
+
+        class Newsletter(Region):
+            _root_locator = (By.ID, 'newsletter-form')
+            CACHE_ROOT = True
+
+    """
+
+    COMPOUND_LOOKUPS = False
+    """Find elements and the roots of the regions they're in in one command.
+
+    By default each lookup within a region first finds the root element, and
+    in turn the root elements of any regions the region is nested in, so a
+    lookup three regions deep costs four commands. When set to ``True``,
+    :py:func:`find_element` and :py:func:`find_elements` follow the chain of
+    root locators and the element's locator using a single script. The chain
+    stops at regions that have a root element passed in, a cached root
+    element, a frame or a shadow root, which are found as usual. Locators
+    that can't be expressed as CSS selectors or XPath are also found as
+    usual. When nothing is found, the lookup is repeated as usual, so that
+    any implicit wait applies and the missing element is reported.
+
+    Example::
+
+        class Menu(Region):
+            _root_locator = (By.CLASS_NAME, 'menu')
+            COMPOUND_LOOKUPS = True
+
+    """
+
+    LAZY_LOAD = False
+    """Defer waiting for the region to load until it's first used.
+
+    By default :py:func:`wait_for_region_to_load` is called when the region
+    is instantiated. When set to ``True`` it's instead called the first time
+    :py:attr:`root` is accessed, which happens on the first lookup within the
+    region. This avoids waiting for regions that are never used, such as the
+    unused rows of a large table.
+    """
+
     def __init__(self, page, root=None):
         super(Region, self).__init__(page.selenium, page.timeout)
         self._root = root
         self.page = page
-        self.wait_for_region_to_load()
+        # shared with the page, which never replaces them
+        self._dispatcher = page._dispatcher
+        self._frames = page._frames
+        self._cached_root = None
+        self._cached_root_generation = None
+        self._cached_shadow_root = None
+        self.root_cache_hits = 0
+        """Number of times :py:attr:`root` was served from the cache."""
+        self.root_cache_misses = 0
+        """Number of times :py:attr:`root` had to be found when caching."""
+        self._loaded = not self.LAZY_LOAD
+        if self._loaded:
+            self.wait_for_region_to_load()
+
+    @property
+    def generation(self):
+        """Generation of the document of the page this region appears in.
+
+        See :py:attr:`~pypom.page.Page.generation`.
+        """
+        return self.page.generation
+
+    def _check_generation(self):
+        self.page._check_generation()
+
+    @property
+    def _snapshot(self):
+        return self.page._snapshot
+
+    @property
+    def _frame_path(self):
+        path = self.page._frame_path
+        if self._frame_locator is not None:
+            path += (tuple(self._frame_locator),)
+        return path
 
     @property
     def root(self):
@@ -57,12 +190,204 @@ class Region(WebView):
         instantiation or by defining a :py:attr:`_root_locator` attribute. To
         reduce the chances of hitting :py:class:`~selenium.common.exceptions.StaleElementReferenceException`
         you should use :py:attr:`_root_locator`, as this is looked up every
-        time the :py:attr:`root` property is accessed.
+        time the :py:attr:`root` property is accessed, unless
+        :py:attr:`CACHE_ROOT` is set.
         """
+        if not self._loaded:
+            self._load()
         if self._root is None and self._root_locator is not None:
-            return self.page.find_element(*self._root_locator)
+            if not self.CACHE_ROOT:
+                if self._frame_locator is None:
+                    strategy, locator = self._root_locator
+                    return self.page.find_element(strategy, locator)
+                return self._find_root()
+            generation = self.generation
+            cached = self._cached_root_generation == generation
+            if cached and self._cached_root is not None:
+                self.root_cache_hits += 1
+                return self._cached_root
+            self.root_cache_misses += 1
+            self._cached_root = self._find_root()
+            self._cached_root_generation = generation
+            return self._cached_root
         return self._root
 
+    def _find_root(self):
+        if self._frame_locator is None:
+            return self.page.find_element(*self._root_locator)
+        return self._dispatcher.call(
+            type(self), 'find_element', self._root_locator,
+            self._find_in_frame, *self._root_locator)
+
+    def _find_in_frame(self, strategy, locator):
+        self._switch_to_frame()
+        return self.selenium.find_element(strategy, locator)
+
+    @property
+    def _search_context(self):
+        root = self.root
+        if root is None:
+            return super(Region, self)._search_context
+        if self._frame_locator is not None or self._frames.path != ():
+            self._switch_to_frame()
+        if self.SHADOW_ROOT:
+            return self._shadow_root(root)
+        return root
+
+    def _root_script_locator(self):
+        # the root locator, when the root can be found by a script
+        if self._root is not None or self._root_locator is None:
+            return None
+        found_as_usual = any([
+            self.CACHE_ROOT, self.SHADOW_ROOT, self._frame_locator is not None])
+        if found_as_usual:
+            return None
+        return to_script_locator(*self._root_locator)
+
+    def _context_chain(self):
+        script_locator = self._root_script_locator()
+        if script_locator is None:
+            return super(Region, self)._context_chain()
+        if not self._loaded:
+            self._load()
+        context, locators = self.page._context_chain()
+        return context, locators + [list(script_locator)]
+
+    def _find_in_context(self, strategy, locator, many):
+        if self.COMPOUND_LOOKUPS:
+            found = self._find_chained(strategy, locator, many)
+            if found:
+                return found
+        # as WebView._find_in_context, inlined as this is the hottest path
+        context = self._search_context
+        if many:
+            return context.find_elements(strategy, locator)
+        return context.find_element(strategy, locator)
+
+    def _find_chained(self, strategy, locator, many):
+        # find the element and the roots leading to it with a single script
+        script_locator = to_script_locator(strategy, locator)
+        if script_locator is None or self._snapshot is not None:
+            return None
+        context, locators = self._context_chain()
+        if not locators:
+            return None
+        return self.selenium.execute_script(
+            scripts.FIND_CHAIN, None if context is self.selenium else context,
+            locators + [list(script_locator)], many)
+
+    def _find_element_no_wait(self, strategy, locator):
+        if self._root is not None or self._root_locator is None:
+            return super(Region, self)._find_element_no_wait(strategy, locator)
+        # the root element is found without waiting too
+        script_locator = to_script_locator(strategy, locator)
+        chain = all([
+            script_locator is not None, self._snapshot is None,
+            not isinstance(self.page, Region),
+            self._root_script_locator() is not None])
+        if chain:
+            context, locators = self._context_chain()
+            return self.selenium.execute_script(
+                scripts.FIND_CHAIN,
+                None if context is self.selenium else context,
+                locators + [list(script_locator)], False)
+        if self._snapshot is not None:
+            return super(Region, self)._find_element_no_wait(strategy, locator)
+        with self._implicit_wait_disabled():
+            return super(Region, self)._find_element_no_wait(strategy, locator)
+
+    def _shadow_root(self, root):
+        if self._snapshot is not None:
+            raise UsageError(
+                'Regions in shadow roots can\'t be read from a snapshot.')
+        # elements keep their id for as long as they're attached, and so
+        # does the shadow root attached to them
+        cached = self._cached_shadow_root
+        if cached is not None and cached[0] == root.id:
+            return cached[1]
+        shadow_root = root.shadow_root
+        self._cached_shadow_root = (root.id, shadow_root)
+        return shadow_root
+
+    def _load(self):
+        # mark the region as loaded first, as waiting for it to load is
+        # likely to access the root element
+        self._loaded = True
+        try:
+            self.wait_for_region_to_load()
+        except Exception:
+            self._loaded = False
+            raise
+
+    def invalidate(self):
+        """Discard everything remembered about the document of the page.
+
+        See :py:func:`~pypom.page.Page.invalidate`.
+
+        :return: The current page region object.
+        :rtype: :py:class:`Region`
+
+        """
+        self.page.invalidate()
+        return self
+
+    def clear_root_cache(self):
+        """Discard the cached root element.
+
+        The root element will be found again the next time :py:attr:`root`
+        is accessed. This has no effect unless :py:attr:`CACHE_ROOT` is set,
+        other than to forget the shadow root of the root element.
+
+        :return: The current page region object.
+        :rtype: :py:class:`Region`
+
+        """
+        self._cached_root = None
+        self._cached_root_generation = None
+        self._cached_shadow_root = None
+        return self
+
+    def _retry_stale_root(self, method, *args):
+        try:
+            return method(*args)
+        except _STALE_EXCEPTIONS:
+            return self._retry_with_new_root(method, *args)
+
+    def _retry_with_new_root(self, method, *args):
+        # called while handling a stale element error, which is raised again
+        # unless it may have come from a cached root
+        if self._cached_root is None and self._cached_shadow_root is None:
+            raise
+        self.clear_root_cache()
+        return self._dispatcher.retry(
+            type(self), self._root_locator, method, *args)
+
+    # lookups are made far more often than scripts, so they catch a stale
+    # root themselves rather than through _retry_stale_root
+    def find_element(self, strategy, locator):
+        try:
+            return super(Region, self).find_element(strategy, locator)
+        except _STALE_EXCEPTIONS:
+            return self._retry_with_new_root(
+                super(Region, self).find_element, strategy, locator)
+    find_element.__doc__ = WebView.find_element.__doc__
+
+    def find_elements(self, strategy, locator):
+        try:
+            return super(Region, self).find_elements(strategy, locator)
+        except _STALE_EXCEPTIONS:
+            return self._retry_with_new_root(
+                super(Region, self).find_elements, strategy, locator)
+    find_elements.__doc__ = WebView.find_elements.__doc__
+
+    def _execute_in_context(self, script, *args):
+        return self._retry_stale_root(
+            super(Region, self)._execute_in_context, script, *args)
+
+    def _execute_async_in_context(self, script, *args):
+        return self._retry_stale_root(
+            super(Region, self)._execute_async_in_context, script, *args)
+
     def wait_for_region_to_load(self):
         """Wait for the page region to load.
 
@@ -95,3 +420,126 @@ class Region(WebView):
 
         """
         return self
+
+
+class RegionList(object):
+    """A sequence of page regions, one for each element matching a locator.
+
+    Elements are fetched in chunks as they're needed, and a region is only
+    created for an element when it's accessed. When the locator can be
+    expressed as a CSS selector or XPath, each chunk is fetched using a
+    single command. Otherwise all elements are found using
+    :py:func:`~pypom.page.Page.find_elements` on first use.
+
+    :param page: Page or region object the regions appear in.
+    :param region: Region class to create for each matching element.
+    :param strategy: Location strategy to use. See :py:class:`~selenium.webdriver.common.by.By` for valid values.
+    :param locator: Location of the root elements of the regions.
+    :param chunk_size: (optional) Number of elements to fetch at a time. Defaults to ``25``.
+    :type page: :py:class:`~.page.Page`
+    :type region: :py:class:`Region`
+    :type strategy: str
+    :type locator: str
+    :type chunk_size: int
+
+    Usage::
+
+      from pypom import Page, Region, RegionList
+      from selenium.webdriver.common.by import By
+
+      class Results(Page):
+          _result_locator = (By.CLASS_NAME, 'result')
+
+          @property
+          def results(self):
+              return RegionList(self, self.Result, *self._result_locator)
+
+          class Result(Region):
+              _name_locator = (By.CLASS_NAME, 'name')
+
+              @property
+              def name(self):
+                  return self.find_element(*self._name_locator).text
+
+    """
+
+    def __init__(self, page, region, strategy, locator, chunk_size=25):
+        self.page = page
+        self.region = region
+        self.chunk_size = chunk_size
+        self._locator = (strategy, locator)
+        self._script_locator = to_script_locator(strategy, locator)
+        self._reset()
+
+    def _reset(self):
+        self._generation = self.page.generation
+        self._length = None
+        self._elements = {}
+        self._regions = {}
+
+    def _fetch(self, index):
+        if self._script_locator is None or self.page._snapshot is not None:
+            elements = self.page.find_elements(*self._locator)
+            self._length = len(elements)
+            self._elements = dict(
+                (i, self._resolving(i, e)) for i, e in enumerate(elements))
+            return
+        start = index - index % self.chunk_size
+        self._length, elements = self.page._dispatcher.call(
+            self.region, 'RegionList', self._locator,
+            self.page._execute_in_context, scripts.FIND_RANGE,
+            list(self._script_locator), start, start + self.chunk_size)
+        for offset, element in enumerate(elements):
+            self._elements[start + offset] = self._resolving(
+                start + offset, element)
+
+    def _resolving(self, index, element):
+        # roots found again by their position when the region retries
+        retries = self.region.STALE_RETRIES
+        if not retries:
+            return element
+        find = _nth(lambda: self.page.find_elements(*self._locator),
+                    index, self._locator)
+        return _resolving(self.page, element, find, self._locator, retries)
+
+    def _element(self, index):
+        if self.page.generation != self._generation:
+            self._reset()
+        if index not in self._elements:
+            if self._length is None or index < self._length:
+                self._fetch(index)
+            if index not in self._elements:
+                raise IndexError('region index out of range')
+        return self._elements[index]
+
+    def _region(self, index):
+        element = self._element(index)
+        if index not in self._regions:
+            self._regions[index] = self.region(self.page, root=element)
+        return self._regions[index]
+
+    def __len__(self):
+        if self.page.generation != self._generation:
+            self._reset()
+        if self._length is None:
+            self._fetch(0)
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._region(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+            if index < 0:
+                raise IndexError('region index out of range')
+        return self._region(index)
+
+    def __iter__(self):
+        index = 0
+        while True:
+            try:
+                self._element(index)
+            except IndexError:
+                return
+            yield self._region(index)
+            index += 1
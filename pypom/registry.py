@@ -0,0 +1,145 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""The page and region classes that have been defined, and their locators.
+
+Locators are checked with :py:func:`~pypom.locators.check_locator` when each
+class is created, so a malformed locator raises
+:py:class:`~pypom.exception.UsageError` as soon as the module defining the
+page or region is imported, instead of when the locator is first used.
+Locators using a strategy that isn't known aren't checked, and issue a
+:py:class:`~pypom.exception.LocatorWarning` instead. Before Python 3.6,
+classes are checked and registered when they're first instantiated.
+"""
+
+import itertools
+import re
+import warnings
+import weakref
+
+from .element import _Locator
+from .exception import LocatorWarning, UsageError
+from .locators import _known_strategy, check_locator
+
+_LOCATOR_NAME = re.compile(r'^_\w+_locator$')
+
+
+def _class_locators(cls):
+    # attributes of the class itself, excluding those it inherits
+    locators = {}
+    for name, value in vars(cls).items():
+        if isinstance(value, _Locator):
+            locators[name] = (value.strategy, value.locator)
+        elif _LOCATOR_NAME.match(name) and not name.startswith('__'):
+            if value is None or callable(value) or hasattr(value, '__get__'):
+                # unset, or computed by a method or property
+                locators[name] = None
+            elif isinstance(value, (tuple, list)) and len(value) == 2:
+                locators[name] = tuple(value)
+            else:
+                raise UsageError(
+                    '%s.%s must be a (strategy, locator) tuple, not %r.' % (
+                        cls.__name__, name, value))
+    return locators
+
+
+class Registry(object):
+    """The page and region classes that have been defined.
+
+    Classes are added as they're created, and forgotten once they're no
+    longer referenced. Tools can use the registry to find every page object
+    in a project, and the locators each one uses.
+
+    Usage::
+
+      from pypom import Region
+      from pypom.registry import registry
+
+      for cls in registry.classes(Region):
+          for name, (strategy, locator) in registry.locators(cls).items():
+              print(cls.__name__, name, strategy, locator)
+
+    """
+
+    def __init__(self):
+        self._classes = weakref.WeakKeyDictionary()
+        self._order = itertools.count()
+
+    def register(self, cls):
+        """Check the locators of a class and add it to the registry.
+
+        Locators are the ``_*_locator`` attributes of the class, and its
+        :py:class:`~pypom.element.Element`,
+        :py:class:`~pypom.element.Elements` and
+        :py:class:`~pypom.element.Field` attributes. Strategies listed in
+        the ``LOCATOR_STRATEGIES`` attribute of the class are accepted in
+        addition to those of :py:class:`~selenium.webdriver.common.by.By`.
+        Locators using other strategies issue a
+        :py:class:`~pypom.exception.LocatorWarning` and aren't checked.
+
+        :param cls: Page or region class.
+        :type cls: type
+        :raises: UsageError
+
+        """
+        own = _class_locators(cls)
+        strategies = getattr(cls, 'LOCATOR_STRATEGIES', ())
+        for name, locator in sorted(own.items()):
+            if locator is None:
+                continue
+            if not _known_strategy(locator[0], strategies):
+                warnings.warn(
+                    '%s.%s: Unknown location strategy %r, so the locator '
+                    'isn\'t checked. Add it to LOCATOR_STRATEGIES if it\'s '
+                    'provided by your driver.' % (
+                        cls.__name__, name, locator[0]),
+                    LocatorWarning)
+                continue
+            try:
+                check_locator(locator[0], locator[1], strategies)
+            except UsageError as e:
+                raise UsageError('%s.%s: %s' % (cls.__name__, name, e))
+        locators = {}
+        for base in reversed(cls.__mro__[1:]):
+            if base in self._classes:
+                locators.update(self._classes[base][1])
+        locators.update(own)
+        self._classes[cls] = (next(self._order), locators)
+
+    def classes(self, base=None):
+        """Return the registered classes in the order they were created.
+
+        :param base: (optional) Only return subclasses of this class, including the class itself.
+        :type base: type
+        :rtype: list
+
+        """
+        classes = sorted(self._classes.items(), key=lambda item: item[1][0])
+        return [cls for cls, value in classes
+                if base is None or issubclass(cls, base)]
+
+    def locators(self, cls):
+        """Return the locators of a registered class, including those it
+        inherits.
+
+        :param cls: Page or region class.
+        :type cls: type
+        :return: Mapping of attribute names to ``(strategy, locator)`` tuples.
+        :rtype: dict
+        :raises: KeyError if the class isn't registered.
+
+        """
+        locators = self._classes[cls][1]
+        return dict((name, locator) for name, locator in locators.items()
+                    if locator is not None)
+
+    def __contains__(self, cls):
+        return cls in self._classes
+
+    def __len__(self):
+        return len(self._classes)
+
+
+registry = Registry()
+"""Registry of every page and region class."""
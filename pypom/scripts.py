@@ -0,0 +1,380 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""JavaScript snippets executed in the browser by PyPOM."""
+
+FIND_MANY = """
+var root = arguments[0] || document;
+var locators = arguments[1];
+var results = [];
+for (var i = 0; i < locators.length; i++) {
+  var strategy = locators[i][0];
+  var value = locators[i][1];
+  var element = null;
+  if (strategy === 'css selector') {
+    element = root.querySelector(value);
+  } else {
+    element = document.evaluate(
+      value, root, null, XPathResult.FIRST_ORDERED_NODE_TYPE,
+      null).singleNodeValue;
+    if (element && element.nodeType !== 1) {
+      element = null;
+    }
+  }
+  results.push(element);
+}
+return results;
+"""
+
+FIND_RANGE = """
+var root = arguments[0] || document;
+var strategy = arguments[1][0];
+var value = arguments[1][1];
+var start = arguments[2];
+var end = arguments[3];
+var elements = [];
+var length = 0;
+if (strategy === 'css selector') {
+  var matches = root.querySelectorAll(value);
+  length = matches.length;
+  for (var i = start; i < end && i < length; i++) {
+    elements.push(matches[i]);
+  }
+} else {
+  var snapshot = document.evaluate(
+    value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+  length = snapshot.snapshotLength;
+  for (var i = start; i < end && i < length; i++) {
+    elements.push(snapshot.snapshotItem(i));
+  }
+}
+return [length, elements];
+"""
+
+_FIND = """
+function find(context, locator, many) {
+  var strategy = locator[0];
+  var value = locator[1];
+  if (strategy === 'css selector') {
+    if (many) {
+      return Array.prototype.slice.call(context.querySelectorAll(value));
+    }
+    return context.querySelector(value);
+  }
+  if (!many) {
+    var element = document.evaluate(
+      value, context, null, XPathResult.FIRST_ORDERED_NODE_TYPE,
+      null).singleNodeValue;
+    return element && element.nodeType === 1 ? element : null;
+  }
+  var elements = [];
+  var snapshot = document.evaluate(
+    value, context, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+  for (var i = 0; i < snapshot.snapshotLength; i++) {
+    if (snapshot.snapshotItem(i).nodeType === 1) {
+      elements.push(snapshot.snapshotItem(i));
+    }
+  }
+  return elements;
+}
+"""
+
+FIND_CHAIN = _FIND + """
+var root = arguments[0] || document;
+var locators = arguments[1];
+var all = arguments[2];
+for (var i = 0; i < locators.length - 1; i++) {
+  root = find(root, locators[i], false);
+  if (!root) {
+    return null;
+  }
+}
+return find(root, locators[locators.length - 1], all);
+"""
+
+EXTRACT = _FIND + """
+var root = arguments[0] || document;
+var fields = arguments[1];
+function displayed(element) {
+  if (element.type === 'hidden' && element.tagName === 'INPUT') {
+    return false;
+  }
+  var style = window.getComputedStyle(element);
+  if (style.visibility === 'hidden' || style.visibility === 'collapse' ||
+      style.opacity === '0') {
+    return false;
+  }
+  return element.getClientRects().length > 0;
+}
+function text(element) {
+  if (!displayed(element)) {
+    return '';
+  }
+  var lines = element.innerText.split('\\n');
+  var result = [];
+  for (var i = 0; i < lines.length; i++) {
+    var line = lines[i].replace(/\\s+/g, ' ').trim();
+    if (line) {
+      result.push(line);
+    }
+  }
+  return result.join('\\n');
+}
+function attribute(element, name) {
+  var value = element[name];
+  if (value === undefined || value === null || typeof value === 'object' ||
+      typeof value === 'function') {
+    return element.getAttribute(name);
+  }
+  if (typeof value === 'boolean') {
+    return value ? 'true' : null;
+  }
+  return String(value);
+}
+function read(element, field) {
+  if (field[3]) {
+    return displayed(element);
+  }
+  if (field[2] !== null) {
+    return attribute(element, field[2]);
+  }
+  return text(element);
+}
+var values = [];
+for (var i = 0; i < fields.length; i++) {
+  var field = fields[i];
+  var found = find(root, field, field[4]);
+  if (!field[4]) {
+    values.push(found ? read(found, field) : null);
+    continue;
+  }
+  var list = [];
+  for (var j = 0; j < found.length; j++) {
+    list.push(read(found[j], field));
+  }
+  values.push(list);
+}
+return values;
+"""
+
+FILL = _FIND + """
+var root = arguments[0] || document;
+var fields = arguments[1];
+function dispatch(element, type) {
+  var event = document.createEvent('HTMLEvents');
+  event.initEvent(type, true, false);
+  element.dispatchEvent(event);
+}
+function setValue(element, value) {
+  // use the native setter, so that frameworks tracking the value notice
+  var descriptor = Object.getOwnPropertyDescriptor(
+    Object.getPrototypeOf(element), 'value');
+  if (descriptor && descriptor.set) {
+    descriptor.set.call(element, value);
+  } else {
+    element.value = value;
+  }
+  dispatch(element, 'input');
+  dispatch(element, 'change');
+}
+function fill(element, value) {
+  var tag = element.tagName.toLowerCase();
+  var type = (element.type || '').toLowerCase();
+  if (element.disabled || element.readOnly) {
+    return -1;
+  }
+  if (tag === 'input' && (type === 'checkbox' || type === 'radio')) {
+    if (typeof value !== 'boolean') {
+      return -1;
+    }
+    if (element.checked !== value) {
+      element.click();
+    }
+    return 1;
+  }
+  if (typeof value === 'boolean') {
+    return -1;
+  }
+  if (tag === 'select') {
+    for (var i = 0; i < element.options.length; i++) {
+      var option = element.options[i];
+      if (option.value === value || option.text.trim() === value) {
+        setValue(element, option.value);
+        return 1;
+      }
+    }
+    return -1;
+  }
+  if ((tag === 'input' && type !== 'file') || tag === 'textarea') {
+    setValue(element, value);
+    return 1;
+  }
+  if (element.isContentEditable) {
+    element.textContent = value;
+    dispatch(element, 'input');
+    return 1;
+  }
+  return -1;
+}
+var results = [];
+for (var i = 0; i < fields.length; i++) {
+  var start = performance.now();
+  var element = find(root, fields[i], false);
+  var status = element ? fill(element, fields[i][2]) : 0;
+  results.push([status, performance.now() - start]);
+}
+return results;
+"""
+
+CHECK_CONDITIONS = _FIND + """
+var root = arguments[0] || document;
+var locators = arguments[1];
+var args = arguments[2];
+var conditions = [/* conditions */];
+var results = [];
+for (var i = 0; i < locators.length; i++) {
+  results.push(find(root, locators[i], false));
+}
+for (var i = 0; i < conditions.length; i++) {
+  results.push(conditions[i].apply(null, args[i]));
+}
+return results;
+"""
+
+OBSERVE = _FIND + """
+var root = arguments[0] || document;
+var locator = arguments[1];
+var state = arguments[2];
+var expected = arguments[3];
+var timeout = arguments[4];
+var done = arguments[arguments.length - 1];
+function text(element) {
+  var value = element.innerText;
+  return (value === undefined ? element.textContent : value).trim();
+}
+var element = find(root, locator, false);
+var initial = element ? text(element) : null;
+function check() {
+  var element = find(root, locator, false);
+  if (state === 'present') {
+    return element ? [true, element] : null;
+  }
+  if (state === 'absent') {
+    return element ? null : [true, null];
+  }
+  if (!element) {
+    return null;
+  }
+  var current = text(element);
+  if (expected === null ? current !== initial : current === expected) {
+    return [true, current];
+  }
+  return null;
+}
+var result = check();
+if (result) {
+  done(result);
+} else {
+  var finished = false;
+  var finish = function (result) {
+    if (!finished) {
+      finished = true;
+      observer.disconnect();
+      clearTimeout(timer);
+      done(result);
+    }
+  };
+  var observer = new MutationObserver(function () {
+    var result = check();
+    if (result) {
+      finish(result);
+    }
+  });
+  observer.observe(root, {
+    attributes: true, characterData: true, childList: true, subtree: true});
+  var timer = setTimeout(function () {
+    finish([false, null]);
+  }, timeout);
+}
+"""
+
+DOCUMENT_READY = """
+return document.readyState === 'complete';
+"""
+
+NETWORK_IDLE = """
+// requests are counted from the first time this runs in the document, which
+// is done even while it's loading so that as few requests as possible are
+// missed; requests started before then are only seen once they've finished
+var idleTime = arguments[0];
+var state = window.__pypomNetwork;
+if (!state) {
+  state = window.__pypomNetwork = {pending: 0, last: 0};
+  var done = function () {
+    state.pending--;
+    state.last = performance.now();
+  };
+  if (window.XMLHttpRequest) {
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+      state.pending++;
+      this.addEventListener('loadend', done);
+      return send.apply(this, arguments);
+    };
+  }
+  if (window.fetch) {
+    var fetch = window.fetch;
+    window.fetch = function () {
+      state.pending++;
+      return fetch.apply(window, arguments).then(function (response) {
+        done();
+        return response;
+      }, function (error) {
+        done();
+        throw error;
+      });
+    };
+  }
+}
+if (document.readyState !== 'complete' || state.pending > 0) {
+  return false;
+}
+var last = state.last;
+var entries = performance.getEntriesByType('resource');
+for (var i = 0; i < entries.length; i++) {
+  last = Math.max(last, entries[i].responseEnd);
+}
+return performance.now() - last >= idleTime;
+"""
+
+DOCUMENT_HTML = """
+// the markup only holds the initial state of form fields, so copy their
+// current state into the attributes of a copy of the document
+var source = document.documentElement;
+var copy = source.cloneNode(true);
+var fields = source.querySelectorAll('input, option, textarea');
+var copies = copy.querySelectorAll('input, option, textarea');
+function toggle(element, name, value) {
+  if (value) {
+    element.setAttribute(name, '');
+  } else {
+    element.removeAttribute(name);
+  }
+}
+for (var i = 0; i < fields.length; i++) {
+  var field = fields[i];
+  var tag = field.tagName.toLowerCase();
+  var type = (field.type || '').toLowerCase();
+  if (tag === 'option') {
+    toggle(copies[i], 'selected', field.selected);
+  } else if (tag === 'textarea') {
+    copies[i].textContent = field.value;
+  } else if (type === 'checkbox' || type === 'radio') {
+    toggle(copies[i], 'checked', field.checked);
+  } else {
+    copies[i].setAttribute('value', field.value);
+  }
+}
+return copy.outerHTML;
+"""
@@ -0,0 +1,300 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""Read-only copies of a page that can be queried without the browser.
+
+Requires `lxml <http://lxml.de/>`_ and `cssselect
+<https://cssselect.readthedocs.io/>`_, which are installed with
+``pip install PyPOM[snapshot]``.
+"""
+
+import re
+
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    NoSuchElementException)
+from selenium.webdriver.common.by import By
+
+from .exception import UsageError
+from .locators import to_script_locator
+
+try:
+    from cssselect import HTMLTranslator, SelectorError
+    from lxml import etree
+    import lxml.html
+except ImportError:
+    lxml = None
+
+_HIDDEN_TAGS = frozenset([
+    'head', 'link', 'meta', 'noscript', 'script', 'style', 'template',
+    'title'])
+_BLOCK_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3',
+    'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre',
+    'section', 'table', 'tr', 'ul'])
+_BOOLEAN_ATTRIBUTES = frozenset([
+    'async', 'autofocus', 'autoplay', 'checked', 'controls', 'defer',
+    'disabled', 'hidden', 'loop', 'multiple', 'muted', 'open', 'readonly',
+    'required', 'selected'])
+_BOOLEAN_PROPERTIES = dict(
+    (name, name) for name in _BOOLEAN_ATTRIBUTES if name != 'readonly')
+_BOOLEAN_PROPERTIES['readOnly'] = 'readonly'
+_VALUE_TAGS = frozenset(['input', 'select', 'textarea'])
+_INVISIBLE_STYLE = re.compile(
+    r'(?:^|;)\s*(?:display\s*:\s*none|visibility\s*:\s*hidden)\s*(?:;|$|!)',
+    re.IGNORECASE)
+
+
+def _link_text_xpath(text, partial):
+    if "'" not in text:
+        quoted = "'%s'" % text
+    elif '"' not in text:
+        quoted = '"%s"' % text
+    else:
+        quoted = 'concat(%s)' % ', "\'", '.join(
+            "'%s'" % part for part in text.split("'"))
+    if partial:
+        return './/a[contains(normalize-space(.), %s)]' % quoted
+    return './/a[normalize-space(.) = %s]' % quoted
+
+
+def _displayed_here(node):
+    tag = node.tag.lower()
+    if tag in _HIDDEN_TAGS or 'hidden' in node.attrib:
+        return False
+    if tag == 'input' and node.get('type', '').lower() == 'hidden':
+        return False
+    return not _INVISIBLE_STYLE.search(node.get('style', ''))
+
+
+def _displayed(node):
+    while node is not None:
+        if not _displayed_here(node):
+            return False
+        node = node.getparent()
+    return True
+
+
+def _visible_text(node, parts):
+    for child in node:
+        if not isinstance(child.tag, str):
+            # comments and processing instructions
+            if child.tail:
+                parts.append(child.tail)
+            continue
+        if _displayed_here(child):
+            tag = child.tag.lower()
+            block = tag in _BLOCK_TAGS
+            if block:
+                parts.append('\n')
+            if tag == 'br':
+                parts.append('\n')
+            if child.text:
+                parts.append(child.text)
+            _visible_text(child, parts)
+            if block:
+                parts.append('\n')
+            elif tag in ('td', 'th'):
+                parts.append(' ')
+        if child.tail:
+            parts.append(child.tail)
+
+
+class _SnapshotSearchContext(object):
+
+    _css_prefix = 'descendant::'
+
+    def find_element(self, strategy, locator):
+        """Find the first matching element in the snapshot.
+
+        :raises: :py:class:`~selenium.common.exceptions.NoSuchElementException`
+        """
+        elements = self.find_elements(strategy, locator)
+        if not elements:
+            raise NoSuchElementException(
+                'Unable to locate element in snapshot: %s=%s' % (
+                    strategy, locator))
+        return elements[0]
+
+    def find_elements(self, strategy, locator):
+        """Find all matching elements in the snapshot."""
+        if strategy == By.ID:
+            # ids are looked up often enough to be worth an index
+            nodes = self._snapshot._ids().get(locator, [])
+            if self is not self._snapshot:
+                nodes = [n for n in nodes if self._contains(n)]
+            return [SnapshotElement(self._snapshot, n) for n in nodes]
+        if strategy in (By.LINK_TEXT, By.PARTIAL_LINK_TEXT):
+            strategy, locator = By.XPATH, _link_text_xpath(
+                locator, strategy == By.PARTIAL_LINK_TEXT)
+        else:
+            script_locator = to_script_locator(strategy, locator)
+            if script_locator is None:
+                raise InvalidSelectorException(
+                    'Unsupported locator in snapshot: %s=%s' % (
+                        strategy, locator))
+            strategy, locator = script_locator
+        if strategy == By.CSS_SELECTOR:
+            try:
+                locator = HTMLTranslator().css_to_xpath(
+                    locator, prefix=self._css_prefix)
+            except SelectorError as e:
+                raise InvalidSelectorException(str(e))
+        try:
+            nodes = self._node.xpath(locator)
+        except etree.XPathError as e:
+            raise InvalidSelectorException(str(e))
+        if not isinstance(nodes, list):
+            nodes = [nodes]
+        if not all(isinstance(getattr(n, 'tag', None), str) for n in nodes):
+            raise InvalidSelectorException(
+                'XPath must select elements: %s' % locator)
+        return [SnapshotElement(self._snapshot, n) for n in nodes]
+
+    def _contains(self, node):
+        return any(a is self._node for a in node.iterancestors())
+
+
+class Snapshot(_SnapshotSearchContext):
+    """A parsed copy of a document.
+
+    :param html: HTML of the document.
+    :type html: str
+    """
+
+    _css_prefix = 'descendant-or-self::'
+
+    def __init__(self, html):
+        if lxml is None:
+            raise UsageError(
+                'Snapshots require lxml and cssselect. Install them using '
+                '"pip install PyPOM[snapshot]".')
+        self.html = html
+        self._node = lxml.html.document_fromstring(html)
+        self._snapshot = self
+        self._id_index = None
+
+    def _ids(self):
+        if self._id_index is None:
+            self._id_index = {}
+            for node in self._node.xpath('//*[@id]'):
+                self._id_index.setdefault(node.get('id'), []).append(node)
+        return self._id_index
+
+
+class SnapshotElement(_SnapshotSearchContext):
+    """A read-only element in a :py:class:`Snapshot`.
+
+    Provides the reading methods of
+    :py:class:`~selenium.webdriver.remote.webelement.WebElement`. Whether an
+    element is displayed, and therefore its visible text, is estimated from
+    its tag and its ``hidden`` and ``style`` attributes, as style sheets and
+    scripts aren't taken into account.
+    """
+
+    def __init__(self, snapshot, node):
+        self._snapshot = snapshot
+        self._node = node
+
+    def __repr__(self):
+        return '<%s %s>' % (type(self).__name__, self.tag_name)
+
+    def __eq__(self, other):
+        return isinstance(other, SnapshotElement) and self._node is other._node
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._node)
+
+    @property
+    def tag_name(self):
+        """The element's tag name."""
+        return self._node.tag.lower()
+
+    @property
+    def text(self):
+        """The visible text of the element."""
+        if not self.is_displayed():
+            return ''
+        parts = [self._node.text or '']
+        _visible_text(self._node, parts)
+        lines = (' '.join(line.split()) for line in ''.join(parts).split('\n'))
+        return '\n'.join(line for line in lines if line)
+
+    def get_attribute(self, name):
+        """The value of an attribute, or ``None`` if it's not set.
+
+        Boolean attributes are ``'true'`` when set, as with Selenium.
+        """
+        node = self._node
+        if name in _BOOLEAN_ATTRIBUTES:
+            return 'true' if name in node.attrib else None
+        if name == 'value' and self.tag_name in _VALUE_TAGS:
+            return self._value()
+        if name in ('textContent', 'innerText'):
+            return self.get_property(name)
+        return node.get(name)
+
+    def get_property(self, name):
+        """The value of a property, as far as it can be read from the HTML.
+
+        Boolean properties such as ``checked`` and ``disabled`` are ``True``
+        or ``False``, and the ``value`` of a form field is its current value.
+        Other properties are read from the attribute of the same name, or
+        are ``None`` if it's not set.
+        """
+        node = self._node
+        attribute = _BOOLEAN_PROPERTIES.get(name)
+        if attribute is not None:
+            return attribute in node.attrib
+        if name == 'value':
+            return self._value() if self.tag_name in _VALUE_TAGS else None
+        if name == 'textContent':
+            return node.text_content()
+        if name == 'innerText':
+            return self.text
+        if name == 'tagName':
+            return node.tag.upper()
+        return node.get('class' if name == 'className' else name)
+
+    def get_dom_attribute(self, name):
+        """The value of an attribute as written in the HTML, or ``None``."""
+        return self._node.get(name)
+
+    def _value(self):
+        # the value of a form field, including any changes made in the page
+        node = self._node
+        if self.tag_name == 'textarea':
+            return node.text or ''
+        if self.tag_name == 'input':
+            return node.get('value', '')
+        options = node.xpath('.//option')
+        selected = [o for o in options if 'selected' in o.attrib]
+        option = (selected or options or [None])[0]
+        if option is None:
+            return ''
+        return option.get('value', option.text_content().strip())
+
+    def is_displayed(self):
+        """Whether the element is likely to be visible."""
+        return _displayed(self._node)
+
+    def is_enabled(self):
+        """Whether the element is enabled."""
+        return 'disabled' not in self._node.attrib
+
+    def is_selected(self):
+        """Whether an option, checkbox or radio button is selected."""
+        attrib = self._node.attrib
+        return 'checked' in attrib or 'selected' in attrib
+
+    def _read_only(self, *args, **kwargs):
+        raise UsageError(
+            'Elements in a snapshot are read-only. Interact with the page '
+            'outside of the snapshot.')
+
+    clear = click = send_keys = submit = _read_only
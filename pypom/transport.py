@@ -0,0 +1,316 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""Persistent HTTP connections for remote WebDriver sessions.
+
+Each command sent to a remote WebDriver server is an HTTP request. When many
+sessions run in parallel, opening a connection for each request wastes time
+and can exhaust the ports available to the client. Sessions created with
+:py:func:`connect` send their requests through a shared
+:py:class:`HTTPConnectionPool` instead, which keeps connections open to be
+reused.
+"""
+
+from collections import namedtuple
+import json
+import socket
+import ssl
+import threading
+
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from selenium.webdriver.remote.webdriver import WebDriver
+
+try:
+    from selenium.webdriver.remote.client_config import ClientConfig
+except ImportError:  # Selenium < 4.25
+    ClientConfig = None
+
+try:
+    import http.client as httplib
+    from urllib.parse import urljoin, urlsplit
+except ImportError:  # Python 2
+    import httplib
+    from urlparse import urljoin, urlsplit
+
+# Selenium's default timeout for requests to a remote server
+_DEFAULT_TIMEOUT = 120
+
+
+class ConnectionStatistics(namedtuple('ConnectionStatistics', [
+        'requests', 'opened', 'reused', 'discarded', 'idle'])):
+    """Connection reuse of a :py:class:`HTTPConnectionPool`.
+
+    Contains the number of ``requests`` made, the number of connections
+    ``opened`` and ``reused``, the number ``discarded`` because the server
+    closed them or the pool was full, and the number currently ``idle``.
+    """
+    __slots__ = ()
+
+
+class HTTPConnectionPool(object):
+    """A thread safe pool of persistent HTTP connections.
+
+    Connections are kept open after each request, and reused by later
+    requests to the same host. At most ``max_per_host`` requests are made to
+    a host at the same time, and further requests wait for a connection to be
+    returned. At most ``max_size`` idle connections are kept across all hosts.
+
+    :param max_size: (optional) Maximum number of idle connections. Defaults to ``10``.
+    :param max_per_host: (optional) Maximum number of connections to each host. Defaults to ``max_size``.
+    :param timeout: (optional) Socket timeout in seconds for requests that aren't given one. Defaults to ``120``, as for Selenium's remote connections.
+    :type max_size: int
+    :type max_per_host: int
+    :type timeout: float
+
+    """
+
+    def __init__(self, max_size=10, max_per_host=None,
+                 timeout=_DEFAULT_TIMEOUT):
+        self.max_size = max_size
+        self.max_per_host = max_per_host or max_size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._limits = {}
+        self._contexts = {}
+        self._requests = self._opened = self._reused = self._discarded = 0
+
+    @property
+    def statistics(self):
+        """:py:class:`ConnectionStatistics` for the requests made so far."""
+        with self._lock:
+            idle = sum(len(c) for c in self._idle.values())
+            return ConnectionStatistics(
+                self._requests, self._opened, self._reused, self._discarded,
+                idle)
+
+    def close(self):
+        """Close the idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def _ssl_context(self, ca_certs, ignore_certificates):
+        with self._lock:
+            context = self._contexts.get((ca_certs, ignore_certificates))
+        if context is None:
+            if ignore_certificates:
+                context = ssl.create_default_context()
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            else:
+                context = ssl.create_default_context(cafile=ca_certs)
+            with self._lock:
+                context = self._contexts.setdefault(
+                    (ca_certs, ignore_certificates), context)
+        return context
+
+    def _connect(self, scheme, host, port, ca_certs, ignore_certificates):
+        if scheme == 'https':
+            return httplib.HTTPSConnection(
+                host, port,
+                context=self._ssl_context(ca_certs, ignore_certificates))
+        return httplib.HTTPConnection(host, port)
+
+    def _acquire(self, key):
+        with self._lock:
+            limit = self._limits.get(key)
+            if limit is None:
+                limit = self._limits[key] = threading.BoundedSemaphore(
+                    self.max_per_host)
+        limit.acquire()
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self._reused += 1
+                return idle.pop(), True
+            self._opened += 1
+        return self._connect(*key), False
+
+    def _release(self, key, connection, reusable):
+        with self._lock:
+            idle = sum(len(c) for c in self._idle.values())
+            if reusable and idle < self.max_size:
+                self._idle.setdefault(key, []).append(connection)
+                connection = None
+            else:
+                self._discarded += 1
+            self._limits[key].release()
+        if connection is not None:
+            connection.close()
+
+    def request(self, method, url, body=None, headers=None, timeout=None,
+                ca_certs=None, ignore_certificates=False):
+        """Make an HTTP request using a pooled connection.
+
+        Connections are only reused by requests with the same TLS settings.
+
+        :param method: HTTP method.
+        :param url: Absolute URL.
+        :param body: (optional) Request body.
+        :param headers: (optional) Request headers.
+        :param timeout: (optional) Socket timeout in seconds. Defaults to :py:attr:`timeout`.
+        :param ca_certs: (optional) Path to the certificates trusted for HTTPS. Defaults to those trusted by the system.
+        :param ignore_certificates: (optional) Don't verify the certificate of an HTTPS server.
+        :type method: str
+        :type url: str
+        :type body: str
+        :type headers: dict
+        :type timeout: float
+        :type ca_certs: str
+        :type ignore_certificates: bool
+        :return: ``(status, reason, headers, data)`` with the names of the
+          response headers in lower case.
+        :rtype: tuple
+
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme or 'http'
+        if scheme != 'https':
+            ca_certs, ignore_certificates = None, False
+        key = (scheme, parts.hostname,
+               parts.port or (443 if scheme == 'https' else 80),
+               ca_certs, bool(ignore_certificates))
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        if timeout is None:
+            timeout = self.timeout
+        if timeout is None:
+            timeout = socket.getdefaulttimeout()
+        with self._lock:
+            self._requests += 1
+        while True:
+            connection, reused = self._acquire(key)
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            try:
+                connection.request(method, path, body, headers or {})
+                response = connection.getresponse()
+                data = response.read()
+            except (httplib.HTTPException, socket.error):
+                self._release(key, connection, False)
+                if reused:
+                    # the server closed the idle connection, try another
+                    continue
+                raise
+            self._release(key, connection, not response.will_close)
+            response_headers = dict(
+                (k.lower(), v) for k, v in response.getheaders())
+            return response.status, response.reason, response_headers, data
+
+
+default_pool = HTTPConnectionPool()
+"""Pool shared by connections that aren't given one."""
+
+
+class PooledRemoteConnection(RemoteConnection):
+    """A WebDriver command executor that uses an :py:class:`HTTPConnectionPool`.
+
+    Requests use the ``timeout``, ``ca_certs`` and ``ignore_certificates`` of
+    the client configuration, and the timeout of the pool when the client
+    configuration has none. Its proxy and ``init_args_for_pool_manager``
+    aren't used.
+
+    :param remote_server_addr: URL of the WebDriver server.
+    :param pool: (optional) Connection pool. Defaults to :py:data:`default_pool`.
+    :param client_config: (optional) Selenium :py:class:`~selenium.webdriver.remote.client_config.ClientConfig` for the same server, on Selenium 4.25 or later.
+    :type remote_server_addr: str
+    :type pool: :py:class:`HTTPConnectionPool`
+    :type client_config: :py:class:`~selenium.webdriver.remote.client_config.ClientConfig`
+
+    """
+
+    def __init__(self, remote_server_addr, pool=None, client_config=None):
+        if ClientConfig is not None:
+            if client_config is None:
+                client_config = ClientConfig(
+                    remote_server_addr=remote_server_addr, keep_alive=True)
+            super(PooledRemoteConnection, self).__init__(
+                client_config=client_config)
+        else:
+            super(PooledRemoteConnection, self).__init__(
+                remote_server_addr, keep_alive=True)
+        self.pool = pool or default_pool
+
+    def _settings(self):
+        # the timeout and TLS settings used for each request
+        if ClientConfig is not None:
+            config = self._client_config
+            return config.timeout, config.ca_certs, config.ignore_certificates
+        return (getattr(self, '_timeout', None),
+                getattr(self, '_ca_certs', None), False)
+
+    def _headers(self, url):
+        # the headers RemoteConnection sends, including authorization
+        headers = self.get_remote_connection_headers(urlsplit(url), True)
+        if ClientConfig is not None:
+            # neither is available on the earliest Selenium with ClientConfig
+            config = self._client_config
+            headers.update(getattr(config, 'extra_headers', None) or {})
+            get_auth_header = getattr(config, 'get_auth_header', None)
+            if get_auth_header is not None:
+                headers.update(get_auth_header() or {})
+        return headers
+
+    def _request(self, method, url, body=None):
+        headers = self._headers(url)
+        if body and method not in ('POST', 'PUT'):
+            body = None
+        timeout, ca_certs, ignore_certificates = self._settings()
+        status, reason, response_headers, data = self.pool.request(
+            method, url, body, headers, timeout, ca_certs, ignore_certificates)
+        data = data.decode('utf-8').strip()
+        if 300 <= status < 304:
+            return self._request(
+                'GET', urljoin(url, response_headers.get('location')))
+        if status >= 400:
+            return {'status': status, 'value': data or reason}
+        if response_headers.get('content-type', '').startswith('image/png'):
+            return {'status': 0, 'value': data}
+        try:
+            data = json.loads(data)
+        except ValueError:
+            return {'status': 0 if 199 < status < 300 else 13, 'value': data}
+        if 'value' not in data:
+            data['value'] = None
+        return data
+
+
+def connect(command_executor, pool=None, client_config=None, **kwargs):
+    """Start a remote WebDriver session that uses pooled connections.
+
+    The returned object can be passed to :py:class:`~pypom.page.Page` as
+    usual. Sessions share :py:data:`default_pool` unless given another pool.
+    See :py:class:`PooledRemoteConnection` for the client configuration
+    settings that are used.
+
+    :param command_executor: URL of the WebDriver server.
+    :param pool: (optional) Connection pool.
+    :param client_config: (optional) Selenium client configuration for the server, for its timeout and TLS settings.
+    :param kwargs: (optional) Keyword arguments for :py:class:`~selenium.webdriver.remote.webdriver.WebDriver`, such as ``options``.
+    :type command_executor: str
+    :type pool: :py:class:`HTTPConnectionPool`
+    :type client_config: :py:class:`~selenium.webdriver.remote.client_config.ClientConfig`
+    :rtype: :py:class:`~selenium.webdriver.remote.webdriver.WebDriver`
+
+    Usage::
+
+      from pypom.transport import HTTPConnectionPool, connect
+      from selenium.webdriver import FirefoxOptions
+
+      pool = HTTPConnectionPool(max_size=50, max_per_host=50)
+      driver = connect('http://grid:4444/wd/hub', pool,
+                       options=FirefoxOptions())
+      page = Mozilla(driver).open()
+      print(pool.statistics)
+
+    """
+    return WebDriver(
+        command_executor=PooledRemoteConnection(
+            command_executor, pool, client_config),
+        **kwargs)
@@ -2,17 +2,397 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.support.ui import WebDriverWait
+from collections import namedtuple
+from contextlib import contextmanager
+import threading
+import weakref
 
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    NoSuchFrameException,
+    StaleElementReferenceException,
+    TimeoutException)
 
-class WebView(object):
+from .conditions import ScriptCondition
+from .element import Field, _Locator, _resolving, _resolving_all
+from .exception import UsageError
+from .instrumentation import instrumented
+from .locators import to_script_locator
+from .registry import registry
+from . import scripts
+from .wait import Wait, _clock
+
+
+class FillRecord(namedtuple('FillRecord', ['field', 'native', 'elapsed'])):
+    """How a single field was filled by :py:func:`~pypom.page.Page.fill`.
+
+    Contains the ``field`` as given to :py:func:`~pypom.page.Page.fill`, whether it
+    was filled by sending keys (``native`` is ``True``) or by the script
+    (``False``), and the ``elapsed`` time in seconds. The time of a field
+    filled by the script is measured in the browser, so it excludes the round
+    trip shared by all fields filled with it.
+    """
+    __slots__ = ()
+
+
+def _class_fields(cls):
+    fields = {}
+    for base in reversed(cls.__mro__):
+        for name, value in vars(base).items():
+            if isinstance(value, Field):
+                fields[name] = value
+            else:
+                fields.pop(name, None)
+    return fields
+
+
+# classes can be prepared when they're created from Python 3.6, and are
+# prepared when they're first instantiated before that
+_INIT_SUBCLASS = hasattr(object, '__init_subclass__')
+
+
+class _ViewClass(object):
+    """Base of pages and regions, which are checked and registered.
+
+    This is done without a metaclass, so that pages and regions can be
+    combined with classes that have metaclasses of their own.
+    """
+
+    # called with each class after it's registered
+    _class_checks = ()
+
+    @classmethod
+    def _prepare_class(cls):
+        registry.register(cls)
+        cls._fields = _class_fields(cls)
+        for check in cls._class_checks:
+            check(cls)
+
+    if _INIT_SUBCLASS:
+        def __init_subclass__(cls, **kwargs):
+            super(_ViewClass, cls).__init_subclass__(**kwargs)
+            cls._prepare_class()
+    else:
+        def __new__(cls, *args, **kwargs):
+            for base in reversed(cls.__mro__):
+                unprepared = all([
+                    issubclass(base, _ViewClass), base is not _ViewClass,
+                    '_fields' not in vars(base)])
+                if unprepared:
+                    base._prepare_class()
+            return super(_ViewClass, cls).__new__(cls)
+
+
+class _ViewWait(Wait):
+    """Wait that reports to the listeners of a page or region."""
+
+    def __init__(self, view, *args, **kwargs):
+        super(_ViewWait, self).__init__(*args, **kwargs)
+        self._view = view
+
+    def until(self, method, message=''):
+        return self._view._dispatcher.call(
+            type(self._view), 'wait.until', method,
+            super(_ViewWait, self).until, method, message)
+    until.__doc__ = Wait.until.__doc__
+
+    def until_not(self, method, message=''):
+        return self._view._dispatcher.call(
+            type(self._view), 'wait.until_not', method,
+            super(_ViewWait, self).until_not, method, message)
+    until_not.__doc__ = Wait.until_not.__doc__
+
+
+class _Conditions(object):
+    """Named conditions of a page or region, checked together.
+
+    Locators that can be expressed as CSS selectors or XPath and
+    :py:class:`~pypom.conditions.ScriptCondition` objects are all checked
+    with a single script. Any other conditions are checked individually.
+    """
+
+    def __init__(self, view, conditions):
+        if not conditions:
+            raise UsageError('There are no conditions to wait for.')
+        self._view = view
+        self.names = list(conditions)
+        self._script_names = []
+        self._locators = []
+        self._scripts = []
+        self._others = []
+        for name in self.names:
+            condition = conditions[name]
+            if isinstance(condition, ScriptCondition):
+                self._scripts.append((name, condition))
+            elif isinstance(condition, tuple) and len(condition) == 2:
+                script_locator = to_script_locator(*condition)
+                if script_locator is None or view._snapshot is not None:
+                    self._others.append((name, self._locator(condition)))
+                else:
+                    self._script_names.append(name)
+                    self._locators.append(list(script_locator))
+            elif callable(condition):
+                self._others.append((name, condition))
+            else:
+                raise UsageError(
+                    'Condition %s must be a (strategy, locator) tuple or a '
+                    'callable, not %r.' % (name, condition))
+        self._script_names.extend(name for name, c in self._scripts)
+        self._script = scripts.CHECK_CONDITIONS
+        if self._scripts:
+            self._script = self._script.replace('/* conditions */', ',\n'.join(
+                'function () {\n%s\n}' % c.script for name, c in self._scripts))
+
+    def _locator(self, locator):
+        return lambda driver: self._view._find_element_no_wait(*locator)
+
+    def __repr__(self):
+        return '<%s %s>' % (type(self).__name__, ', '.join(
+            '%s' % (name,) for name in self.names))
+
+    def __call__(self, driver):
+        values = {}
+        if self._script_names:
+            values.update(zip(self._script_names, self._view._execute_in_context(
+                self._script, self._locators,
+                [list(c.args) for name, c in self._scripts])))
+        for name, condition in self._others:
+            values[name] = condition(driver)
+        return values
+
+
+class _FrameContext(object):
+    """The frame the driver is switched to, shared by every page and region
+    using the driver.
+
+    Frames are identified by the locators of the frame elements leading to
+    them from the top level document. The path is ``None`` when the current
+    frame isn't known.
+    """
+
+    def __init__(self):
+        self.path = ()
+        self.switches = 0
+        self.skipped = 0
+        self._elements = {}
+
+    def switch(self, view, path):
+        current = self.path
+        if path == current:
+            if path:
+                self.skipped += 1
+            return
+        # unknown until all the switches have succeeded
+        self.path = None
+        switch_to = view.selenium.switch_to
+        if current and current[:-1] == path:
+            self._call(view, 'switch_to.parent_frame', None,
+                       switch_to.parent_frame)
+            remaining = ()
+        elif current is not None and path[:len(current)] == current:
+            remaining = path[len(current):]
+        else:
+            self._call(view, 'switch_to.default_content', None,
+                       switch_to.default_content)
+            remaining = path
+        entered = path[:len(path) - len(remaining)]
+        for locator in remaining:
+            entered += (locator,)
+            self._call(view, 'switch_to.frame', locator,
+                       self._enter, view, entered)
+        self.path = path
+
+    def _call(self, view, method, locator, func, *args):
+        self.switches += 1
+        return view._dispatcher.call(type(view), method, locator, func, *args)
+
+    def _enter(self, view, path):
+        # frame elements are remembered until a page sees a new document,
+        # which it reports by calling forget
+        view._check_generation()
+        element = self._elements.get(path)
+        if element is not None:
+            try:
+                return view.selenium.switch_to.frame(element)
+            except (NoSuchFrameException, StaleElementReferenceException):
+                pass
+        element = view.selenium.find_element(*path[-1])
+        view.selenium.switch_to.frame(element)
+        self._elements[path] = element
+
+    def reset(self):
+        # navigating always returns the driver to the top level document
+        self.path = ()
+        self._elements.clear()
+
+    def forget(self):
+        # the driver may have changed frames, for example by navigating, but
+        # there's no need to return to the top level if frames aren't used
+        self._elements.clear()
+        if self.path or self.switches:
+            self.path = None
+
+
+_frame_contexts = weakref.WeakKeyDictionary()
+_frame_contexts_lock = threading.Lock()
+
+
+def _frame_context(selenium):
+    with _frame_contexts_lock:
+        try:
+            context = _frame_contexts.get(selenium)
+            if context is None:
+                context = _frame_contexts[selenium] = _FrameContext()
+        except TypeError:
+            # drivers that can't be weakly referenced aren't shared
+            context = _FrameContext()
+    return context
+
+
+class WebView(_ViewClass):
+
+    LOCATOR_STRATEGIES = ()
+    """Location strategies accepted in addition to those of
+    :py:class:`~selenium.webdriver.common.by.By`.
+
+    Locators are checked when a page or region class is created, and those
+    using unknown strategies issue a
+    :py:class:`~pypom.exception.LocatorWarning` instead. Set this when using a
+    driver with strategies of its own, such as Appium.
+
+    Example::
+
+        LOCATOR_STRATEGIES = ('accessibility id', '-android uiautomator')
+
+    """
+
+    FAST_PRESENCE_CHECKS = False
+    """Check for the presence of elements without waiting.
+
+    When the driver has an implicit wait set, :py:func:`is_element_present`
+    and :py:func:`is_element_displayed` block for the whole implicit wait
+    before reporting that an element is absent. When set to ``True`` these
+    checks return immediately instead. Locators that can be expressed as CSS
+    selectors or XPath are checked using a single script, and any others are
+    checked with the implicit wait temporarily set to zero. The root element
+    of a region is found without waiting too, and when it's missing the
+    element is reported as absent.
+    """
+
+    WAIT_MIN_INTERVAL = 0.025
+    """Initial interval in seconds between checks made by :py:attr:`wait`."""
+
+    WAIT_MAX_INTERVAL = 0.5
+    """Maximum interval in seconds between checks made by :py:attr:`wait`."""
+
+    WAIT_BACKOFF = 1.5
+    """Factor the interval between checks made by :py:attr:`wait` grows by."""
+
+    WAIT_IGNORED_EXCEPTIONS = (StaleElementReferenceException,)
+    """Exceptions ignored by :py:attr:`wait` when checking a condition.
+
+    :py:class:`~selenium.common.exceptions.NoSuchElementException` is always
+    ignored.
+    """
+
+    STALE_RETRIES = 0
+    """Number of times a stale element is found again.
+
+    When set, elements returned by :py:func:`find_element` and
+    :py:func:`find_elements` remember how they were found: the locator used,
+    and for regions, the root element of the region and how that was found.
+    If the element becomes stale, for example because part of the page was
+    rendered again, it's found again using the same locators, up to this
+    many times, before
+    :py:class:`~selenium.common.exceptions.StaleElementReferenceException`
+    is raised. Elements in a list are found again by their position. Each
+    retry is counted in the ``retries`` of the
+    :py:class:`~pypom.instrumentation.CommandEvent` reported to listeners.
+
+    :py:class:`~pypom.element.Element` and
+    :py:class:`~pypom.element.Elements` attributes are always found again at
+    least once.
+    """
 
     def __init__(self, selenium, timeout):
         self.selenium = selenium
         self.timeout = timeout
-        self.wait = WebDriverWait(self.selenium, self.timeout)
+        self.wait = _ViewWait(
+            self, self.selenium, self.timeout,
+            min_interval=self.WAIT_MIN_INTERVAL,
+            max_interval=self.WAIT_MAX_INTERVAL,
+            backoff=self.WAIT_BACKOFF,
+            ignored_exceptions=self.WAIT_IGNORED_EXCEPTIONS)
+        self._memo = {}
+
+    @property
+    def listeners(self):
+        """Listeners that are passed a
+        :py:class:`~pypom.instrumentation.CommandEvent` for each command.
+
+        Regions share the listeners of the page they appear in. Listeners can
+        be added to or removed from this list at any time.
+        """
+        return self._dispatcher.listeners
+
+    def refresh_elements(self):
+        """Forget elements remembered by :py:class:`~pypom.element.Element` and
+        :py:class:`~pypom.element.Elements` attributes.
+
+        Each element will be found again the next time its attribute is read.
+
+        :return: The current page or region object.
+
+        """
+        self._memo.clear()
+        return self
+
+    _snapshot = None
+
+    _frame_path = ()
+
+    def _switch_to_frame(self):
+        path = self._frame_path
+        if not path and self._frames.path == ():
+            # frames aren't used, or the driver is already at the top level
+            return
+        if self._snapshot is not None:
+            if path:
+                raise UsageError(
+                    'Regions in frames can\'t be read from a snapshot.')
+            return
+        self._frames.switch(self, path)
+
+    @property
+    def _search_context(self):
+        if self._frame_path or self._frames.path != ():
+            self._switch_to_frame()
+        snapshot = self._snapshot
+        return self.selenium if snapshot is None else snapshot
 
+    def _context_chain(self):
+        # the search context is found by following script locators from
+        # another context, so that nested regions can be found in one go
+        return self._search_context, []
+
+    def _find_in_context(self, strategy, locator, many):
+        context = self._search_context
+        if many:
+            return context.find_elements(strategy, locator)
+        return context.find_element(strategy, locator)
+
+    def _execute_in_context(self, script, *args):
+        # scripts receive the root element (or null) as their first argument
+        context = self._search_context
+        root = None if context is self.selenium else context
+        return self.selenium.execute_script(script, root, *args)
+
+    def _execute_async_in_context(self, script, *args):
+        context = self._search_context
+        root = None if context is self.selenium else context
+        return self.selenium.execute_async_script(script, root, *args)
+
+    @instrumented
     def find_element(self, strategy, locator):
         """Finds an element on the page.
 
@@ -24,13 +404,14 @@ class WebView(object):
         :rtype: selenium.webdriver.remote.webelement.WebElement
 
         """
-        from pypom import Region
-        if isinstance(self, Region):
-            root = self.root
-            if root is not None:
-                return root.find_element(strategy, locator)
-        return self.selenium.find_element(strategy, locator)
+        element = self._find_in_context(strategy, locator, False)
+        if self.STALE_RETRIES:
+            return _resolving(
+                self, element, lambda: self.find_element(strategy, locator),
+                (strategy, locator), self.STALE_RETRIES)
+        return element
 
+    @instrumented
     def find_elements(self, strategy, locator):
         """Finds elements on the page.
 
@@ -42,13 +423,353 @@ class WebView(object):
         :rtype: list
 
         """
-        from pypom import Region
-        if isinstance(self, Region):
-            root = self.root
-            if root is not None:
-                return root.find_elements(strategy, locator)
-        return self.selenium.find_elements(strategy, locator)
+        elements = self._find_in_context(strategy, locator, True)
+        if self.STALE_RETRIES:
+            return _resolving_all(
+                self, elements, lambda: self.find_elements(strategy, locator),
+                (strategy, locator), self.STALE_RETRIES)
+        return elements
+
+    @instrumented
+    def find_many(self, locators):
+        """Finds several elements on the page.
+
+        Locators that can be expressed as CSS selectors or XPath are all
+        resolved with a single command. Any other locators are found
+        individually.
+
+        :param locators: Mapping of names to ``(strategy, locator)`` tuples. See :py:class:`~selenium.webdriver.common.by.By` for valid strategies.
+        :type locators: dict
+        :return: Mapping of the same names to :py:class:`~selenium.webdriver.remote.webelement.WebElement` objects, or ``None`` where no element was found.
+        :rtype: dict
+
+        Usage::
+
+          elements = page.find_many({
+              'email': (By.ID, 'email'),
+              'submit': (By.CSS_SELECTOR, 'form button[type=submit]')})
+
+        """
+        results = {}
+        names = []
+        script_locators = []
+        for name, (strategy, locator) in locators.items():
+            script_locator = to_script_locator(strategy, locator)
+            if script_locator is None or self._snapshot is not None:
+                try:
+                    results[name] = self.find_element(strategy, locator)
+                except NoSuchElementException:
+                    results[name] = None
+            else:
+                names.append(name)
+                script_locators.append(list(script_locator))
+        if script_locators:
+            elements = self._execute_in_context(
+                scripts.FIND_MANY, script_locators)
+            results.update(zip(names, elements))
+        return results
+
+    def extract(self, *names):
+        """Read the values of fields.
+
+        Fields are declared using :py:class:`~pypom.element.Field`
+        attributes. Fields with locators that can be expressed as CSS
+        selectors or XPath are all read with a single command, and any others
+        are read individually. The text and visibility read by the script are
+        close to, but not always the same as, those reported by Selenium,
+        which takes layout into account in more detail.
+
+        :param names: (optional) Names of the fields to read. Defaults to all fields.
+        :type names: str
+        :return: Mapping of field names to their values.
+        :rtype: dict
+        :raises: UsageError if a name isn't a field.
+
+        Usage::
+
+          class Login(Page):
+              username = Field(By.ID, 'username', attribute='value')
+              error = Field(By.CLASS_NAME, 'error', displayed=True)
+
+          assert page.extract() == {'username': 'ada', 'error': False}
+
+        """
+        fields = self._fields
+        if names:
+            unknown = [name for name in names if name not in fields]
+            if unknown:
+                raise UsageError('%s has no field %s.' % (
+                    type(self).__name__, ', '.join(unknown)))
+            fields = dict((name, fields[name]) for name in names)
+        return self._dispatcher.call(
+            type(self), 'extract', None, self._extract, fields)
+
+    def _extract(self, fields):
+        values = {}
+        names = []
+        script_fields = []
+        for name, field in fields.items():
+            script_locator = to_script_locator(field.strategy, field.locator)
+            if script_locator is None or self._snapshot is not None:
+                elements = self.find_elements(field.strategy, field.locator)
+                if field.many:
+                    values[name] = [field._read(e) for e in elements]
+                else:
+                    values[name] = field._read(elements[0]) if elements else None
+            else:
+                names.append(name)
+                script_fields.append(list(script_locator) + [
+                    field.attribute, bool(field.displayed), bool(field.many)])
+        if script_fields:
+            values.update(zip(names, self._execute_in_context(
+                scripts.EXTRACT, script_fields)))
+        return values
+
+    def fill(self, values, native=()):
+        """Fill in form fields.
+
+        Fields with locators that can be expressed as CSS selectors or XPath
+        are filled with a single script, which sets their values and
+        dispatches ``input`` and ``change`` events like a user would. Any
+        other fields, fields listed in ``native``, and fields the script
+        can't fill, such as file inputs or disabled fields, are filled
+        individually by clearing them and sending keys. Use ``native`` for
+        fields that rely on key events, such as autocompletion.
+
+        Values are strings, or booleans for checkboxes and radio buttons.
+        Options of select elements are chosen by their value or text. Fields
+        are filled in the order given, except that those the script can't
+        fill are filled after the others in the same script.
+
+        :param values: Mapping of fields to values. Fields are names of :py:class:`~pypom.element.Field` attributes, :py:class:`~pypom.element.Field` or :py:class:`~pypom.element.Element` attributes, or ``(strategy, locator)`` tuples.
+        :param native: (optional) Fields to fill by sending keys.
+        :type values: dict
+        :type native: list
+        :return: A :py:class:`~pypom.view.FillRecord` for each field, in the order given.
+        :rtype: list
+        :raises: UsageError if a name isn't a field.
+
+        Usage::
+
+          class Login(Page):
+              username = Field(By.ID, 'username', attribute='value')
+              _password_locator = (By.ID, 'password')
+
+          page.fill(OrderedDict([
+              ('username', 'ada'),
+              (Login._password_locator, 'secret'),
+              ((By.ID, 'remember'), True)]))
+
+        """
+        fields = []
+        for key, value in values.items():
+            if isinstance(value, bool):
+                pass
+            elif value is None:
+                value = ''
+            else:
+                value = '%s' % (value,)
+            fields.append((key, self._fill_locator(key), value))
+        native = list(native)
+        return self._dispatcher.call(
+            type(self), 'fill', None, self._fill, fields, native)
+
+    def _fill_locator(self, key):
+        if isinstance(key, _Locator):
+            return key.strategy, key.locator
+        if isinstance(key, tuple) and len(key) == 2:
+            return key
+        field = self._fields.get(key)
+        if field is None:
+            raise UsageError('%s has no field %s.' % (
+                type(self).__name__, key))
+        return field.strategy, field.locator
+
+    def _fill(self, fields, native):
+        records = []
+        batch = []
+        for key, (strategy, locator), value in fields:
+            script_locator = to_script_locator(strategy, locator)
+            if any([script_locator is None, self._snapshot is not None,
+                    key in native]):
+                records.extend(self._fill_script(batch))
+                batch = []
+                records.append(self._fill_native(key, strategy, locator, value))
+            else:
+                batch.append((key, (strategy, locator), script_locator, value))
+        records.extend(self._fill_script(batch))
+        return records
+
+    def _fill_script(self, batch):
+        if not batch:
+            return []
+        results = self._execute_in_context(scripts.FILL, [
+            list(script_locator) + [value]
+            for key, locator, script_locator, value in batch])
+        records = [None] * len(batch)
+        unfilled = []
+        for index, (field, (status, elapsed)) in enumerate(
+                zip(batch, results)):
+            if status == 1:
+                records[index] = FillRecord(field[0], False, elapsed / 1000.0)
+            else:
+                unfilled.append(index)
+        for index in unfilled:
+            key, (strategy, locator), script_locator, value = batch[index]
+            records[index] = self._fill_native(key, strategy, locator, value)
+        return records
+
+    def _fill_native(self, key, strategy, locator, value):
+        start = _clock()
+        element = self.find_element(strategy, locator)
+        if isinstance(value, bool):
+            if element.is_selected() != value:
+                element.click()
+        else:
+            element.clear()
+            element.send_keys(value)
+        return FillRecord(key, True, _clock() - start)
 
+    def wait_for_any(self, conditions):
+        """Wait until any of several conditions is met.
+
+        Each check of the conditions costs a single command, however many
+        there are, as long as they are locators that can be expressed as CSS
+        selectors or XPath, or :py:class:`~pypom.conditions.ScriptCondition`
+        objects. Any other conditions are checked individually. Checks are
+        made by :py:attr:`wait`, so use its timeout and intervals.
+
+        :param conditions: Mapping of names to conditions. A condition is a ``(strategy, locator)`` tuple that is met when an element is present, a :py:class:`~pypom.conditions.ScriptCondition`, or a callable that takes the driver.
+        :type conditions: dict
+        :return: Name of the condition that was met. When several are met at once, the first in the order of ``conditions``.
+        :raises: :py:class:`~selenium.common.exceptions.TimeoutException`
+
+        Usage::
+
+          outcome = page.wait_for_any({
+              'saved': (By.CLASS_NAME, 'success'),
+              'invalid': (By.CSS_SELECTOR, '.field .error'),
+              'captcha': ScriptCondition('return !!window.grecaptcha;')})
+
+        """
+        return self._dispatcher.call(
+            type(self), 'wait_for_any', None, self._wait_for_any,
+            _Conditions(self, conditions))
+
+    def _wait_for_any(self, conditions):
+        def any_met(driver):
+            values = conditions(driver)
+            met = [name for name in conditions.names if values[name]]
+            return met[:1]
+        return self.wait.until(any_met, 'Timed out waiting for any of: %s' % (
+            ', '.join('%s' % (name,) for name in conditions.names)))[0]
+
+    def wait_for_all(self, conditions):
+        """Wait until all of several conditions are met.
+
+        Conditions are checked together, as with :py:func:`wait_for_any`.
+
+        :param conditions: Mapping of names to conditions, as for :py:func:`wait_for_any`.
+        :type conditions: dict
+        :return: Mapping of the same names to the values of the conditions, which are elements for locators.
+        :rtype: dict
+        :raises: :py:class:`~selenium.common.exceptions.TimeoutException`
+
+        """
+        return self._dispatcher.call(
+            type(self), 'wait_for_all', None, self._wait_for_all,
+            _Conditions(self, conditions))
+
+    def _wait_for_all(self, conditions):
+        def all_met(driver):
+            values = conditions(driver)
+            return all(values.values()) and values
+        return self.wait.until(all_met, 'Timed out waiting for all of: %s' % (
+            ', '.join('%s' % (name,) for name in conditions.names)))
+
+    def wait_for_element(self, strategy, locator, state='present',
+                         text=None):
+        """Wait for an element to appear, disappear, or change its text.
+
+        Rather than checking repeatedly, a script watches the page or region
+        for changes and returns as soon as the element reaches the state, so
+        the whole wait is a single command. The wait times out after the
+        timeout of :py:attr:`wait`, or the script timeout of the driver if
+        that is shorter. Locators that can't be expressed as CSS selectors or
+        XPath are checked repeatedly by :py:attr:`wait` instead.
+
+        :param strategy: Location strategy to use. See :py:class:`~selenium.webdriver.common.by.By` for valid values.
+        :param locator: Location of target element.
+        :param state: (optional) ``'present'`` to wait for the element to appear, ``'absent'`` to wait for it to disappear, or ``'text'`` to wait for its text to change. Defaults to ``'present'``.
+        :param text: (optional) Text to wait for when ``state`` is ``'text'``. Defaults to waiting for any change.
+        :type strategy: str
+        :type locator: str
+        :type state: str
+        :type text: str
+        :return: The element when it's present, ``True`` when it's absent, or its new text.
+        :raises: :py:class:`~selenium.common.exceptions.TimeoutException`
+
+        Usage::
+
+          self.find_element(*self._save_locator).click()
+          self.wait_for_element(By.CLASS_NAME, 'saving', state='absent')
+
+        """
+        if state not in ('present', 'absent', 'text'):
+            raise UsageError(
+                "State must be 'present', 'absent' or 'text', not %r." % (
+                    state,))
+        return self._dispatcher.call(
+            type(self), 'wait_for_element', (strategy, locator),
+            self._wait_for_element, strategy, locator, state, text)
+
+    def _wait_for_element(self, strategy, locator, state, text):
+        if state == 'text':
+            message = 'Timed out waiting for the text of %s=%s to change.' % (
+                strategy, locator)
+        else:
+            message = 'Timed out waiting for %s=%s to be %s.' % (
+                strategy, locator, state)
+        script_locator = to_script_locator(strategy, locator)
+        if script_locator is None or self._snapshot is not None:
+            return self._poll_for_element(
+                strategy, locator, state, text, message)
+        start = _clock()
+        met = False
+        try:
+            met, value = self._execute_async_in_context(
+                scripts.OBSERVE, list(script_locator), state, text,
+                int(self.wait.timeout * 1000))
+        finally:
+            # recorded like a polling wait, including when the script times
+            # out, with until_not for an element disappearing
+            self.wait._record(
+                (strategy, locator), state != 'absent', met, start, 1)
+        if not met:
+            raise TimeoutException(message)
+        return True if state == 'absent' else value
+
+    def _poll_for_element(self, strategy, locator, state, text, message):
+        def find(driver):
+            return self._find_element_no_wait(strategy, locator)
+        if state == 'present':
+            return self.wait.until(find, message)
+        if state == 'absent':
+            self.wait.until_not(find, message)
+            return True
+        element = find(self.selenium)
+        initial = element.text if element is not None else None
+
+        def text_changed(driver):
+            element = find(driver)
+            if element is None:
+                return False
+            current = element.text
+            changed = current != initial if text is None else current == text
+            return changed and [current]
+        return self.wait.until(text_changed, message)[0]
+
+    @instrumented
     def is_element_present(self, strategy, locator):
         """Checks whether an element is present.
 
@@ -60,11 +781,18 @@ class WebView(object):
         :rtype: bool
 
         """
+        if self.FAST_PRESENCE_CHECKS:
+            try:
+                return self._find_element_no_wait(strategy, locator) or False
+            except NoSuchElementException:
+                # the root element of a region is missing
+                return False
         try:
             return self.find_element(strategy, locator)
         except NoSuchElementException:
             return False
 
+    @instrumented
     def is_element_displayed(self, strategy, locator):
         """Checks whether an element is displayed.
 
@@ -76,7 +804,38 @@ class WebView(object):
         :rtype: bool
 
         """
+        if self.FAST_PRESENCE_CHECKS:
+            try:
+                element = self._find_element_no_wait(strategy, locator)
+            except NoSuchElementException:
+                return False
+            return element is not None and element.is_displayed()
         try:
             return self.find_element(strategy, locator).is_displayed()
         except NoSuchElementException:
             return False
+
+    def _find_element_no_wait(self, strategy, locator):
+        if self._snapshot is not None:
+            elements = self.find_elements(strategy, locator)
+            return elements[0] if elements else None
+        if to_script_locator(strategy, locator) is not None:
+            return self.find_many({0: (strategy, locator)})[0]
+        with self._implicit_wait_disabled():
+            elements = self.find_elements(strategy, locator)
+        return elements[0] if elements else None
+
+    @contextmanager
+    def _implicit_wait_disabled(self):
+        try:
+            implicit_wait = self.selenium.timeouts.implicit_wait
+        except AttributeError:
+            # older versions of Selenium can't report the implicit wait, so
+            # there's nothing to restore it to afterwards
+            yield
+            return
+        self.selenium.implicitly_wait(0)
+        try:
+            yield
+        finally:
+            self.selenium.implicitly_wait(implicit_wait)
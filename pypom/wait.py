@@ -0,0 +1,170 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from collections import deque, namedtuple
+import time
+
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+_clock = getattr(time, 'monotonic', time.time)
+
+
+class WaitRecord(namedtuple(
+        'WaitRecord', ['method', 'until', 'satisfied', 'elapsed', 'checks'])):
+    """Outcome of a single call to :py:func:`Wait.until` or
+    :py:func:`Wait.until_not`.
+
+    Contains the condition ``method``, whether the wait was ``until``
+    (``True``) or ``until_not`` (``False``), whether the condition was
+    ``satisfied`` before timing out, the ``elapsed`` time in seconds, and the
+    number of ``checks`` made.
+    """
+    __slots__ = ()
+
+
+class Wait(WebDriverWait):
+    """An explicit wait that polls quickly at first, then backs off.
+
+    Conditions are first checked immediately, then again after
+    ``min_interval`` seconds. The interval between checks is multiplied by
+    ``backoff`` after each check, up to ``max_interval`` seconds. A condition
+    that becomes true shortly after the wait starts is therefore noticed
+    almost immediately, while slower conditions don't flood the browser with
+    commands.
+
+    The outcome of each wait is kept as a :py:class:`WaitRecord` in
+    :py:attr:`records`, which can be used to tune timeouts.
+
+    :param driver: WebDriver object passed to the conditions.
+    :param timeout: Number of seconds before timing out.
+    :param min_interval: (optional) Initial interval between checks. Defaults to ``0.025``.
+    :param max_interval: (optional) Maximum interval between checks. Defaults to ``0.5``.
+    :param backoff: (optional) Factor the interval grows by after each check. Defaults to ``1.5``.
+    :param ignored_exceptions: (optional) Exception classes to ignore when checking conditions, in addition to :py:class:`~selenium.common.exceptions.NoSuchElementException`.
+    :param max_records: (optional) Number of records to keep. Defaults to ``1000``.
+    :type driver: :py:class:`~selenium.webdriver.remote.webdriver.WebDriver`
+    :type timeout: float
+    :type min_interval: float
+    :type max_interval: float
+    :type backoff: float
+    :type ignored_exceptions: tuple
+    :type max_records: int
+
+    """
+
+    def __init__(self, driver, timeout, min_interval=0.025, max_interval=0.5,
+                 backoff=1.5, ignored_exceptions=None, max_records=1000):
+        super(Wait, self).__init__(driver, timeout, min_interval,
+                                   ignored_exceptions)
+        self.driver = driver
+        self.timeout = float(timeout)
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.backoff = backoff
+        self.ignored_exceptions = (NoSuchElementException,) + tuple(
+            ignored_exceptions or ())
+        self.records = deque(maxlen=max_records)
+        """Recent :py:class:`WaitRecord` objects, oldest first."""
+
+    def _record(self, method, until, satisfied, start, checks):
+        self.records.append(WaitRecord(
+            method, until, satisfied, _clock() - start, checks))
+
+    def _intervals(self):
+        interval = self.min_interval
+        while True:
+            yield interval
+            interval = min(interval * self.backoff, self.max_interval)
+
+    def until(self, method, message=''):
+        """Wait until the method returns a value that is not ``False``.
+
+        :param method: Callable that takes the driver as an argument.
+        :param message: (optional) Message for the timeout exception.
+        :return: The result of the last call to ``method``.
+        :raises: :py:class:`~selenium.common.exceptions.TimeoutException`
+
+        """
+        return self._poll_until(method, message, True)
+
+    def until_not(self, method, message=''):
+        """Wait until the method returns a value that is ``False``.
+
+        :param method: Callable that takes the driver as an argument.
+        :param message: (optional) Message for the timeout exception.
+        :return: The result of the last call to ``method``, or ``True`` if an
+          ignored exception was raised.
+        :raises: :py:class:`~selenium.common.exceptions.TimeoutException`
+
+        """
+        return self._poll_until(method, message, False)
+
+    def _poll_until(self, method, message, until):
+        poll = _Poll(self, method, until)
+        while True:
+            try:
+                poll.checked(method(self.driver))
+            except self.ignored_exceptions as e:
+                poll.ignored(e)
+            if poll.done:
+                return poll.result(message)
+            time.sleep(poll.delay)
+
+
+class _Poll(object):
+    """Progress of a single wait, shared by synchronous and asynchronous
+    waits, which check the condition and sleep for :py:attr:`delay` until
+    :py:attr:`done`."""
+
+    def __init__(self, wait, method, until):
+        self.done = False
+        self.delay = None
+        self._wait = wait
+        self._method = method
+        self._until = until
+        self._start = _clock()
+        self._end_time = self._start + wait.timeout
+        self._intervals = wait._intervals()
+        self._checks = 0
+        self._satisfied = False
+        self._value = None
+        self._screen = self._stacktrace = None
+
+    def checked(self, value):
+        self._checks += 1
+        if bool(value) == self._until:
+            self._finish(True, value)
+        else:
+            self._next()
+
+    def ignored(self, error):
+        self._checks += 1
+        if not self._until:
+            # the element is gone, or no longer in a usable state
+            self._finish(True, True)
+            return
+        self._screen = getattr(error, 'screen', None)
+        self._stacktrace = getattr(error, 'stacktrace', None)
+        self._next()
+
+    def result(self, message):
+        if self._satisfied:
+            return self._value
+        raise TimeoutException(message, self._screen, self._stacktrace)
+
+    def _next(self):
+        interval = next(self._intervals)
+        remaining = self._end_time - _clock()
+        if remaining <= 0:
+            self._finish(False, None)
+        else:
+            self.delay = min(interval, remaining)
+
+    def _finish(self, satisfied, value):
+        self.done = True
+        self._satisfied = satisfied
+        self._value = value
+        self._wait._record(
+            self._method, self._until, satisfied, self._start, self._checks)
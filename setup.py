@@ -9,6 +9,7 @@ setup(name='PyPOM',
       url='https://github.com/mozilla/PyPOM',
       packages=['pypom'],
       install_requires=['selenium'],
+      extras_require={'snapshot': ['lxml', 'cssselect']},
       license='Mozilla Public License 2.0 (MPL 2.0)',
       keywords='pypom page object model selenium',
       classifiers=[
@@ -25,4 +26,5 @@ setup(name='PyPOM',
           'Programming Language :: Python :: 2.6',
           'Programming Language :: Python :: 2.7',
           'Programming Language :: Python :: 3.3',
-          'Programming Language :: Python :: 3.4'])
+          'Programming Language :: Python :: 3.4',
+          'Programming Language :: Python :: 3.5'])
@@ -0,0 +1,367 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import asyncio
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+import socket
+from socketserver import ThreadingMixIn
+import threading
+
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    TimeoutException,
+    WebDriverException)
+from selenium.webdriver.common.by import By
+import pytest
+
+from pypom.aio import (
+    AsyncElement,
+    AsyncPage,
+    AsyncRegion,
+    AsyncSession,
+    ConnectionPool,
+    ELEMENT_KEY)
+from pypom.conditions import ScriptCondition
+from pypom.exception import UsageError
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _respond(self, status, value):
+        body = json.dumps({'value': value}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length).decode('utf-8') or 'null')
+        server = self.server
+        server.requests.append((self.command, self.path, body))
+        parts = self.path.strip('/').split('/')
+        if parts == ['session']:
+            return 200, {'sessionId': 'abc', 'capabilities': body}
+        path = '/'.join(parts[2:])
+        if self.command == 'DELETE':
+            return 200, None
+        if path == 'url':
+            if self.command == 'POST':
+                server.url = body['url']
+                return 200, None
+            return 200, server.url
+        if path == 'execute/sync':
+            return 200, server.scripts.pop(0) if server.scripts else None
+        parent = None
+        if parts[2] == 'element' and len(parts) > 4:
+            parent, path = parts[3], '/'.join(parts[4:])
+        if path in ('element', 'elements'):
+            ids = server.elements.get((parent, body['using'], body['value']))
+            if path == 'elements':
+                return 200, [{ELEMENT_KEY: i} for i in ids or []]
+            if not ids:
+                return 404, {'error': 'no such element', 'message': 'nope'}
+            return 200, {ELEMENT_KEY: ids[0]}
+        if path == 'text':
+            return 200, 'text of %s' % parent
+        if path == 'displayed':
+            return 200, parent != 'hidden'
+        return 404, {'error': 'unknown command', 'message': self.path}
+
+    def do_GET(self):
+        self._respond(*self._handle())
+
+    do_POST = do_DELETE = do_GET
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def server(request):
+    server = Server(('127.0.0.1', 0), Handler)
+    server.requests = []
+    server.scripts = []
+    server.url = None
+    server.elements = {
+        (None, By.CSS_SELECTOR, '[id="header"]'): ['header'],
+        (None, By.CSS_SELECTOR, '[id="hidden"]'): ['hidden'],
+        (None, By.CSS_SELECTOR, 'li'): ['li1', 'li2'],
+        ('header', By.CSS_SELECTOR, '[class~="title"]'): ['title'],
+        (None, By.CSS_SELECTOR, '[class~="title"]'): ['other-title'],
+    }
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,))
+    thread.daemon = True
+    thread.start()
+    server.executor = 'http://127.0.0.1:%d' % server.server_port
+
+    def fin():
+        server.shutdown()
+        server.server_close()
+    request.addfinalizer(fin)
+    return server
+
+
+@pytest.fixture
+def loop(request):
+    loop = asyncio.new_event_loop()
+    request.addfinalizer(loop.close)
+    return loop
+
+
+@pytest.fixture
+def session(loop, server):
+    return loop.run_until_complete(AsyncSession.create(
+        server.executor, {'browserName': 'firefox'}))
+
+
+class MyPage(AsyncPage):
+    URL_TEMPLATE = '/{locale}/'
+
+
+class Header(AsyncRegion):
+    _root_locator = (By.ID, 'header')
+    _title_locator = (By.CLASS_NAME, 'title')
+
+
+def test_create_session(session, server):
+    assert session.session_id == 'abc'
+    method, path, body = server.requests[0]
+    assert (method, path) == ('POST', '/session')
+    assert body == {'capabilities': {
+        'alwaysMatch': {'browserName': 'firefox'}}}
+
+
+def test_unsupported_url():
+    with pytest.raises(UsageError):
+        ConnectionPool('ftp://localhost')
+
+
+def test_connections_reused(loop, session, server):
+    for i in range(5):
+        loop.run_until_complete(session.current_url())
+    assert session.pool.requests == 6
+    assert session.pool.connections == 1
+
+
+def test_idle_connection_closed_by_server(loop, session, server):
+    loop.run_until_complete(session.current_url())
+    for reader, writer in session.pool._idle:
+        writer.transport.abort()
+    server.url = 'https://example.com/'
+    assert loop.run_until_complete(session.current_url()) == server.url
+    assert session.pool.connections == 2
+
+
+@pytest.fixture
+def flaky(loop, request):
+    # a server that answers the first request on each connection, and
+    # closes the connection without answering any others
+    received = []
+
+    async def handle(reader, writer):
+        answered = False
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            length = 0
+            while True:
+                header = await reader.readline()
+                if header in (b'\r\n', b''):
+                    break
+                name, value = header.decode('latin-1').split(':', 1)
+                if name.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            received.append(line.split()[0].decode('latin-1'))
+            if answered:
+                break
+            answered = True
+            writer.write(
+                b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                b'Content-Length: 15\r\n\r\n{"value": null}')
+        writer.close()
+    server = loop.run_until_complete(
+        asyncio.start_server(handle, '127.0.0.1', 0))
+    request.addfinalizer(server.close)
+    port = server.sockets[0].getsockname()[1]
+    pool = ConnectionPool('http://127.0.0.1:%d' % port)
+    return pool, received
+
+
+def test_idempotent_request_retried(loop, flaky):
+    pool, received = flaky
+    loop.run_until_complete(pool.execute('GET', '/status'))
+    loop.run_until_complete(pool.execute('GET', '/status'))
+    assert received == ['GET', 'GET', 'GET']
+    assert pool.connections == 2
+
+
+def test_post_not_retried(loop, flaky):
+    pool, received = flaky
+    loop.run_until_complete(pool.execute('GET', '/status'))
+    with pytest.raises(asyncio.IncompleteReadError):
+        loop.run_until_complete(pool.execute('POST', '/click', {}))
+    assert received == ['GET', 'POST']
+
+
+def test_server_not_responding(loop):
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(1)
+    pool = ConnectionPool(
+        'http://127.0.0.1:%d' % listener.getsockname()[1], timeout=0.05)
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            loop.run_until_complete(pool.execute('GET', '/status'))
+    finally:
+        listener.close()
+
+
+def test_pool_used_from_another_loop(loop, server):
+    pool = ConnectionPool(server.executor)
+    loop.run_until_complete(pool.execute('GET', '/session/abc/url'))
+    other = asyncio.new_event_loop()
+    try:
+        other.run_until_complete(pool.execute('GET', '/session/abc/url'))
+    finally:
+        other.close()
+    assert pool.connections == 2
+
+
+def test_concurrent_sessions(loop, server):
+    pool = ConnectionPool(server.executor, size=3)
+
+    async def drive():
+        sessions = await asyncio.gather(
+            *[AsyncSession.create(server.executor, pool=pool) for i in range(6)])
+        await asyncio.gather(*[s.get('https://example.com/') for s in sessions])
+    loop.run_until_complete(drive())
+    assert pool.requests == 12
+    assert pool.connections <= 3
+
+
+def test_error(loop, session):
+    with pytest.raises(NoSuchElementException):
+        loop.run_until_complete(session.find_element(By.ID, 'missing'))
+    with pytest.raises(WebDriverException):
+        loop.run_until_complete(session.title())
+
+
+def test_page_open(loop, session, server, base_url):
+    page = MyPage(session, base_url, locale='en-US')
+    assert page.seed_url == base_url + 'en-US/'
+    assert loop.run_until_complete(page.open()) is page
+    assert server.url == base_url + 'en-US/'
+
+
+def test_page_url_kwargs_checked(session):
+    with pytest.raises(UsageError):
+        MyPage(session)
+
+
+def test_page_open_without_url(loop, session):
+    with pytest.raises(UsageError):
+        loop.run_until_complete(AsyncPage(session).open())
+
+
+def test_page_load_condition(loop, session, server, base_url):
+    class LoadingPage(MyPage):
+        LOAD_CONDITION = ScriptCondition('return window.ready;')
+        WAIT_MIN_INTERVAL = 0.001
+    server.scripts = [False, False, True]
+    page = LoadingPage(session, base_url, locale='de')
+    loop.run_until_complete(page.open())
+    assert server.scripts == []
+    assert page.wait.records[-1].checks == 3
+
+
+def test_wait_timeout(loop, session):
+    page = AsyncPage(session, timeout=0.05)
+    with pytest.raises(TimeoutException):
+        loop.run_until_complete(page.wait.until(lambda s: False))
+    assert loop.run_until_complete(
+        page.wait.until_not(lambda s: False)) is False
+
+
+def test_find_element(loop, session, server):
+    page = AsyncPage(session)
+    element = loop.run_until_complete(page.find_element(By.ID, 'header'))
+    assert element == AsyncElement(session, 'header')
+    assert server.requests[-1][1] == '/session/abc/element'
+    assert server.requests[-1][2] == {
+        'using': By.CSS_SELECTOR, 'value': '[id="header"]'}
+
+
+def test_find_elements(loop, session):
+    page = AsyncPage(session)
+    elements = loop.run_until_complete(
+        page.find_elements(By.TAG_NAME, 'li'))
+    assert [e.id for e in elements] == ['li1', 'li2']
+
+
+def test_is_element_present(loop, session):
+    page = AsyncPage(session)
+    assert loop.run_until_complete(page.is_element_present(By.ID, 'header'))
+    assert not loop.run_until_complete(
+        page.is_element_present(By.ID, 'missing'))
+
+
+def test_is_element_displayed(loop, session):
+    page = AsyncPage(session)
+    assert loop.run_until_complete(page.is_element_displayed(By.ID, 'header'))
+    assert not loop.run_until_complete(
+        page.is_element_displayed(By.ID, 'hidden'))
+    assert not loop.run_until_complete(
+        page.is_element_displayed(By.ID, 'missing'))
+
+
+def test_execute_script_elements(loop, session, server):
+    element = AsyncElement(session, 'header')
+    server.scripts = [[{ELEMENT_KEY: 'li1'}, 1]]
+    result = loop.run_until_complete(
+        session.execute_script('return arguments;', element))
+    assert result == [AsyncElement(session, 'li1'), 1]
+    assert server.requests[-1][2]['args'] == [{ELEMENT_KEY: 'header'}]
+
+
+def test_region(loop, session, server):
+    page = AsyncPage(session)
+
+    async def title():
+        header = await Header(page)
+        element = await header.find_element(*header._title_locator)
+        return await element.get_text()
+    assert loop.run_until_complete(title()) == 'text of title'
+    assert server.requests[-2][1] == '/session/abc/element/header/element'
+
+
+def test_region_root(loop, session):
+    page = AsyncPage(session)
+    root = AsyncElement(session, 'header')
+    region = AsyncRegion(page, root=root)
+    assert loop.run_until_complete(region.root) is root
+    assert loop.run_until_complete(AsyncRegion(page).root) is None
+
+
+def test_region_without_root(loop, session):
+    page = AsyncPage(session)
+    element = loop.run_until_complete(
+        AsyncRegion(page).find_element(By.CLASS_NAME, 'title'))
+    assert element.id == 'other-title'
+
+
+def test_quit(loop, session, server):
+    loop.run_until_complete(session.quit())
+    loop.run_until_complete(session.pool.close())
+    assert server.requests[-1][:2] == ('DELETE', '/session/abc')
+    assert session.pool._idle == []
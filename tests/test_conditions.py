@@ -0,0 +1,21 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from pypom import scripts
+from pypom.conditions import DocumentReady, NetworkIdle, ScriptCondition
+
+
+def test_document_ready(selenium):
+    assert DocumentReady()(selenium) == selenium.execute_script.return_value
+    selenium.execute_script.assert_called_once_with(scripts.DOCUMENT_READY)
+
+
+def test_network_idle(selenium):
+    NetworkIdle(0.25)(selenium)
+    selenium.execute_script.assert_called_once_with(scripts.NETWORK_IDLE, 250)
+
+
+def test_script_condition(selenium):
+    ScriptCondition('return arguments[0];', 1)(selenium)
+    selenium.execute_script.assert_called_once_with('return arguments[0];', 1)
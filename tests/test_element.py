@@ -0,0 +1,449 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from collections import OrderedDict
+
+from mock import Mock
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.remote.webelement import WebElement
+import pytest
+
+from pypom import Element, Elements, Field, Page, Region, scripts
+from pypom.exception import UsageError
+from pypom.view import FillRecord
+
+
+class MyPage(Page):
+    submit = Element('id', 'submit')
+    rows = Elements('css selector', 'tr')
+
+
+class MyRegion(Region):
+    submit = Element('id', 'submit')
+
+
+@pytest.fixture
+def page(base_url, selenium):
+    return MyPage(selenium, base_url)
+
+
+def test_class_access():
+    assert isinstance(MyPage.submit, Element)
+
+
+def test_element_memoized(page, selenium, element):
+    assert page.submit is page.submit
+    selenium.find_element.assert_called_once_with('id', 'submit')
+
+
+def test_element_per_instance(base_url, selenium, element):
+    MyPage(selenium, base_url).submit
+    MyPage(selenium, base_url).submit
+    assert selenium.find_element.call_count == 2
+
+
+def test_elements_memoized(page, selenium):
+    selenium.find_elements.return_value = [Mock(), Mock()]
+    assert page.rows == selenium.find_elements.return_value
+    page.rows
+    selenium.find_elements.assert_called_once_with('css selector', 'tr')
+
+
+def test_open_invalidates(page, selenium, element):
+    page.submit
+    page.open()
+    page.submit
+    assert selenium.find_element.call_count == 2
+
+
+def test_refresh_elements(page, selenium, element):
+    page.submit
+    assert page.refresh_elements() is page
+    page.submit
+    assert selenium.find_element.call_count == 2
+
+
+def test_region_root(page, selenium):
+    root_element = Mock()
+    MyRegion(page, root=root_element).submit
+    root_element.find_element.assert_called_once_with('id', 'submit')
+    selenium.find_element.assert_not_called()
+
+
+def test_stale_element_found_again(page, selenium):
+    parent = Mock()
+    parent.execute.side_effect = [
+        StaleElementReferenceException(), {'value': 'Submit'}]
+    selenium.find_element.side_effect = [
+        WebElement(parent, 'stale'), WebElement(parent, 'fresh')]
+    submit = page.submit
+    assert isinstance(submit, WebElement)
+    assert submit.text == 'Submit'
+    assert submit.id == 'fresh'
+    assert page.submit is submit
+    assert selenium.find_element.call_count == 2
+
+
+class AppElement(WebElement):
+
+    def __init__(self, parent, id_, w3c=False):
+        super(AppElement, self).__init__(parent, id_)
+        self._w3c = w3c
+
+    def tap(self):
+        return self._execute('tap')['value']
+
+
+def test_stale_element_keeps_class(page, selenium):
+    parent = Mock()
+    parent.execute.side_effect = [
+        StaleElementReferenceException(), {'value': 'tapped'}]
+    selenium.find_element.side_effect = [
+        AppElement(parent, 'stale', w3c=True), AppElement(parent, 'fresh')]
+    submit = page.submit
+    assert isinstance(submit, AppElement)
+    assert submit._w3c is True
+    assert submit.tap() == 'tapped'
+    assert submit.id == 'fresh'
+
+
+def test_stale_elements_found_again(page, selenium):
+    parent = Mock()
+    parent.execute.side_effect = [
+        StaleElementReferenceException(), {'value': 'Row'}]
+    selenium.find_elements.side_effect = [
+        [WebElement(parent, 'a'), WebElement(parent, 'stale')],
+        [WebElement(parent, 'a'), WebElement(parent, 'fresh')]]
+    row = page.rows[1]
+    assert row.text == 'Row'
+    assert row.id == 'fresh'
+
+
+def test_stale_elements_removed(page, selenium):
+    parent = Mock()
+    parent.execute.side_effect = StaleElementReferenceException()
+    selenium.find_elements.side_effect = [[WebElement(parent, 'a')], []]
+    with pytest.raises(StaleElementReferenceException):
+        page.rows[0].text
+
+
+class TestStaleRetries:
+
+    @pytest.fixture
+    def parent(self):
+        return Mock()
+
+    @pytest.fixture
+    def page(self, base_url, selenium):
+        page = Page(selenium, base_url)
+        page.STALE_RETRIES = 2
+        return page
+
+    def stale(self, parent, times, value='text'):
+        parent.execute.side_effect = [
+            StaleElementReferenceException()] * times + [{'value': value}]
+
+    def test_disabled_by_default(self, base_url, selenium, parent):
+        element = WebElement(parent, 'a')
+        selenium.find_element.return_value = element
+        assert Page(selenium, base_url).find_element('id', 'a') is element
+
+    def test_find_element(self, page, selenium, parent):
+        selenium.find_element.side_effect = [
+            WebElement(parent, 'a'), WebElement(parent, 'b'),
+            WebElement(parent, 'c')]
+        self.stale(parent, 2)
+        element = page.find_element('id', 'a')
+        assert element.text == 'text'
+        assert element.id == 'c'
+        assert selenium.find_element.call_count == 3
+
+    def test_retries_exhausted(self, page, selenium, parent):
+        selenium.find_element.return_value = WebElement(parent, 'a')
+        self.stale(parent, 3)
+        element = page.find_element('id', 'a')
+        with pytest.raises(StaleElementReferenceException):
+            element.text
+        assert selenium.find_element.call_count == 3
+
+    def test_stale_while_finding_again(self, page, selenium, parent):
+        selenium.find_element.side_effect = [
+            WebElement(parent, 'a'), StaleElementReferenceException(),
+            WebElement(parent, 'c')]
+        self.stale(parent, 2)
+        assert page.find_element('id', 'a').text == 'text'
+
+    def test_find_elements(self, page, selenium, parent):
+        selenium.find_elements.side_effect = [
+            [WebElement(parent, 'a'), WebElement(parent, 'b')],
+            [WebElement(parent, 'c'), WebElement(parent, 'd')]]
+        self.stale(parent, 1)
+        elements = page.find_elements('css selector', 'tr')
+        assert elements[1].text == 'text'
+        assert elements[1].id == 'd'
+
+    def test_find_elements_removed(self, page, selenium, parent):
+        selenium.find_elements.return_value = [
+            WebElement(parent, 'a'), WebElement(parent, 'b')]
+        elements = page.find_elements('css selector', 'tr')
+        selenium.find_elements.return_value = [WebElement(parent, 'c')]
+        self.stale(parent, 3)
+        with pytest.raises(StaleElementReferenceException):
+            elements[1].text
+
+    def test_region_chain(self, page, selenium, parent):
+        class MyRegion(Region):
+            _root_locator = ('id', 'root')
+            STALE_RETRIES = 1
+        root = selenium.find_element.return_value
+        root.find_element.side_effect = [
+            WebElement(parent, 'a'), WebElement(parent, 'b')]
+        self.stale(parent, 1)
+        element = MyRegion(page).find_element('id', 'a')
+        assert element.text == 'text'
+        assert selenium.find_element.call_count == 2
+        assert root.find_element.call_count == 2
+
+    def test_region_list(self, page, selenium, parent):
+        from pypom import RegionList
+
+        class MyRegion(Region):
+            STALE_RETRIES = 1
+        selenium.execute_script.return_value = [
+            2, [WebElement(parent, 'a'), WebElement(parent, 'b')]]
+        selenium.find_elements.return_value = [
+            WebElement(parent, 'c'), WebElement(parent, 'd')]
+        self.stale(parent, 1)
+        regions = RegionList(page, MyRegion, 'css selector', 'tr')
+        assert regions[1].root.text == 'text'
+        assert regions[1].root.id == 'd'
+
+    def test_retry_reported(self, page, selenium, parent):
+        listener = Mock()
+        page.listeners.append(listener)
+        selenium.find_element.side_effect = [
+            WebElement(parent, 'a'), WebElement(parent, 'b')]
+        self.stale(parent, 1)
+        page.find_element('id', 'a').text
+        find, retry = [c[0][0] for c in listener.call_args_list]
+        assert (find.method, find.retries) == ('find_element', 0)
+        assert (retry.method, retry.locator) == ('retry', ('id', 'a'))
+        assert retry.retries == 1
+
+    def test_cached_root_retry_reported(self, page, selenium):
+        class MyRegion(Region):
+            _root_locator = ('id', 'root')
+            CACHE_ROOT = True
+        listener = Mock()
+        page.listeners.append(listener)
+        region = MyRegion(page)
+        region.root
+        stale_root, root = Mock(), Mock()
+        stale_root.find_element.side_effect = StaleElementReferenceException()
+        selenium.find_element.side_effect = [stale_root, root]
+        region.clear_root_cache()
+        region.root
+        listener.reset_mock()
+        region.find_element('id', 'a')
+        find, retry = [c[0][0] for c in listener.call_args_list]
+        assert isinstance(find.error, StaleElementReferenceException)
+        assert (retry.method, retry.view) == ('retry', MyRegion)
+        assert retry.retries == 1
+        assert retry.error is None
+
+
+class Profile(Page):
+    name = Field('class name', 'name')
+    email = Field('name', 'email', attribute='value')
+    verified = Field('class name', 'verified', displayed=True)
+    roles = Field('css selector', '.roles li', many=True)
+
+
+class TestField:
+
+    @pytest.fixture
+    def page(self, base_url, selenium):
+        return Profile(selenium, base_url)
+
+    def script_fields(self, selenium):
+        script, root, fields = selenium.execute_script.call_args[0]
+        assert script == scripts.EXTRACT
+        return root, fields
+
+    def test_extract(self, page, selenium):
+        def execute_script(script, root, fields):
+            return [f[1] for f in fields]
+        selenium.execute_script.side_effect = execute_script
+        assert page.extract() == {
+            'name': '[class~="name"]', 'email': '[name="email"]',
+            'verified': '[class~="verified"]', 'roles': '.roles li'}
+        assert selenium.execute_script.call_count == 1
+        root, fields = self.script_fields(selenium)
+        assert root is None
+        assert sorted(fields) == [
+            ['css selector', '.roles li', None, False, True],
+            ['css selector', '[class~="name"]', None, False, False],
+            ['css selector', '[class~="verified"]', None, True, False],
+            ['css selector', '[name="email"]', 'value', False, False]]
+
+    def test_extract_names(self, page, selenium):
+        selenium.execute_script.return_value = ['ada@example.com']
+        assert page.extract('email') == {'email': 'ada@example.com'}
+        with pytest.raises(UsageError):
+            page.extract('email', 'phone')
+
+    def test_descriptor(self, page, selenium):
+        selenium.execute_script.return_value = ['Ada']
+        assert page.name == 'Ada'
+        root, fields = self.script_fields(selenium)
+        assert fields == [['css selector', '[class~="name"]', None, False,
+                           False]]
+        assert isinstance(Profile.name, Field)
+
+    def test_region_root(self, element, page, selenium):
+        class Card(Region):
+            _root_locator = ('id', 'card')
+            title = Field('tag name', 'h2')
+        selenium.execute_script.return_value = ['Title']
+        assert Card(page).extract() == {'title': 'Title'}
+        assert self.script_fields(selenium)[0] is element
+
+    def test_unsupported_locator(self, page, selenium):
+        class Links(Page):
+            home = Field('link text', 'Home', attribute='href')
+            menu = Field('partial link text', 'Menu', displayed=True)
+            all = Field('link text', 'All', many=True)
+            missing = Field('link text', 'Missing')
+        home, menu, all = Mock(), Mock(), Mock()
+        selenium.find_elements.side_effect = lambda strategy, locator: {
+            'Home': [home], 'Menu': [menu], 'All': [all, all],
+            'Missing': []}[locator]
+        values = Links(selenium).extract()
+        assert values == {
+            'home': home.get_attribute.return_value,
+            'menu': menu.is_displayed.return_value,
+            'all': [all.text, all.text],
+            'missing': None}
+        home.get_attribute.assert_called_once_with('href')
+        assert not selenium.execute_script.called
+
+    def test_inherited(self, selenium):
+        class Other(Profile):
+            name = None
+            phone = Field('name', 'phone', attribute='value')
+        assert sorted(Other._fields) == ['email', 'phone', 'roles', 'verified']
+
+    def test_invalid_locator(self):
+        with pytest.raises(UsageError):
+            class Broken(Page):
+                name = Field('css selector', 'a[')
+
+    def test_listeners(self, page, selenium):
+        listener = Mock()
+        page.listeners.append(listener)
+        selenium.execute_script.return_value = [None]
+        page.name
+        page.extract()
+        events = [c[0][0] for c in listener.call_args_list]
+        assert [(e.method, e.locator) for e in events] == [
+            ('extract', ('class name', 'name')), ('extract', None)]
+
+
+class TestFill:
+
+    @pytest.fixture
+    def page(self, base_url, selenium):
+        return Profile(selenium, base_url)
+
+    def script_fields(self, selenium):
+        script, root, fields = selenium.execute_script.call_args[0]
+        assert script == scripts.FILL
+        return root, fields
+
+    def test_fill(self, page, selenium):
+        selenium.execute_script.return_value = [[1, 5], [1, 10], [1, 20]]
+        records = page.fill(OrderedDict([
+            ('email', 'ada@example.com'),
+            (Profile.name, 42),
+            (('id', 'agree'), True)]))
+        assert selenium.execute_script.call_count == 1
+        root, fields = self.script_fields(selenium)
+        assert root is None
+        assert fields == [
+            ['css selector', '[name="email"]', 'ada@example.com'],
+            ['css selector', '[class~="name"]', '42'],
+            ['css selector', '[id="agree"]', True]]
+        assert records == [
+            FillRecord('email', False, 0.005),
+            FillRecord(Profile.name, False, 0.01),
+            FillRecord(('id', 'agree'), False, 0.02)]
+        assert not selenium.find_element.called
+
+    def test_native(self, page, selenium):
+        selenium.execute_script.return_value = [[1, 5]]
+        records = page.fill(OrderedDict([
+            ('email', 'ada@example.com'),
+            (('id', 'search'), 'pypom')]), native=[('id', 'search')])
+        assert self.script_fields(selenium)[1] == [
+            ['css selector', '[name="email"]', 'ada@example.com']]
+        selenium.find_element.assert_called_once_with('id', 'search')
+        element = selenium.find_element.return_value
+        element.clear.assert_called_once_with()
+        element.send_keys.assert_called_once_with('pypom')
+        assert [(r.field, r.native) for r in records] == [
+            ('email', False), (('id', 'search'), True)]
+
+    def test_native_preserves_order(self, page, selenium):
+        calls = []
+        selenium.execute_script.side_effect = lambda *args: (
+            calls.append('script') or [[1, 0]])
+        selenium.find_element.side_effect = lambda *args: (
+            calls.append('native') or Mock())
+        page.fill(OrderedDict([
+            ('email', 'a'), ('name', 'b'), (('id', 'c'), 'c')]),
+            native=['name'])
+        assert calls == ['script', 'native', 'script']
+
+    def test_fallback(self, page, selenium):
+        selenium.execute_script.return_value = [[-1, 5], [0, 1], [1, 2]]
+        checkbox = Mock()
+        checkbox.is_selected.return_value = False
+        upload, edit = Mock(), Mock()
+        selenium.find_element.side_effect = lambda strategy, locator: {
+            'upload': upload, 'agree': checkbox, 'Edit': edit}[locator]
+        records = page.fill(OrderedDict([
+            (('name', 'upload'), '/tmp/file.txt'),
+            (('id', 'agree'), True),
+            ('email', 'ada@example.com'),
+            (('link text', 'Edit'), None)]))
+        upload.send_keys.assert_called_once_with('/tmp/file.txt')
+        checkbox.click.assert_called_once_with()
+        assert not checkbox.send_keys.called
+        edit.send_keys.assert_called_once_with('')
+        assert [r.native for r in records] == [True, True, False, True]
+
+    def test_checkbox_already_checked(self, page, selenium):
+        selenium.find_element.return_value.is_selected.return_value = True
+        page.fill({('link text', 'Agree'): True})
+        assert not selenium.find_element.return_value.click.called
+
+    def test_unknown_field(self, page, selenium):
+        with pytest.raises(UsageError):
+            page.fill({'phone': '555'})
+        assert not selenium.execute_script.called
+
+    def test_region_root(self, element, page, selenium):
+        class Card(Region):
+            _root_locator = ('id', 'card')
+            title = Field('tag name', 'input')
+        selenium.execute_script.return_value = [[1, 0]]
+        Card(page).fill({'title': 'Title'})
+        assert self.script_fields(selenium)[0] is element
+
+    def test_listeners(self, page, selenium):
+        listener = Mock()
+        page.listeners.append(listener)
+        page.fill({('link text', 'Edit'): 'x'})
+        events = [c[0][0] for c in listener.call_args_list]
+        assert [(e.method, e.locator) for e in events] == [('fill', None)]
@@ -0,0 +1,151 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from mock import Mock
+from selenium.common.exceptions import NoSuchElementException
+import pytest
+
+from pypom import Page, Region
+from pypom.instrumentation import CommandEvent, CommandStatistics
+
+
+@pytest.fixture
+def listener(page):
+    listener = Mock()
+    page.listeners.append(listener)
+    return listener
+
+
+def events(listener):
+    return [c[0][0] for c in listener.call_args_list]
+
+
+def test_no_listeners(page):
+    assert page.listeners == []
+
+
+def test_class_listeners(base_url, selenium):
+    listener = Mock()
+
+    class MyPage(Page):
+        LISTENERS = (listener,)
+    page = MyPage(selenium, base_url)
+    assert page.listeners == [listener]
+    page.listeners.remove(listener)
+    assert MyPage(selenium, base_url).listeners == [listener]
+
+
+def test_find_element(page, listener):
+    page.find_element('id', 'a')
+    event, = events(listener)
+    assert isinstance(event, CommandEvent)
+    assert event.view is Page
+    assert event.method == 'find_element'
+    assert event.locator == ('id', 'a')
+    assert event.duration >= 0
+    assert event.error is None
+
+
+def test_error(page, listener, selenium):
+    error = NoSuchElementException()
+    selenium.find_element.side_effect = error
+    with pytest.raises(NoSuchElementException):
+        page.find_element('id', 'a')
+    assert events(listener)[0].error is error
+
+
+def test_listener_error_logged(page, listener, selenium, caplog):
+    selenium.find_element.side_effect = NoSuchElementException()
+    failing = Mock(side_effect=ValueError('listener'))
+    page.listeners.insert(0, failing)
+    with pytest.raises(NoSuchElementException):
+        page.find_element('id', 'a')
+    assert listener.called
+    assert 'Listener' in caplog.text
+    assert 'ValueError' in caplog.text
+
+
+def test_listener_error_raised(page, selenium):
+    page.listeners.append(Mock(side_effect=ValueError('listener')))
+    with pytest.raises(ValueError):
+        page.find_element('id', 'a')
+
+
+def test_nested_commands_not_reported(page, listener, selenium):
+    selenium.find_element.side_effect = NoSuchElementException()
+    page.is_element_present('id', 'a')
+    event, = events(listener)
+    assert event.method == 'is_element_present'
+
+
+def test_find_many(page, listener, selenium):
+    selenium.execute_script.return_value = [None, None]
+    page.find_many({'a': ('id', 'a'), 'b': ('id', 'b')})
+    assert events(listener)[0].locator == (('id', 'a'), ('id', 'b'))
+
+
+def test_region(page, listener):
+    class MyRegion(Region):
+        _root_locator = ('id', 'root')
+    region = MyRegion(page)
+    assert region.listeners is page.listeners
+    region.find_elements('id', 'a')
+    event, = events(listener)
+    assert event.view is MyRegion
+    assert event.method == 'find_elements'
+
+
+def test_open(page, listener, base_url):
+    page.open()
+    event, = events(listener)
+    assert event.method == 'open'
+    assert event.locator == base_url
+
+
+def test_wait(page, listener):
+    condition = Mock(return_value=True)
+    page.wait.until(condition)
+    page.wait.until_not(lambda s: False)
+    until, until_not = events(listener)
+    assert until.method == 'wait.until'
+    assert until.locator is condition
+    assert until_not.method == 'wait.until_not'
+
+
+class TestCommandStatistics:
+
+    def test_aggregate(self, page, selenium):
+        statistics = CommandStatistics()
+        page.listeners.append(statistics)
+
+        class MyRegion(Region):
+            pass
+        region = MyRegion(page)
+        page.find_element('id', 'a')
+        region.find_element('id', 'a')
+        region.find_element('id', 'b')
+        slowest = statistics.slowest_locators()
+        assert sorted(s.locator for s in slowest) == [('id', 'a'), ('id', 'b')]
+        calls = dict((s.locator, s.calls) for s in slowest)
+        assert calls == {('id', 'a'): 2, ('id', 'b'): 1}
+        views = statistics.most_called_views()
+        assert [(v.view, v.calls) for v in views] == [(MyRegion, 2), (Page, 1)]
+        assert 'MyRegion' in statistics.report()
+
+    def test_order(self):
+        statistics = CommandStatistics()
+        statistics(CommandEvent(Page, 'find_element', 'fast', 0.1, None, 0))
+        statistics(CommandEvent(Page, 'find_element', 'slow', 0.5, None, 0))
+        statistics(CommandEvent(Page, 'find_element', 'fast', 0.1, None, 0))
+        slow, fast = statistics.slowest_locators()
+        assert slow == ('slow', 1, 0.5, 0.5, 0)
+        assert fast.calls == 2
+        assert statistics.slowest_locators(1) == [slow]
+
+    def test_reset(self):
+        statistics = CommandStatistics()
+        statistics(CommandEvent(Page, 'find_element', 'a', 0.1, None, 0))
+        statistics.reset()
+        assert statistics.slowest_locators() == []
+        assert statistics.most_called_views() == []
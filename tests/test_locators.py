@@ -0,0 +1,73 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from selenium.webdriver.common.by import By
+import pytest
+
+from pypom.exception import UsageError
+from pypom.locators import check_locator, to_script_locator
+
+
+@pytest.mark.parametrize('locator, expected', [
+    ((By.CSS_SELECTOR, 'a.b'), (By.CSS_SELECTOR, 'a.b')),
+    ((By.XPATH, '//a'), (By.XPATH, '//a')),
+    ((By.ID, 'a"b'), (By.CSS_SELECTOR, '[id="a\\"b"]')),
+    ((By.NAME, 'q'), (By.CSS_SELECTOR, '[name="q"]')),
+    ((By.CLASS_NAME, 'result'), (By.CSS_SELECTOR, '[class~="result"]')),
+    ((By.TAG_NAME, 'tr'), (By.CSS_SELECTOR, 'tr')),
+])
+def test_to_script_locator(locator, expected):
+    assert to_script_locator(*locator) == expected
+
+
+@pytest.mark.parametrize('locator', [
+    (By.LINK_TEXT, 'Home'),
+    (By.PARTIAL_LINK_TEXT, 'Ho'),
+    (By.CLASS_NAME, 'a b'),
+    (By.TAG_NAME, 'a b'),
+])
+def test_to_script_locator_unsupported(locator):
+    assert to_script_locator(*locator) is None
+
+
+@pytest.mark.parametrize('locator', [
+    (By.ID, 'header'),
+    (By.LINK_TEXT, 'Log in'),
+    (By.CSS_SELECTOR, 'a:not(.b, .c) > [data-x="]"]'),
+    (By.CSS_SELECTOR, '#a\\:b, li:nth-child({0})'),
+    (By.CSS_SELECTOR, ':scope > li:has(> a)'),
+    (By.XPATH, '(//li)[last()]'),
+    (By.XPATH, '//li[{index}]'),
+    (By.XPATH, '//li[%d]'),
+    (By.CLASS_NAME, ' result '),
+])
+def test_check_locator(locator):
+    check_locator(*locator)
+
+
+@pytest.mark.parametrize('locator', [
+    ('identifier', 'header'),
+    (By.ID, ''),
+    (By.ID, None),
+    (By.CLASS_NAME, 'a b'),
+    (By.CSS_SELECTOR, 'li[['),
+    (By.CSS_SELECTOR, 'a)'),
+    (By.CSS_SELECTOR, '[href="a]'),
+    (By.CSS_SELECTOR, 'ul >'),
+    (By.CSS_SELECTOR, 'a,, b'),
+    (By.XPATH, ''),
+])
+def test_check_locator_invalid(locator):
+    with pytest.raises(UsageError):
+        check_locator(*locator)
+
+
+def test_check_locator_xpath_compiled():
+    pytest.importorskip('lxml')
+    with pytest.raises(UsageError):
+        check_locator(By.XPATH, '//li[@class=]')
+
+
+def test_check_locator_strategies():
+    check_locator('accessibility id', 'login', ['accessibility id'])
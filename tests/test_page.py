@@ -4,6 +4,7 @@
 
 import random
 
+from mock import Mock
 import pytest
 
 from pypom import Page
@@ -142,3 +143,416 @@ def test_is_element_displayed_not_displayed(page, selenium):
     assert not page.is_element_displayed(*locator)
     selenium.find_element.assert_called_with(*locator)
     element.is_displayed.assert_called_once_with()
+
+
+def test_find_many(page, selenium):
+    from selenium.webdriver.common.by import By
+    from pypom import scripts
+    first, second = Mock(), Mock()
+    selenium.execute_script.return_value = [first, second]
+    elements = page.find_many({
+        'first': (By.CSS_SELECTOR, '.first'),
+        'second': (By.XPATH, '//second')})
+    assert elements == {'first': first, 'second': second}
+    script, root, locators = selenium.execute_script.call_args[0]
+    assert script == scripts.FIND_MANY
+    assert root is None
+    assert sorted(locators) == [['css selector', '.first'], ['xpath', '//second']]
+    selenium.find_element.assert_not_called()
+
+
+def test_find_many_not_found(page, selenium):
+    from selenium.webdriver.common.by import By
+    selenium.execute_script.return_value = [None]
+    assert page.find_many({'a': (By.ID, 'a')}) == {'a': None}
+
+
+def test_find_many_fallback(page, selenium):
+    from selenium.common.exceptions import NoSuchElementException
+    from selenium.webdriver.common.by import By
+    selenium.find_element.side_effect = NoSuchElementException()
+    elements = page.find_many({'link': (By.LINK_TEXT, 'Home')})
+    assert elements == {'link': None}
+    selenium.find_element.assert_called_once_with(By.LINK_TEXT, 'Home')
+    selenium.execute_script.assert_not_called()
+
+
+class TestFastPresenceChecks:
+
+    @pytest.fixture
+    def page(self, base_url, selenium):
+        class MyPage(Page):
+            FAST_PRESENCE_CHECKS = True
+        return MyPage(selenium, base_url)
+
+    def test_is_element_present(self, page, selenium):
+        element = Mock()
+        selenium.execute_script.return_value = [element]
+        assert page.is_element_present('css selector', '.banner') == element
+        selenium.find_element.assert_not_called()
+
+    def test_is_element_present_not_present(self, page, selenium):
+        selenium.execute_script.return_value = [None]
+        assert page.is_element_present('id', 'banner') is False
+        selenium.find_element.assert_not_called()
+
+    def test_is_element_displayed(self, page, selenium):
+        element = Mock()
+        element.is_displayed.return_value = False
+        selenium.execute_script.return_value = [element]
+        assert not page.is_element_displayed('css selector', '.banner')
+        element.is_displayed.assert_called_once_with()
+
+    def test_is_element_displayed_not_present(self, page, selenium):
+        selenium.execute_script.return_value = [None]
+        assert not page.is_element_displayed('css selector', '.banner')
+
+    def test_implicit_wait_disabled(self, page, selenium):
+        selenium.timeouts.implicit_wait = 5
+        selenium.find_elements.return_value = []
+        assert not page.is_element_present('link text', 'Home')
+        selenium.find_elements.assert_called_once_with('link text', 'Home')
+        assert [c[0] for c in selenium.implicitly_wait.call_args_list] == [
+            (0,), (5,)]
+
+    def test_implicit_wait_restored_on_error(self, page, selenium):
+        from selenium.common.exceptions import WebDriverException
+        selenium.timeouts.implicit_wait = 5
+        selenium.find_elements.side_effect = WebDriverException()
+        with pytest.raises(WebDriverException):
+            page.is_element_present('link text', 'Home')
+        selenium.implicitly_wait.assert_called_with(5)
+
+
+class TestSeedURL:
+
+    def test_invalid_template(self):
+        from pypom.exception import UsageError
+        with pytest.raises(UsageError):
+            class MyPage(Page):
+                URL_TEMPLATE = '/{locale'
+
+    def test_positional_template(self):
+        from pypom.exception import UsageError
+        with pytest.raises(UsageError):
+            class MyPage(Page):
+                URL_TEMPLATE = '/{}/about'
+
+    def test_missing_keywords(self, base_url, selenium):
+        from pypom.exception import UsageError
+
+        class MyPage(Page):
+            URL_TEMPLATE = '/{locale}/{slug}'
+        with pytest.raises(UsageError) as e:
+            MyPage(selenium, base_url, locale='en-US')
+        assert 'slug' in str(e.value)
+
+    def test_attribute_fields(self, base_url, selenium):
+        class MyPage(Page):
+            URL_TEMPLATE = '/{user.name}/{items[0]}'
+        user = Mock()
+        user.name = 'dave'
+        page = MyPage(selenium, base_url, user=user, items=['a'])
+        assert page.seed_url == base_url + 'dave/a'
+
+    def test_cached(self, base_url, selenium):
+        calls = []
+
+        class Template(str):
+            def format(self, *args, **kwargs):
+                calls.append(kwargs)
+                return str.format(self, *args, **kwargs)
+
+        class MyPage(Page):
+            URL_TEMPLATE = Template('/{locale}/')
+        page = MyPage(selenium, base_url, locale='de')
+        assert page.seed_url == page.seed_url == base_url + 'de/'
+        page.open()
+        assert calls == [{'locale': 'de'}]
+
+    def test_base_url_invalidates(self, selenium):
+        class MyPage(Page):
+            URL_TEMPLATE = '/about'
+        page = MyPage(selenium, 'https://www.mozilla.org')
+        page.seed_url
+        page.base_url = 'https://www.test.com'
+        assert page.seed_url == 'https://www.test.com/about'
+
+    def test_url_kwargs_invalidates(self, base_url, selenium):
+        class MyPage(Page):
+            URL_TEMPLATE = '/{locale}/'
+        page = MyPage(selenium, base_url, locale='en-US')
+        assert page.seed_url == base_url + 'en-US/'
+        page.url_kwargs = {'locale': 'de'}
+        assert page.seed_url == base_url + 'de/'
+
+    def test_url_kwargs_missing(self, base_url, selenium):
+        from pypom.exception import UsageError
+
+        class MyPage(Page):
+            URL_TEMPLATE = '/{locale}/'
+        page = MyPage(selenium, base_url, locale='en-US')
+        with pytest.raises(UsageError):
+            page.url_kwargs = {}
+
+    def test_template_changed(self, base_url, selenium):
+        page = Page(selenium, base_url)
+        assert page.seed_url == base_url
+        page.URL_TEMPLATE = '/about'
+        assert page.seed_url == base_url + 'about'
+
+
+class TestLoadCondition:
+
+    def test_wait_for_page(self, base_url, selenium):
+        condition = Mock(side_effect=[False, True])
+
+        class MyPage(Page):
+            LOAD_CONDITION = condition
+        page = MyPage(selenium, base_url)
+        assert page.open() is page
+        assert condition.call_count == 2
+        condition.assert_called_with(selenium)
+
+    def test_timeout(self, base_url, selenium):
+        from selenium.common.exceptions import TimeoutException
+
+        class MyPage(Page):
+            LOAD_CONDITION = Mock(return_value=False)
+        with pytest.raises(TimeoutException):
+            MyPage(selenium, base_url, timeout=0).open()
+
+
+class TestGeneration:
+
+    def test_open(self, page):
+        assert page.generation == 0
+        page.open()
+        assert page.generation == 1
+
+    def test_invalidate(self, page):
+        assert page.invalidate() is page
+        assert page.generation == 1
+
+    def test_url_not_checked_by_default(self, page, selenium):
+        selenium.current_url = 'https://www.mozilla.org/'
+        page.open()
+        selenium.current_url = 'https://www.mozilla.org/about'
+        assert page.generation == 1
+
+    def test_url_change(self, page, selenium):
+        page.URL_CHECK_INTERVAL = 0
+        selenium.current_url = 'https://www.mozilla.org/'
+        page.open()
+        assert page.generation == 1
+        selenium.current_url = 'https://www.mozilla.org/about'
+        assert page.generation == 2
+        assert page.generation == 2
+
+    def test_url_check_interval(self, page, selenium, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr('pypom.page._clock', lambda: now[0])
+        page.URL_CHECK_INTERVAL = 1
+        selenium.current_url = 'https://www.mozilla.org/'
+        page.open()
+        selenium.current_url = 'https://www.mozilla.org/about'
+        assert page.generation == 1
+        now[0] += 1
+        assert page.generation == 2
+
+    def test_url_check_without_open(self, page, selenium):
+        page.URL_CHECK_INTERVAL = 0
+        selenium.current_url = 'https://www.mozilla.org/'
+        assert page.generation == 0
+        selenium.current_url = 'https://www.mozilla.org/about'
+        assert page.generation == 1
+
+    def test_element_found_again(self, base_url, selenium):
+        from pypom import Element
+
+        class MyPage(Page):
+            URL_CHECK_INTERVAL = 0
+            logo = Element('id', 'logo')
+        page = MyPage(selenium, base_url)
+        selenium.current_url = base_url
+        page.open()
+        page.logo
+        page.logo
+        assert selenium.find_element.call_count == 1
+        selenium.current_url = base_url + 'about'
+        page.logo
+        assert selenium.find_element.call_count == 2
+
+
+class TestWaitForConditions:
+
+    def test_any(self, page, selenium):
+        from collections import OrderedDict
+        from pypom import scripts
+        from pypom.conditions import DocumentReady, ScriptCondition
+        selenium.execute_script.side_effect = [
+            [None, None, False, False], [None, None, 'ready', True]]
+        outcome = page.wait_for_any(OrderedDict([
+            ('saved', ('class name', 'success')),
+            ('invalid', ('css selector', '.error')),
+            ('loaded', DocumentReady()),
+            ('app', ScriptCondition('return arguments[0];', 1))]))
+        assert outcome == 'loaded'
+        assert selenium.execute_script.call_count == 2
+        script, root, locators, args = selenium.execute_script.call_args[0]
+        assert script.startswith(scripts.CHECK_CONDITIONS.split(
+            '/* conditions */')[0])
+        assert scripts.DOCUMENT_READY in script
+        assert 'return arguments[0];' in script
+        assert root is None
+        assert locators == [['css selector', '[class~="success"]'],
+                            ['css selector', '.error']]
+        assert args == [[], [1]]
+
+    def test_any_first_in_order(self, page, selenium):
+        from collections import OrderedDict
+        selenium.execute_script.return_value = [None, 'a', 'b']
+        assert page.wait_for_any(OrderedDict([
+            ('a', ('id', 'a')), ('b', ('id', 'b')),
+            ('c', ('id', 'c'))])) == 'b'
+
+    def test_any_locators_only(self, page, selenium):
+        from pypom import scripts
+        selenium.execute_script.return_value = ['element']
+        assert page.wait_for_any({'saved': ('id', 'saved')}) == 'saved'
+        assert selenium.execute_script.call_args[0][0] == (
+            scripts.CHECK_CONDITIONS)
+
+    def test_any_timeout(self, base_url, selenium):
+        from selenium.common.exceptions import TimeoutException
+        selenium.execute_script.return_value = [None]
+        page = Page(selenium, base_url, timeout=0)
+        with pytest.raises(TimeoutException) as e:
+            page.wait_for_any({'saved': ('id', 'saved')})
+        assert 'saved' in str(e.value)
+
+    def test_other_conditions(self, page, selenium):
+        from collections import OrderedDict
+        condition = Mock(side_effect=[False, 'yes'])
+        selenium.find_element.side_effect = Exception('not called')
+        selenium.find_elements.return_value = []
+        outcome = page.wait_for_any(OrderedDict([
+            ('link', ('link text', 'Done')), ('custom', condition)]))
+        assert outcome == 'custom'
+        condition.assert_called_with(selenium)
+        assert selenium.find_elements.call_count == 2
+        assert not selenium.execute_script.called
+
+    def test_all(self, page, selenium):
+        selenium.execute_script.side_effect = [['a', None], ['a', 'b']]
+        assert page.wait_for_all({
+            'a': ('id', 'a'), 'b': ('id', 'b')}) == {'a': 'a', 'b': 'b'}
+        assert selenium.execute_script.call_count == 2
+
+    def test_invalid(self, page, selenium):
+        from pypom.exception import UsageError
+        with pytest.raises(UsageError):
+            page.wait_for_any({})
+        with pytest.raises(UsageError):
+            page.wait_for_all({'a': 'id'})
+        assert not selenium.execute_script.called
+
+    def test_listeners(self, page, selenium):
+        listener = Mock()
+        page.listeners.append(listener)
+        selenium.execute_script.return_value = ['element']
+        page.wait_for_any({'saved': ('id', 'saved')})
+        events = [c[0][0] for c in listener.call_args_list]
+        assert [(e.method, e.locator) for e in events] == [
+            ('wait_for_any', None)]
+        assert page.wait.records[-1].checks == 1
+
+
+class TestWaitForElement:
+
+    def test_present(self, page, selenium):
+        from pypom import scripts
+        selenium.execute_async_script.return_value = [True, 'element']
+        assert page.wait_for_element('id', 'saved') == 'element'
+        selenium.execute_async_script.assert_called_once_with(
+            scripts.OBSERVE, None, ['css selector', '[id="saved"]'],
+            'present', None, 10000)
+        assert not selenium.execute_script.called
+        record = page.wait.records[-1]
+        assert record.method == ('id', 'saved')
+        assert (record.satisfied, record.checks) == (True, 1)
+
+    def test_absent(self, page, selenium):
+        selenium.execute_async_script.return_value = [True, None]
+        assert page.wait_for_element('id', 'saving', state='absent') is True
+        assert selenium.execute_async_script.call_args[0][3] == 'absent'
+        assert page.wait.records[-1].until is False
+
+    def test_text(self, page, selenium):
+        selenium.execute_async_script.return_value = [True, 'Saved']
+        assert page.wait_for_element(
+            'id', 'status', state='text', text='Saved') == 'Saved'
+        assert selenium.execute_async_script.call_args[0][3:5] == (
+            'text', 'Saved')
+
+    def test_timeout(self, base_url, selenium):
+        from selenium.common.exceptions import TimeoutException
+        selenium.execute_async_script.return_value = [False, None]
+        page = Page(selenium, base_url, timeout=2.5)
+        with pytest.raises(TimeoutException) as e:
+            page.wait_for_element('id', 'saved')
+        assert 'id=saved' in str(e.value)
+        assert selenium.execute_async_script.call_args[0][-1] == 2500
+        assert page.wait.records[-1].satisfied is False
+
+    def test_script_timeout(self, page, selenium):
+        from selenium.common.exceptions import WebDriverException
+        selenium.execute_async_script.side_effect = WebDriverException()
+        with pytest.raises(WebDriverException):
+            page.wait_for_element('id', 'saved')
+        record = page.wait.records[-1]
+        assert record.method == ('id', 'saved')
+        assert (record.until, record.satisfied) == (True, False)
+
+    def test_invalid_state(self, page, selenium):
+        from pypom.exception import UsageError
+        with pytest.raises(UsageError):
+            page.wait_for_element('id', 'saved', state='visible')
+        assert not selenium.execute_async_script.called
+
+    def test_region_root(self, page, selenium, element):
+        from pypom import Region
+
+        class Status(Region):
+            _root_locator = ('id', 'status')
+        selenium.execute_async_script.return_value = [True, 'element']
+        Status(page).wait_for_element('class name', 'done')
+        assert selenium.execute_async_script.call_args[0][1] is element
+
+    def test_polling_fallback(self, page, selenium):
+        link = Mock()
+        selenium.find_elements.side_effect = [[], [link]]
+        assert page.wait_for_element('link text', 'Done') is link
+        assert not selenium.execute_async_script.called
+        selenium.find_elements.side_effect = [[link], []]
+        assert page.wait_for_element('link text', 'Done', state='absent')
+
+    def test_polling_fallback_text(self, page, selenium):
+        link = Mock(text='Saving')
+        selenium.find_elements.return_value = [link]
+
+        def find_elements(*args):
+            if selenium.find_elements.call_count > 2:
+                link.text = ''
+            return [link]
+        selenium.find_elements.side_effect = find_elements
+        assert page.wait_for_element('link text', 'Done', state='text') == ''
+
+    def test_listeners(self, page, selenium):
+        listener = Mock()
+        page.listeners.append(listener)
+        selenium.execute_async_script.return_value = [True, 'element']
+        page.wait_for_element('id', 'saved')
+        events = [c[0][0] for c in listener.call_args_list]
+        assert [(e.method, e.locator) for e in events] == [
+            ('wait_for_element', ('id', 'saved'))]
@@ -0,0 +1,169 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import threading
+
+from mock import Mock
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    NoSuchElementException)
+import pytest
+
+from pypom import Page
+from pypom.exception import UsageError
+import pypom.pool
+from pypom.pool import PoolStatistics, SessionPool, SessionResult
+
+
+class MyPage(Page):
+    URL_TEMPLATE = '/{locale}/'
+
+
+LOCALES = [{'locale': locale} for locale in ('en-US', 'de', 'fr', 'es', 'it')]
+
+
+@pytest.fixture
+def sessions():
+    return [Mock(), Mock()]
+
+
+@pytest.fixture
+def pool(sessions):
+    return SessionPool(sessions)
+
+
+def test_no_sessions():
+    with pytest.raises(UsageError):
+        SessionPool([])
+
+
+def test_run(pool, sessions, base_url):
+    results = list(pool.run(MyPage, LOCALES, lambda page: page.seed_url,
+                            base_url=base_url))
+    assert len(results) == len(LOCALES)
+    assert all(isinstance(r, SessionResult) for r in results)
+    values = sorted(r.value for r in results)
+    assert values == sorted(base_url + kw['locale'] + '/' for kw in LOCALES)
+    assert all(r.error is None and r.duration >= 0 for r in results)
+    urls = [c[0][0] for s in sessions for c in s.get.call_args_list]
+    assert sorted(urls) == values
+
+
+def test_results_streamed(pool, base_url):
+    release = threading.Event()
+
+    def func(page):
+        if page.url_kwargs['locale'] == 'en-US':
+            release.wait(5)
+        return page.url_kwargs['locale']
+    results = pool.run(MyPage, LOCALES[:2], func, base_url=base_url)
+    assert next(results).value == 'de'
+    release.set()
+    assert next(results).value == 'en-US'
+
+
+def test_error_isolated(pool, base_url):
+    error = Exception('broken')
+
+    def func(page):
+        if page.url_kwargs['locale'] == 'de':
+            raise error
+        return True
+    results = list(pool.run(MyPage, LOCALES, func, base_url=base_url))
+    failed = [r for r in results if r.error is not None]
+    assert len(failed) == 1
+    assert failed[0].url_kwargs == {'locale': 'de'}
+    assert failed[0].error is error
+    assert failed[0].value is None
+    assert sum(1 for r in results if r.value) == len(LOCALES) - 1
+
+
+def test_open_error_isolated(pool, sessions, base_url):
+    sessions[0].get.side_effect = Exception('session lost')
+    results = list(pool.run(MyPage, LOCALES, base_url=base_url))
+    assert len(results) == len(LOCALES)
+    assert all((r.error is None) == (r.session == 1) for r in results)
+
+
+def test_without_func(pool, base_url):
+    results = list(pool.run(MyPage, LOCALES, base_url=base_url))
+    assert [r.value for r in results] == [None] * len(LOCALES)
+
+
+def test_more_sessions_than_pages(base_url):
+    sessions = [Mock() for i in range(10)]
+    results = list(SessionPool(sessions).run(
+        MyPage, LOCALES[:1], base_url=base_url))
+    assert len(results) == 1
+    assert sum(s.get.call_count for s in sessions) == 1
+
+
+def test_close_early(base_url):
+    session = Mock()
+    started, release = threading.Event(), threading.Event()
+
+    def func(page):
+        if session.get.call_count > 1:
+            started.set()
+            release.wait(5)
+    results = SessionPool([session]).run(
+        MyPage, LOCALES, func, base_url=base_url)
+    next(results)
+    started.wait(5)
+    threading.Timer(0.05, release.set).start()
+    results.close()
+    assert session.get.call_count == 2
+
+
+def test_statistics(pool, base_url):
+    assert pool.statistics == PoolStatistics(0, 0, 0.0, (0, 0))
+    assert pool.statistics.throughput == 0.0
+
+    def func(page):
+        if page.url_kwargs['locale'] == 'de':
+            raise Exception()
+    list(pool.run(MyPage, LOCALES, func, base_url=base_url))
+    statistics = pool.statistics
+    assert statistics.completed == len(LOCALES)
+    assert statistics.failed == 1
+    assert statistics.elapsed > 0
+    assert sum(statistics.sessions) == len(LOCALES)
+    assert statistics.throughput > 0
+
+
+def test_statistics_after_run(monkeypatch, base_url):
+    now = [100.0]
+    monkeypatch.setattr(pypom.pool, '_clock', lambda: now[0])
+
+    def func(page):
+        now[0] += 1
+    pool = SessionPool([Mock()])
+    list(pool.run(MyPage, LOCALES, func, base_url=base_url))
+    now[0] += 60
+    assert pool.statistics.elapsed == len(LOCALES)
+
+
+def test_lost_session_retired(pool, sessions, base_url):
+    sessions[0].get.side_effect = InvalidSessionIdException()
+    results = list(pool.run(MyPage, LOCALES, base_url=base_url))
+    assert len(results) == len(LOCALES)
+    assert sessions[0].get.call_count == 1
+    assert sum(r.error is None for r in results) == len(LOCALES) - 1
+    assert pool.statistics.sessions == (1, len(LOCALES) - 1)
+
+
+def test_workflow_error_not_retired(pool, sessions, base_url):
+    sessions[0].get.side_effect = NoSuchElementException()
+    list(pool.run(MyPage, LOCALES, base_url=base_url))
+    assert sessions[0].get.call_count > 1
+
+
+def test_all_sessions_lost(base_url):
+    session = Mock()
+    error = session.get.side_effect = InvalidSessionIdException()
+    results = list(SessionPool([session]).run(
+        MyPage, LOCALES, base_url=base_url))
+    assert session.get.call_count == 1
+    assert [r.error for r in results] == [error] * len(LOCALES)
+    assert [r.session for r in results] == [0] + [None] * (len(LOCALES) - 1)
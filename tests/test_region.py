@@ -130,7 +130,7 @@ class TestRootLocator:
     @pytest.fixture
     def region(self, page):
         class MyRegion(Region):
-            _root_locator = (str(random.random()), str(random.random()))
+            _root_locator = ('id', str(random.random()))
         return MyRegion(page)
 
     def test_root(self, element, region, selenium):
@@ -184,3 +184,567 @@ class TestRootLocator:
         assert not region.is_element_displayed(*locator)
         element.find_element.assert_called_with(*locator)
         hidden_element.is_displayed.assert_called_once_with()
+
+
+class TestRootCache:
+
+    @pytest.fixture
+    def region(self, page):
+        class MyRegion(Region):
+            _root_locator = ('id', str(random.random()))
+            CACHE_ROOT = True
+        return MyRegion(page)
+
+    def test_root_not_cached_by_default(self, element, page, selenium):
+        class MyRegion(Region):
+            _root_locator = ('id', str(random.random()))
+        region = MyRegion(page)
+        region.root
+        region.root
+        assert selenium.find_element.call_count == 2
+        assert region.root_cache_hits == 0
+        assert region.root_cache_misses == 0
+
+    def test_root(self, element, region, selenium):
+        assert element == region.root
+        assert element == region.root
+        selenium.find_element.assert_called_once_with(*region._root_locator)
+        assert region.root_cache_hits == 1
+        assert region.root_cache_misses == 1
+
+    def test_invalidate(self, element, page, region, selenium):
+        region.root
+        assert region.invalidate() is region
+        assert page.generation == region.generation == 1
+        region.root
+        assert selenium.find_element.call_count == 2
+
+    def test_url_change(self, element, page, region, selenium):
+        page.URL_CHECK_INTERVAL = 0
+        selenium.current_url = 'https://www.mozilla.org/'
+        region.root
+        region.root
+        selenium.current_url = 'https://www.mozilla.org/about'
+        region.root
+        assert selenium.find_element.call_count == 2
+        assert region.root_cache_misses == 2
+
+    def test_find_element(self, element, region, selenium):
+        locator = (str(random.random()), str(random.random()))
+        region.find_element(*locator)
+        region.find_element(*locator)
+        selenium.find_element.assert_called_once_with(*region._root_locator)
+        assert element.find_element.call_count == 2
+
+    def test_open_invalidates(self, element, region, selenium):
+        region.root
+        region.page.open()
+        region.root
+        assert selenium.find_element.call_count == 2
+        assert region.root_cache_misses == 2
+
+    def test_clear_root_cache(self, element, region, selenium):
+        region.root
+        region.clear_root_cache()
+        region.root
+        assert selenium.find_element.call_count == 2
+
+    def test_stale_root(self, element, region, selenium):
+        from selenium.common.exceptions import StaleElementReferenceException
+        locator = (str(random.random()), str(random.random()))
+        region.root
+        element.find_element.side_effect = [
+            StaleElementReferenceException(), Mock()]
+        region.find_element(*locator)
+        assert selenium.find_element.call_count == 2
+        assert element.find_element.call_count == 2
+
+    def test_stale_not_cached(self, element, page, selenium):
+        from selenium.common.exceptions import StaleElementReferenceException
+        locator = (str(random.random()), str(random.random()))
+        root_element = Mock()
+        root_element.find_element.side_effect = StaleElementReferenceException()
+        region = Region(page, root=root_element)
+        with pytest.raises(StaleElementReferenceException):
+            region.find_element(*locator)
+        root_element.find_element.assert_called_once_with(*locator)
+
+
+def test_find_many_root(element, page, selenium):
+    class MyRegion(Region):
+        _root_locator = ('id', str(random.random()))
+    selenium.execute_script.return_value = [Mock()]
+    MyRegion(page).find_many({'a': ('css selector', 'a')})
+    assert selenium.execute_script.call_args[0][1] == element
+
+
+class TestFastPresenceChecks:
+
+    @pytest.fixture
+    def region(self, page):
+        class MyRegion(Region):
+            _root_locator = ('id', 'root')
+            FAST_PRESENCE_CHECKS = True
+        return MyRegion(page)
+
+    def test_root_found_without_waiting(self, region, selenium):
+        from pypom import scripts
+        element = Mock()
+        selenium.execute_script.return_value = element
+        assert region.is_element_present('css selector', 'a') is element
+        selenium.execute_script.assert_called_once_with(
+            scripts.FIND_CHAIN, None,
+            [['css selector', '[id="root"]'], ['css selector', 'a']], False)
+        selenium.find_element.assert_not_called()
+        assert not selenium.implicitly_wait.called
+
+    def test_root_absent(self, region, selenium):
+        selenium.execute_script.return_value = None
+        assert region.is_element_present('css selector', 'a') is False
+        assert region.is_element_displayed('css selector', 'a') is False
+        selenium.find_element.assert_not_called()
+
+    def test_root_absent_other_locator(self, page, selenium):
+        from selenium.common.exceptions import NoSuchElementException
+
+        class MyRegion(Region):
+            _root_locator = ('link text', 'Root')
+            FAST_PRESENCE_CHECKS = True
+        waits = []
+
+        def find_element(*args):
+            waits.append(selenium.implicitly_wait.call_args[0][0])
+            raise NoSuchElementException()
+        selenium.timeouts.implicit_wait = 5
+        selenium.find_element.side_effect = find_element
+        region = MyRegion(page)
+        assert region.is_element_present('css selector', 'a') is False
+        assert region.is_element_displayed('link text', 'a') is False
+        assert waits == [0, 0]
+        selenium.implicitly_wait.assert_called_with(5)
+
+    def test_root_passed_in(self, page, selenium):
+        class MyRegion(Region):
+            FAST_PRESENCE_CHECKS = True
+        root = Mock()
+        selenium.execute_script.return_value = [None]
+        assert not MyRegion(page, root=root).is_element_present(
+            'css selector', 'a')
+        assert selenium.execute_script.call_args[0][1] is root
+
+    def test_nested_region_root_absent(self, page, selenium):
+        from selenium.common.exceptions import NoSuchElementException
+
+        class Outer(Region):
+            _root_locator = ('id', 'outer')
+
+        class Inner(Region):
+            _root_locator = ('id', 'inner')
+            FAST_PRESENCE_CHECKS = True
+        outer = Outer(page)
+        selenium.timeouts.implicit_wait = 5
+        selenium.find_element.side_effect = NoSuchElementException()
+        assert not Inner(outer).is_element_present('css selector', 'a')
+        assert [c[0] for c in selenium.implicitly_wait.call_args_list] == [
+            (0,), (5,)]
+
+
+class TestLazyLoad:
+
+    @pytest.fixture
+    def region_class(self):
+        class MyRegion(Region):
+            LAZY_LOAD = True
+            loads = 0
+
+            def wait_for_region_to_load(self):
+                self.loads += 1
+                self.root
+                return self
+        return MyRegion
+
+    def test_not_loaded_on_init(self, page, region_class):
+        assert region_class(page, root=Mock()).loads == 0
+
+    def test_loaded_on_first_use(self, page, region_class):
+        locator = (str(random.random()), str(random.random()))
+        root_element = Mock()
+        region = region_class(page, root=root_element)
+        region.find_element(*locator)
+        region.find_elements(*locator)
+        assert region.loads == 1
+        root_element.find_element.assert_called_once_with(*locator)
+
+    def test_loaded_on_root(self, page, region_class):
+        region = region_class(page)
+        region.root
+        region.root
+        assert region.loads == 1
+
+    def test_timeout(self, page):
+        class MyRegion(Region):
+            LAZY_LOAD = True
+
+            def wait_for_region_to_load(self):
+                self.wait.until(lambda s: False)
+        page.timeout = 0
+        region = MyRegion(page)
+        from selenium.common.exceptions import TimeoutException
+        with pytest.raises(TimeoutException):
+            region.root
+        with pytest.raises(TimeoutException):
+            region.root
+
+
+class TestRegionList:
+
+    @pytest.fixture
+    def elements(self, selenium):
+        elements = [Mock() for i in range(7)]
+
+        def execute_script(script, root, locator, start, end):
+            return [len(elements), elements[start:end]]
+        selenium.execute_script.side_effect = execute_script
+        return elements
+
+    @pytest.fixture
+    def regions(self, elements, page):
+        from pypom import RegionList
+        return RegionList(page, Region, 'css selector', '.row', chunk_size=3)
+
+    def test_len(self, regions, selenium):
+        assert len(regions) == 7
+        assert len(regions) == 7
+        assert selenium.execute_script.call_count == 1
+
+    def test_getitem(self, elements, regions, selenium):
+        region = regions[4]
+        assert isinstance(region, Region)
+        assert region.root == elements[4]
+        assert regions[4] is region
+        assert regions[3].root == elements[3]
+        assert selenium.execute_script.call_count == 1
+        assert selenium.execute_script.call_args[0][3:] == (3, 6)
+
+    def test_getitem_negative(self, elements, regions):
+        assert regions[-1].root == elements[6]
+
+    def test_getitem_out_of_range(self, regions):
+        with pytest.raises(IndexError):
+            regions[7]
+        with pytest.raises(IndexError):
+            regions[-8]
+
+    def test_slice(self, elements, regions, selenium):
+        assert [r.root for r in regions[1:5]] == elements[1:5]
+        assert selenium.execute_script.call_count == 2
+
+    def test_iter(self, elements, regions, selenium):
+        assert [r.root for r in regions] == elements
+        assert selenium.execute_script.call_count == 3
+
+    def test_iter_partial(self, elements, regions, selenium):
+        for region in regions:
+            break
+        assert selenium.execute_script.call_count == 1
+
+    def test_regions_created_lazily(self, elements, page):
+        from pypom import RegionList
+
+        class Row(Region):
+            created = []
+
+            def wait_for_region_to_load(self):
+                self.created.append(self.root)
+        rows = RegionList(page, Row, 'css selector', '.row')
+        rows[2]
+        assert Row.created == [elements[2]]
+
+    def test_open_resets(self, regions, selenium):
+        regions[0]
+        regions.page.open()
+        regions[0]
+        assert selenium.execute_script.call_count == 2
+
+    def test_find_elements_fallback(self, page, selenium):
+        from pypom import RegionList
+        elements = [Mock(), Mock()]
+        selenium.find_elements.return_value = elements
+        regions = RegionList(page, Region, 'link text', 'Next')
+        assert [r.root for r in regions] == elements
+        assert len(regions) == 2
+        selenium.find_elements.assert_called_once_with('link text', 'Next')
+        selenium.execute_script.assert_not_called()
+
+
+class TestFrames:
+
+    @pytest.fixture
+    def frame(self, selenium):
+        frame = Mock()
+        selenium.find_element.return_value = frame
+        return frame
+
+    @pytest.fixture
+    def widget(self, page):
+        class Widget(Region):
+            _frame_locator = ('id', 'widget')
+        return Widget(page)
+
+    def test_switch_once(self, frame, page, selenium, widget):
+        widget.find_element('id', 'a')
+        widget.find_element('id', 'b')
+        selenium.switch_to.frame.assert_called_once_with(frame)
+        assert not selenium.switch_to.default_content.called
+        assert page.frame_switches == 1
+        assert page.frame_switches_skipped == 1
+
+    def test_root_found_in_frame(self, frame, page, selenium):
+        class Widget(Region):
+            _frame_locator = ('id', 'widget')
+            _root_locator = ('id', 'app')
+        root = Mock()
+        selenium.find_element.side_effect = [frame, root]
+        Widget(page).find_element('id', 'a')
+        selenium.switch_to.frame.assert_called_once_with(frame)
+        selenium.find_element.assert_called_with('id', 'app')
+        root.find_element.assert_called_once_with('id', 'a')
+
+    def test_page_returns_to_top(self, frame, page, selenium, widget):
+        widget.find_element('id', 'a')
+        page.find_element('id', 'b')
+        page.find_element('id', 'c')
+        selenium.switch_to.parent_frame.assert_called_once_with()
+        widget.find_element('id', 'd')
+        assert selenium.switch_to.frame.call_count == 2
+        # the frame element is remembered
+        assert selenium.find_element.call_count == 5
+        assert page.frame_switches == 3
+
+    def test_nested_frames(self, frame, page, selenium, widget):
+        class Inner(Region):
+            _frame_locator = ('id', 'inner')
+        inner = Inner(widget)
+        assert inner._frame_path == (('id', 'widget'), ('id', 'inner'))
+        inner.find_element('id', 'a')
+        assert selenium.switch_to.frame.call_count == 2
+        widget.find_element('id', 'b')
+        selenium.switch_to.parent_frame.assert_called_once_with()
+        assert not selenium.switch_to.default_content.called
+
+    def test_regions_share_frame(self, widget):
+        assert Region(widget, root=Mock())._frame_path == widget._frame_path
+
+    def test_open(self, frame, page, selenium, widget):
+        widget.find_element('id', 'a')
+        page.open()
+        page.find_element('id', 'b')
+        assert not selenium.switch_to.default_content.called
+
+    def test_invalidate(self, frame, page, selenium, widget):
+        widget.find_element('id', 'a')
+        page.invalidate()
+        page.find_element('id', 'b')
+        selenium.switch_to.default_content.assert_called_once_with()
+        widget.find_element('id', 'c')
+        assert selenium.find_element.call_count == 5
+
+    def test_url_change(self, frame, page, selenium, widget):
+        page.URL_CHECK_INTERVAL = 0
+        selenium.current_url = 'https://www.mozilla.org/'
+        widget.find_element('id', 'a')
+        page.find_element('id', 'b')
+        selenium.current_url = 'https://www.mozilla.org/about'
+        widget.find_element('id', 'c')
+        # the frame element is found again in the new document
+        assert selenium.find_element.call_count == 5
+
+    def test_invalidate_at_top(self, page, selenium):
+        page.invalidate()
+        page.find_element('id', 'a')
+        assert not selenium.switch_to.default_content.called
+
+    def test_failed_switch(self, frame, page, selenium, widget):
+        from selenium.common.exceptions import NoSuchFrameException
+        selenium.switch_to.frame.side_effect = NoSuchFrameException()
+        with pytest.raises(NoSuchFrameException):
+            widget.find_element('id', 'a')
+        page.find_element('id', 'b')
+        selenium.switch_to.default_content.assert_called_once_with()
+
+    def test_stale_frame_element(self, page, selenium, widget):
+        from selenium.common.exceptions import StaleElementReferenceException
+        stale, fresh = Mock(), Mock()
+        selenium.find_element.side_effect = [
+            stale, Mock(), Mock(), fresh, Mock()]
+        widget.find_element('id', 'a')
+        page.find_element('id', 'b')
+        selenium.switch_to.frame.side_effect = [
+            StaleElementReferenceException(), None]
+        widget.find_element('id', 'c')
+        selenium.switch_to.frame.assert_called_with(fresh)
+
+    def test_pages_share_driver_frame(self, base_url, frame, page, selenium,
+                                      widget):
+        from pypom import Page
+        widget.find_element('id', 'a')
+        other = Page(selenium, base_url)
+        other.find_element('id', 'b')
+        selenium.switch_to.parent_frame.assert_called_once_with()
+        widget.find_element('id', 'c')
+        assert selenium.switch_to.frame.call_count == 2
+        assert page.frame_switches == other.frame_switches == 3
+
+    def test_other_page_opened(self, base_url, frame, page, selenium,
+                               widget):
+        from pypom import Page
+        widget.find_element('id', 'a')
+        Page(selenium, base_url).open()
+        page.find_element('id', 'b')
+        assert not selenium.switch_to.parent_frame.called
+        assert not selenium.switch_to.default_content.called
+        widget.find_element('id', 'c')
+        assert selenium.switch_to.frame.call_count == 2
+
+    def test_separate_drivers(self, base_url, frame, selenium, widget):
+        from pypom import Page
+        widget.find_element('id', 'a')
+        other = Mock()
+        Page(other, base_url).find_element('id', 'b')
+        assert not other.switch_to.parent_frame.called
+        assert not other.switch_to.default_content.called
+
+    def test_listeners(self, frame, page, widget):
+        listener = Mock()
+        page.listeners.append(listener)
+        widget.wait.until(lambda s: True)
+        widget.find_element('id', 'a')
+        page.find_element('id', 'b')
+        methods = [c[0][0].method for c in listener.call_args_list]
+        assert methods == [
+            'wait.until', 'find_element', 'find_element']
+        widget._frames.path = ()
+        widget._switch_to_frame()
+        event = listener.call_args[0][0]
+        assert (event.method, event.locator) == (
+            'switch_to.frame', ('id', 'widget'))
+
+
+class TestShadowRoot:
+
+    @pytest.fixture
+    def region(self, page):
+        class MyRegion(Region):
+            _root_locator = ('css selector', 'date-picker')
+            SHADOW_ROOT = True
+        return MyRegion(page)
+
+    def test_find_element(self, element, region):
+        region.find_element('css selector', 'input')
+        region.find_element('css selector', 'button')
+        shadow_root = element.shadow_root
+        shadow_root.find_element.assert_called_with('css selector', 'button')
+        assert shadow_root.find_element.call_count == 2
+        assert not element.find_element.called
+
+    def test_shadow_root_remembered(self, page, selenium, region):
+        roots = [Mock(id='a'), Mock(id='a'), Mock(id='b')]
+        selenium.find_element.side_effect = roots
+        for i in range(3):
+            region.find_element('css selector', 'input')
+        assert not roots[1].shadow_root.find_element.called
+        assert roots[0].shadow_root.find_element.call_count == 2
+        assert roots[2].shadow_root.find_element.call_count == 1
+
+    def test_detached_shadow_root(self, element, region, selenium):
+        from selenium.common.exceptions import DetachedShadowRootException
+        region.find_element('css selector', 'input')
+        fresh = Mock(id='fresh')
+        selenium.find_element.return_value = fresh
+        element.shadow_root.find_element.side_effect = (
+            DetachedShadowRootException())
+        region.find_element('css selector', 'input')
+        fresh.shadow_root.find_element.assert_called_once_with(
+            'css selector', 'input')
+
+
+class TestCompoundLookups:
+
+    @pytest.fixture
+    def outer(self, page):
+        class Outer(Region):
+            _root_locator = ('id', 'outer')
+        return Outer(page)
+
+    @pytest.fixture
+    def inner_class(self):
+        class Inner(Region):
+            _root_locator = ('class name', 'menu')
+            COMPOUND_LOOKUPS = True
+        return Inner
+
+    def test_disabled_by_default(self, element, outer, selenium):
+        outer.find_element('css selector', 'a')
+        assert not selenium.execute_script.called
+
+    def test_disabled_skips_translation(self, monkeypatch, outer):
+        translate = Mock()
+        monkeypatch.setattr('pypom.region.to_script_locator', translate)
+        outer.find_element('css selector', 'a')
+        outer.find_elements('css selector', 'a')
+        assert not translate.called
+
+    def test_find_element(self, inner_class, outer, selenium):
+        from pypom import scripts
+        element = inner_class(outer).find_element('id', 'a')
+        assert element is selenium.execute_script.return_value
+        selenium.execute_script.assert_called_once_with(
+            scripts.FIND_CHAIN, None, [
+                ['css selector', '[id="outer"]'],
+                ['css selector', '[class~="menu"]'],
+                ['css selector', '[id="a"]']], False)
+        assert not selenium.find_element.called
+
+    def test_find_elements(self, inner_class, outer, selenium):
+        selenium.execute_script.return_value = [Mock()]
+        elements = inner_class(outer).find_elements('xpath', './/a')
+        assert elements == selenium.execute_script.return_value
+        args = selenium.execute_script.call_args[0]
+        assert args[2][-1] == ['xpath', './/a']
+        assert args[3] is True
+
+    def test_not_found(self, element, inner_class, outer, selenium):
+        selenium.execute_script.return_value = None
+        assert inner_class(outer).find_element('id', 'a') is (
+            element.find_element.return_value.find_element.return_value)
+        assert selenium.find_element.call_count == 1
+
+    def test_explicit_root(self, inner_class, page, selenium):
+        root = Mock()
+        inner_class(Region(page, root=root)).find_element('id', 'a')
+        args = selenium.execute_script.call_args[0]
+        assert args[1] is root
+        assert len(args[2]) == 2
+
+    def test_cached_root(self, element, inner_class, page, selenium):
+        class Outer(Region):
+            _root_locator = ('id', 'outer')
+            CACHE_ROOT = True
+        outer = Outer(page)
+        inner_class(outer).find_element('id', 'a')
+        inner_class(outer).find_element('id', 'b')
+        selenium.find_element.assert_called_once_with('id', 'outer')
+        assert selenium.execute_script.call_args[0][1] is element
+
+    def test_unsupported_locator(self, element, inner_class, outer, selenium):
+        inner_class(outer).find_element('link text', 'Home')
+        assert not selenium.execute_script.called
+
+    def test_lazy_load(self, inner_class, outer):
+        class Lazy(inner_class):
+            LAZY_LOAD = True
+            wait_for_region_to_load = Mock()
+        region = Lazy(outer)
+        assert not region.wait_for_region_to_load.called
+        region.find_element('id', 'a')
+        region.wait_for_region_to_load.assert_called_once_with()
@@ -0,0 +1,119 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import abc
+import gc
+
+from selenium.webdriver.common.by import By
+import pytest
+
+from pypom import Element, Elements, Page, Region
+from pypom.exception import LocatorWarning, UsageError
+from pypom.registry import Registry, registry
+
+
+def test_invalid_locator():
+    with pytest.raises(UsageError) as excinfo:
+        class MyRegion(Region):
+            _item_locator = (By.CSS_SELECTOR, 'li[[')
+    assert 'MyRegion._item_locator' in str(excinfo.value)
+
+
+def test_unknown_strategy():
+    with pytest.warns(LocatorWarning) as record:
+        class MyPage(Page):
+            _item_locator = ('identifier', 'item')
+    assert 'MyPage._item_locator' in str(record[0].message)
+    assert registry.locators(MyPage) == {
+        '_item_locator': ('identifier', 'item')}
+
+
+def test_not_a_tuple():
+    with pytest.raises(UsageError):
+        class MyRegion(Region):
+            _root_locator = 'header'
+
+
+def test_element_attribute():
+    with pytest.raises(UsageError) as excinfo:
+        class MyPage(Page):
+            items = Elements(By.CLASS_NAME, 'item result')
+    assert 'MyPage.items' in str(excinfo.value)
+
+
+def test_locator_strategies():
+    class MyPage(Page):
+        LOCATOR_STRATEGIES = ('accessibility id',)
+        _login_locator = ('accessibility id', 'login')
+    assert registry.locators(MyPage) == {
+        '_login_locator': ('accessibility id', 'login')}
+
+
+def test_computed_locators_ignored():
+    class MyRegion(Region):
+        @property
+        def _item_locator(self):
+            return (By.ID, self.item_id)
+
+        def _row_locator(self, index):
+            return (By.CSS_SELECTOR, 'tr:nth-child(%d)' % index)
+    assert registry.locators(MyRegion) == {}
+
+
+def test_registry():
+    class MyPage(Page):
+        heading = Element(By.TAG_NAME, 'h1')
+        _header_locator = (By.ID, 'header')
+
+    class MyRegion(Region):
+        _root_locator = (By.ID, 'root')
+
+    class SubRegion(MyRegion):
+        _item_locator = (By.CLASS_NAME, 'item')
+
+    class Unrooted(MyRegion):
+        _root_locator = None
+
+    assert MyRegion in registry
+    assert registry.classes(MyRegion) == [MyRegion, SubRegion, Unrooted]
+    assert registry.classes()[-4:] == [MyPage, MyRegion, SubRegion, Unrooted]
+    assert registry.locators(MyPage) == {
+        'heading': (By.TAG_NAME, 'h1'),
+        '_header_locator': (By.ID, 'header')}
+    assert registry.locators(SubRegion) == {
+        '_root_locator': (By.ID, 'root'),
+        '_item_locator': (By.CLASS_NAME, 'item')}
+    assert registry.locators(Unrooted) == {}
+
+
+def test_abstract_page():
+    Base = abc.ABCMeta('Base', (object,), {})
+
+    class MyPage(Page, Base):
+        _header_locator = (By.ID, 'header')
+    assert type(MyPage) is abc.ABCMeta
+    assert registry.locators(MyPage) == {'_header_locator': (By.ID, 'header')}
+
+
+def test_mixin_with_metaclass():
+    class Meta(type):
+        pass
+    Mixin = Meta('Mixin', (object,), {})
+
+    class MyRegion(Mixin, Region):
+        _root_locator = (By.ID, 'root')
+    assert type(MyRegion) is Meta
+    assert MyRegion in registry
+
+
+def test_classes_forgotten():
+    registry = Registry()
+
+    class MyRegion(object):
+        _root_locator = (By.ID, 'root')
+    registry.register(MyRegion)
+    assert len(registry) == 1
+    del MyRegion
+    gc.collect()
+    assert len(registry) == 0
@@ -0,0 +1,343 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from mock import Mock
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    NoSuchElementException)
+from selenium.webdriver.common.by import By
+import pytest
+
+pytest.importorskip('lxml')
+pytest.importorskip('cssselect')
+
+from pypom import Element, Field, Page, Region, RegionList  # noqa: E402
+from pypom import scripts  # noqa: E402
+from pypom.exception import UsageError  # noqa: E402
+from pypom.snapshot import Snapshot, SnapshotElement  # noqa: E402
+
+HTML = """
+<html>
+<head><title>Title</title><script>var x = 1;</script></head>
+<body>
+  <header id="header" class="banner main">
+    <h1 class="title">Hello <em>world</em></h1>
+    <span hidden>secret</span>
+    <span style="display: none">also secret</span>
+  </header>
+  <ul id="results">
+    <li class="result"><span class="name">One</span></li>
+    <li class="result"><span class="name">Two</span></li>
+    <li class="result"><span class="name">Three</span></li>
+  </ul>
+  <form>
+    <input name="email" value="a@b.c">
+    <input type="hidden" name="token" value="x">
+    <input type="checkbox" name="agree" checked disabled>
+    <textarea name="comment">Nice</textarea>
+  </form>
+  <p>First<br>Second</p>
+  <a href="/about">About  us</a>
+</body>
+</html>
+"""
+
+
+class MyPage(Page):
+    title = Element(By.CLASS_NAME, 'title')
+    heading = Field(By.CLASS_NAME, 'title')
+    email = Field(By.NAME, 'email', attribute='value')
+    secret = Field(By.CSS_SELECTOR, '[hidden]', displayed=True)
+    names = Field(By.CLASS_NAME, 'name', many=True)
+
+
+class Header(Region):
+    _root_locator = (By.ID, 'header')
+
+
+class Result(Region):
+    _name_locator = (By.CLASS_NAME, 'name')
+
+    @property
+    def name(self):
+        return self.find_element(*self._name_locator).text
+
+
+@pytest.fixture
+def page(selenium, base_url):
+    selenium.execute_script.return_value = HTML
+    return MyPage(selenium, base_url)
+
+
+def test_snapshot(page, selenium):
+    with page.snapshot() as snapshot:
+        assert isinstance(snapshot, Snapshot)
+        element = page.find_element(By.ID, 'header')
+    assert isinstance(element, SnapshotElement)
+    assert element.tag_name == 'header'
+    selenium.execute_script.assert_called_once_with(scripts.DOCUMENT_HTML)
+    assert not selenium.find_element.called
+
+
+def test_outside_snapshot(page, selenium):
+    with page.snapshot():
+        pass
+    page.find_element(By.ID, 'header')
+    selenium.find_element.assert_called_once_with(By.ID, 'header')
+
+
+def test_nested_snapshot(page, selenium):
+    with page.snapshot() as snapshot:
+        with page.snapshot() as nested:
+            assert nested is snapshot
+        assert page.find_element(By.ID, 'header')
+    assert selenium.execute_script.call_count == 1
+
+
+@pytest.mark.parametrize('strategy, locator, tags', [
+    (By.ID, 'results', ['ul']),
+    (By.NAME, 'email', ['input']),
+    (By.CLASS_NAME, 'result', ['li', 'li', 'li']),
+    (By.TAG_NAME, 'textarea', ['textarea']),
+    (By.CSS_SELECTOR, 'header > .title em', ['em']),
+    (By.CSS_SELECTOR, 'html', ['html']),
+    (By.XPATH, '//li[2]/span', ['span']),
+    (By.LINK_TEXT, 'About us', ['a']),
+    (By.PARTIAL_LINK_TEXT, 'bout', ['a']),
+    (By.CSS_SELECTOR, '.missing', []),
+])
+def test_find_elements(page, strategy, locator, tags):
+    with page.snapshot():
+        elements = page.find_elements(strategy, locator)
+    assert [e.tag_name for e in elements] == tags
+
+
+def test_no_such_element(page):
+    with page.snapshot():
+        with pytest.raises(NoSuchElementException):
+            page.find_element(By.ID, 'missing')
+        assert not page.is_element_present(By.ID, 'missing')
+        assert page.is_element_present(By.ID, 'header')
+
+
+@pytest.mark.parametrize('locator', [
+    (By.CSS_SELECTOR, 'li[['),
+    (By.XPATH, '//li['),
+    (By.XPATH, 'count(//li)'),
+    (By.CLASS_NAME, 'two classes'),
+])
+def test_invalid_selector(page, locator):
+    with page.snapshot():
+        with pytest.raises(InvalidSelectorException):
+            page.find_element(*locator)
+
+
+def test_text(page):
+    with page.snapshot():
+        assert page.find_element(By.ID, 'header').text == 'Hello world'
+        assert page.find_element(By.TAG_NAME, 'p').text == 'First\nSecond'
+        assert page.find_element(By.ID, 'results').text == 'One\nTwo\nThree'
+        assert page.find_element(By.TAG_NAME, 'body').text.startswith(
+            'Hello world\nOne')
+        assert page.find_element(By.TAG_NAME, 'title').text == ''
+
+
+def test_is_displayed(page):
+    with page.snapshot():
+        assert page.is_element_displayed(By.CLASS_NAME, 'title')
+        assert not page.is_element_displayed(By.CSS_SELECTOR, '[hidden]')
+        assert not page.is_element_displayed(
+            By.CSS_SELECTOR, 'header span[style]')
+        assert not page.is_element_displayed(By.NAME, 'token')
+        assert not page.is_element_displayed(By.TAG_NAME, 'script')
+
+
+def test_attributes(page):
+    with page.snapshot():
+        header = page.find_element(By.ID, 'header')
+        assert header.get_attribute('class') == 'banner main'
+        assert header.get_attribute('missing') is None
+        email = page.find_element(By.NAME, 'email')
+        assert email.get_attribute('value') == 'a@b.c'
+        assert email.is_enabled()
+        assert not email.is_selected()
+        agree = page.find_element(By.NAME, 'agree')
+        assert agree.get_attribute('checked') == 'true'
+        assert agree.get_attribute('required') is None
+        assert agree.is_selected()
+        assert not agree.is_enabled()
+        comment = page.find_element(By.NAME, 'comment')
+        assert comment.get_property('value') == 'Nice'
+
+
+def test_properties(page):
+    with page.snapshot():
+        agree = page.find_element(By.NAME, 'agree')
+        assert agree.get_property('checked') is True
+        assert agree.get_property('disabled') is True
+        assert agree.get_property('readOnly') is False
+        assert agree.get_property('name') == 'agree'
+        assert agree.get_dom_attribute('required') is None
+        email = page.find_element(By.NAME, 'email')
+        assert email.get_property('value') == 'a@b.c'
+        assert email.get_property('disabled') is False
+        header = page.find_element(By.ID, 'header')
+        assert header.get_property('className') == 'banner main'
+        assert header.get_property('tagName') == 'HEADER'
+        assert header.get_property('value') is None
+        assert header.get_property('textContent').split()[:2] == [
+            'Hello', 'world']
+
+
+def test_read_only(page):
+    with page.snapshot():
+        element = page.find_element(By.NAME, 'email')
+        with pytest.raises(UsageError):
+            element.send_keys('x')
+        with pytest.raises(UsageError):
+            element.click()
+
+
+def test_element_equality(page):
+    with page.snapshot():
+        a = page.find_element(By.ID, 'header')
+        b = page.find_element(By.CSS_SELECTOR, 'header')
+        assert a == b
+        assert hash(a) == hash(b)
+        assert a != page.find_element(By.TAG_NAME, 'h1')
+
+
+def test_region(page, selenium):
+    with page.snapshot():
+        header = Header(page)
+        assert header.root.tag_name == 'header'
+        title = header.find_element(By.CLASS_NAME, 'title')
+        assert title.text == 'Hello world'
+        assert not header.is_element_present(By.ID, 'results')
+    assert not selenium.find_element.called
+
+
+def test_region_without_root(page):
+    with page.snapshot():
+        assert Region(page).find_element(By.ID, 'results').tag_name == 'ul'
+
+
+def test_region_root_cache(page, selenium):
+    class CachedHeader(Header):
+        CACHE_ROOT = True
+    header = CachedHeader(page)
+    header.find_element(By.CLASS_NAME, 'title')
+    with page.snapshot():
+        title = header.find_element(By.CLASS_NAME, 'title')
+        assert isinstance(title, SnapshotElement)
+    assert header.root is selenium.find_element.return_value
+
+
+def test_region_list(page, selenium):
+    with page.snapshot():
+        results = RegionList(page, Result, By.CLASS_NAME, 'result')
+        assert len(results) == 3
+        assert [r.name for r in results] == ['One', 'Two', 'Three']
+    assert selenium.execute_script.call_count == 1
+
+
+def test_find_many(page, selenium):
+    with page.snapshot():
+        found = page.find_many({
+            'header': (By.ID, 'header'),
+            'about': (By.LINK_TEXT, 'About us'),
+            'missing': (By.ID, 'missing')})
+    assert found['header'].tag_name == 'header'
+    assert found['about'].tag_name == 'a'
+    assert found['missing'] is None
+    assert selenium.execute_script.call_count == 1
+
+
+def test_fast_presence_checks(page, selenium):
+    page.FAST_PRESENCE_CHECKS = True
+    with page.snapshot():
+        assert page.is_element_present(By.ID, 'header')
+        assert not page.is_element_displayed(By.ID, 'missing')
+    assert selenium.execute_script.call_count == 1
+    assert not selenium.implicitly_wait.called
+
+
+def test_element_descriptor(page, selenium):
+    assert page.title is not None
+    with page.snapshot():
+        assert isinstance(page.title, SnapshotElement)
+    assert not isinstance(page.title, SnapshotElement)
+
+
+def test_listeners(page):
+    listener = Mock()
+    page.listeners.append(listener)
+    with page.snapshot():
+        pass
+    event = listener.call_args[0][0]
+    assert event.method == 'snapshot'
+    assert event.view is MyPage
+
+
+def test_missing_dependencies(page, monkeypatch):
+    monkeypatch.setattr('pypom.snapshot.lxml', None)
+    with pytest.raises(UsageError):
+        with page.snapshot():
+            pass
+    assert page._snapshot is None
+
+
+def test_extract(page, selenium):
+    with page.snapshot():
+        assert page.extract() == {
+            'heading': 'Hello world', 'email': 'a@b.c', 'secret': False,
+            'names': ['One', 'Two', 'Three']}
+    assert selenium.execute_script.call_count == 1
+
+
+# as serialised by DOCUMENT_HTML after the user edited a form whose markup
+# had value="a@b.c", a checked "agree" box, "Nice" and the "uk" option
+LIVE_HTML = """
+<html><body><form>
+  <input name="email" value="ada@example.com">
+  <input type="checkbox" name="agree">
+  <input type="radio" name="plan" value="pro" checked="">
+  <textarea name="comment">Changed</textarea>
+  <select name="country">
+    <option value="uk">United Kingdom</option>
+    <option value="fr" selected="">France</option>
+  </select>
+</form></body></html>
+"""
+
+
+def test_live_form_state(base_url, selenium):
+    class Form(Page):
+        email = Field(By.NAME, 'email', attribute='value')
+
+    selenium.execute_script.return_value = LIVE_HTML
+    page = Form(selenium, base_url)
+    with page.snapshot():
+        email = page.find_element(By.NAME, 'email')
+        assert email.get_attribute('value') == 'ada@example.com'
+        assert email.get_property('value') == 'ada@example.com'
+        assert page.email == 'ada@example.com'
+        assert not page.find_element(By.NAME, 'agree').is_selected()
+        assert page.find_element(By.NAME, 'plan').is_selected()
+        comment = page.find_element(By.NAME, 'comment')
+        assert comment.get_attribute('value') == 'Changed'
+        country = page.find_element(By.NAME, 'country')
+        assert country.get_attribute('value') == 'fr'
+        options = page.find_elements(By.TAG_NAME, 'option')
+        assert [o.is_selected() for o in options] == [False, True]
+    selenium.execute_script.assert_called_once_with(scripts.DOCUMENT_HTML)
+
+
+def test_select_value_without_selection(page):
+    selenium = page.selenium
+    selenium.execute_script.return_value = (
+        '<select><option>One</option><option value="2">Two</option></select>')
+    with page.snapshot():
+        assert page.find_element(By.TAG_NAME, 'select').get_attribute(
+            'value') == 'One'
@@ -0,0 +1,232 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import json
+import socket
+import ssl
+import threading
+import time
+
+from mock import Mock
+from selenium.webdriver import FirefoxOptions
+import pytest
+
+from pypom import Page
+from pypom.transport import (
+    ConnectionStatistics,
+    HTTPConnectionPool,
+    PooledRemoteConnection,
+    connect,
+    default_pool)
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:  # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8')
+        with server.lock:
+            server.requests.append((self.command, self.path, body))
+            server.headers.append(self.headers)
+            server.active += 1
+            server.most_active = max(server.most_active, server.active)
+        time.sleep(server.delay)
+        if self.path == '/session':
+            value = {'sessionId': 'abc', 'capabilities': {}}
+        else:
+            value = None
+        data = json.dumps({'value': value}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if self.path == '/close':
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(data)
+        with server.lock:
+            server.active -= 1
+
+    do_POST = do_DELETE = do_GET
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def server(request):
+    server = Server(('127.0.0.1', 0), Handler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.headers = []
+    server.active = server.most_active = 0
+    server.delay = 0
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,))
+    thread.daemon = True
+    thread.start()
+    server.url = 'http://127.0.0.1:%d' % server.server_port
+
+    def fin():
+        server.shutdown()
+        server.server_close()
+    request.addfinalizer(fin)
+    return server
+
+
+@pytest.fixture
+def pool(request):
+    pool = HTTPConnectionPool()
+    request.addfinalizer(pool.close)
+    return pool
+
+
+def test_connections_reused(pool, server):
+    for i in range(5):
+        status, reason, headers, data = pool.request('GET', server.url + '/')
+        assert status == 200
+        assert headers['content-type'] == 'application/json'
+        assert json.loads(data.decode('utf-8')) == {'value': None}
+    assert pool.statistics == ConnectionStatistics(5, 1, 4, 0, 1)
+
+
+def test_request_body(pool, server):
+    pool.request('POST', server.url + '/session?a=1', '{"b": 2}',
+                 {'Content-Type': 'application/json'})
+    assert server.requests == [('POST', '/session?a=1', '{"b": 2}')]
+
+
+def test_connection_close(pool, server):
+    pool.request('GET', server.url + '/close')
+    pool.request('GET', server.url + '/')
+    assert pool.statistics == ConnectionStatistics(2, 2, 0, 1, 1)
+
+
+def test_max_size(server):
+    pool = HTTPConnectionPool(max_size=1)
+    pool.request('GET', server.url + '/')
+    pool.request('GET', server.url.replace('127.0.0.1', 'localhost') + '/')
+    statistics = pool.statistics
+    assert statistics.idle == 1
+    assert statistics.discarded == 1
+    pool.close()
+    assert pool.statistics.idle == 0
+
+
+def test_max_per_host(server):
+    pool = HTTPConnectionPool(max_per_host=2)
+    server.delay = 0.02
+    threads = [threading.Thread(target=pool.request,
+                                args=('GET', server.url + '/'))
+               for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert server.most_active <= 2
+    assert pool.statistics.opened <= 2
+    assert pool.statistics.requests == 6
+    pool.close()
+
+
+def test_idle_connection_closed_by_server(pool, server):
+    pool.request('GET', server.url + '/')
+    for connections in pool._idle.values():
+        for connection in connections:
+            connection.sock.shutdown(socket.SHUT_RDWR)
+    status = pool.request('GET', server.url + '/')[0]
+    assert status == 200
+    assert pool.statistics == ConnectionStatistics(2, 2, 1, 1, 1)
+
+
+def test_connection_refused(pool, server):
+    url = server.url
+    server.shutdown()
+    server.server_close()
+    with pytest.raises(socket.error):
+        pool.request('GET', url + '/')
+    assert pool.statistics.idle == 0
+
+
+def test_default_timeout():
+    assert HTTPConnectionPool().timeout == 120
+
+
+def test_timeout(pool, server):
+    pool.request('GET', server.url + '/', timeout=5)
+    connection = list(pool._idle.values())[0][0]
+    assert connection.sock.gettimeout() == 5
+    pool.request('GET', server.url + '/')
+    assert connection.sock.gettimeout() == 120
+
+
+def test_server_not_responding(pool, server):
+    server.delay = 0.5
+    with pytest.raises(socket.timeout):
+        pool.request('GET', server.url + '/', timeout=0.05)
+
+
+def test_certificates_ignored(pool):
+    connection = pool._connect('https', 'grid', 443, None, True)
+    assert connection._context.verify_mode == ssl.CERT_NONE
+    assert not connection._context.check_hostname
+
+
+def test_certificates_verified(pool):
+    import certifi
+    context = pool._ssl_context(certifi.where(), False)
+    assert context.verify_mode == ssl.CERT_REQUIRED
+    assert context.check_hostname
+    assert pool._ssl_context(certifi.where(), False) is context
+
+
+def test_remote_connection_client_config(server):
+    from selenium.webdriver.remote.client_config import ClientConfig
+    pool = Mock()
+    pool.request.return_value = (200, 'OK', {}, b'{"value": null}')
+    config = ClientConfig(server.url, timeout=5, ca_certs='grid.pem',
+                          ignore_certificates=True)
+    connection = PooledRemoteConnection(server.url, pool, config)
+    connection._request('GET', server.url + '/status')
+    assert pool.request.call_args[0][4:] == (5, 'grid.pem', True)
+
+
+def test_remote_connection_authorization(pool, server):
+    from selenium.webdriver.remote.client_config import ClientConfig
+    config = ClientConfig(server.url, username='u', password='p',
+                          extra_headers={'X-Grid': 'a'})
+    connection = PooledRemoteConnection(server.url, pool, config)
+    connection._request('GET', server.url + '/status')
+    headers = server.headers[-1]
+    assert headers['Authorization'] == 'Basic dTpw'
+    assert headers['X-Grid'] == 'a'
+
+
+def test_remote_connection_default_pool(server):
+    assert PooledRemoteConnection(server.url).pool is default_pool
+
+
+def test_connect(pool, server, base_url):
+    driver = connect(server.url, pool, options=FirefoxOptions())
+    assert driver.session_id == 'abc'
+    Page(driver, base_url).open()
+    driver.quit()
+    assert [r[:2] for r in server.requests] == [
+        ('POST', '/session'),
+        ('POST', '/session/abc/url'),
+        ('DELETE', '/session/abc')]
+    assert json.loads(server.requests[1][2]) == {'url': base_url}
+    assert pool.statistics.opened == 1
+    assert pool.statistics.reused == 2
@@ -0,0 +1,116 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from mock import Mock
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException)
+import pytest
+
+from pypom.wait import Wait
+
+
+@pytest.fixture
+def sleep(monkeypatch):
+    sleep = Mock()
+    monkeypatch.setattr('pypom.wait.time.sleep', sleep)
+    return sleep
+
+
+def test_until(selenium, sleep):
+    method = Mock(side_effect=[False, False, 'done'])
+    assert Wait(selenium, 10).until(method) == 'done'
+    method.assert_called_with(selenium)
+    assert [round(c[0][0], 4) for c in sleep.call_args_list] == [
+        0.025, 0.0375]
+
+
+def test_intervals_back_off(selenium):
+    wait = Wait(selenium, 10, min_interval=0.1, max_interval=0.3, backoff=2)
+    intervals = wait._intervals()
+    assert [next(intervals) for i in range(4)] == [0.1, 0.2, 0.3, 0.3]
+
+
+def test_until_ignored_exceptions(selenium, sleep):
+    method = Mock(side_effect=[
+        NoSuchElementException(), StaleElementReferenceException(), True])
+    wait = Wait(selenium, 10,
+                ignored_exceptions=(StaleElementReferenceException,))
+    assert wait.until(method) is True
+
+
+def test_until_exception(selenium, sleep):
+    method = Mock(side_effect=StaleElementReferenceException())
+    with pytest.raises(StaleElementReferenceException):
+        Wait(selenium, 10).until(method)
+
+
+def test_until_timeout(selenium):
+    with pytest.raises(TimeoutException) as e:
+        Wait(selenium, 0).until(lambda s: False, 'message')
+    assert 'message' in str(e.value)
+
+
+def test_until_not(selenium, sleep):
+    method = Mock(side_effect=[True, 0])
+    assert Wait(selenium, 10).until_not(method) == 0
+
+
+def test_until_not_ignored_exception(selenium, sleep):
+    method = Mock(side_effect=NoSuchElementException())
+    assert Wait(selenium, 10).until_not(method) is True
+
+
+def test_until_not_timeout(selenium):
+    with pytest.raises(TimeoutException):
+        Wait(selenium, 0).until_not(lambda s: True)
+
+
+def test_records(selenium, sleep):
+    method = Mock(side_effect=[False, True])
+    wait = Wait(selenium, 10)
+    wait.until(method)
+    record, = wait.records
+    assert record.method is method
+    assert record.until is True
+    assert record.satisfied is True
+    assert record.checks == 2
+    assert record.elapsed >= 0
+
+
+def test_records_timeout(selenium):
+    wait = Wait(selenium, 0)
+    with pytest.raises(TimeoutException):
+        wait.until_not(lambda s: True)
+    record, = wait.records
+    assert record.until is False
+    assert record.satisfied is False
+
+
+def test_max_records(selenium, sleep):
+    wait = Wait(selenium, 10, max_records=2)
+    for i in range(3):
+        wait.until(lambda s: True)
+    assert len(wait.records) == 2
+
+
+def test_view_wait_configuration(base_url, selenium):
+    from pypom import Page
+
+    class MyPage(Page):
+        WAIT_MIN_INTERVAL = 0.1
+        WAIT_MAX_INTERVAL = 1
+        WAIT_BACKOFF = 2
+        WAIT_IGNORED_EXCEPTIONS = ()
+    wait = MyPage(selenium, base_url, timeout=5).wait
+    assert isinstance(wait, Wait)
+    assert wait.timeout == 5
+    assert (wait.min_interval, wait.max_interval, wait.backoff) == (0.1, 1, 2)
+    assert wait.ignored_exceptions == (NoSuchElementException,)
+
+
+def test_view_wait_ignores_stale(page, sleep):
+    method = Mock(side_effect=[StaleElementReferenceException(), True])
+    assert page.wait.until(method) is True